@@ -0,0 +1,25 @@
+"""
+Gunicorn configuration for serving the IAM automation web interface
+"""
+
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+
+# Threaded workers keep Server-Sent Event streams from blocking other requests
+workers = int(os.environ.get('WEB_CONCURRENCY', multiprocessing.cpu_count() * 2 + 1))
+worker_class = 'gthread'
+threads = int(os.environ.get('WEB_THREADS', 8))
+
+# gthread workers heartbeat from their main loop, not from response writes, so long
+# event streams never trip this; it only restarts workers that have truly hung
+timeout = int(os.environ.get('WEB_TIMEOUT', 120))
+keepalive = 5
+
+# Import the app once in the master so workers share its memory pages
+preload_app = True
+
+accesslog = '-'
+errorlog = '-'
+loglevel = os.environ.get('LOG_LEVEL', 'info').lower()
@@ -3,57 +3,231 @@
 Deploy IAM automation tool as AWS Lambda function
 """
 
+import argparse
+import ast
 import boto3
 import zipfile
 import os
 import json
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
 from pathlib import Path
 
-def create_deployment_package():
-    """Create deployment package for Lambda"""
-    print("Creating deployment package...")
-    
-    # Create zip file
-    with zipfile.ZipFile('iam_automation_lambda.zip', 'w', zipfile.ZIP_DEFLATED) as zipf:
-        # Add source files
-        src_dir = Path('../src')
-        for file_path in src_dir.rglob('*.py'):
-            zipf.write(file_path, file_path.relative_to(src_dir.parent))
-        
-        # Add requirements (you'll need to install them in a lambda-compatible way)
-        # This is a simplified version - in production, use Lambda layers or docker
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SRC_DIR = PROJECT_ROOT / 'src'
+BUILD_DIR = PROJECT_ROOT / 'build'
+
+LAMBDA_RUNTIME = 'python3.9'
+
+# Only these packages are imported by the Lambda code path
+LAYER_PACKAGES = ('boto3', 'botocore')
+
+# botocore service models the handler actually uses; everything else is stripped from the layer
+BOTOCORE_SERVICES = ('iam', 'sts', 's3')
+
+# Entry module of the configured handler; the optimized package holds only what it imports
+HANDLER_MODULE = 'lambda_handler'
+
+# Compiles sources to sourceless .pyc with the interpreter it runs under: src_dir out_dir files...
+_COMPILE_DRIVER = '''
+import os, py_compile, sys
+src_dir, out_dir = sys.argv[1], sys.argv[2]
+for relative in sys.argv[3:]:
+    cfile = os.path.join(out_dir, os.path.splitext(relative)[0] + ".pyc")
+    os.makedirs(os.path.dirname(cfile), exist_ok=True)
+    py_compile.compile(os.path.join(src_dir, relative), cfile=cfile, dfile=relative, doraise=True)
+'''
+
+def runtime_python(python: str = None) -> str:
+    """Interpreter matching the Lambda runtime, or None when none is installed"""
+    candidate = python or shutil.which(LAMBDA_RUNTIME)
+    if not candidate:
+        return None
+    try:
+        version = subprocess.run([candidate, '-c', 'import sys; print("python%d.%d" % sys.version_info[:2])'],
+                                 capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        # e.g. a pyenv shim for a version that is installed but not activated
+        return None
+    if version != LAMBDA_RUNTIME:
+        print(f"Warning: {candidate} is {version}, not {LAMBDA_RUNTIME}")
+        return None
+    return candidate
+
+def _module_file(name: str) -> Path:
+    """Source file of a module under src/, or None for stdlib and third-party modules"""
+    base = SRC_DIR.joinpath(*name.split('.'))
+    for candidate in (base.with_suffix('.py'), base / '__init__.py'):
+        if candidate.is_file():
+            return candidate
+    return None
+
+def handler_sources() -> list:
+    """Source files reachable from the handler through imports, relative to src/"""
+    found, pending = set(), [HANDLER_MODULE]
+    while pending:
+        name = pending.pop()
+        # Importing a submodule also runs every parent package's __init__
+        parts = name.split('.')
+        for depth in range(1, len(parts) + 1):
+            path = _module_file('.'.join(parts[:depth]))
+            if path is None or path in found:
+                continue
+            found.add(path)
+            for node in ast.walk(ast.parse(path.read_text(), str(path))):
+                if isinstance(node, ast.Import):
+                    pending.extend(alias.name for alias in node.names)
+                elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                    # 'from pkg import name' may name a submodule as well as an attribute
+                    pending.append(node.module)
+                    pending.extend(f"{node.module}.{alias.name}" for alias in node.names)
+    return sorted(str(path.relative_to(SRC_DIR)) for path in found)
+
+def create_deployment_package(build: str = 'standard', output_dir: Path = None,
+                              python: str = None) -> str:
+    """Create deployment package; 'optimized' ships the handler's modules as runtime bytecode"""
+    print(f"Creating {build} deployment package...")
+    output_dir = Path(output_dir or '.')
+    output_dir.mkdir(parents=True, exist_ok=True)
+    zip_file = str(output_dir / ('iam_automation_lambda.zip' if build == 'standard'
+                                 else f'iam_automation_lambda_{build}.zip'))
+
+    if build == 'standard':
+        sources = sorted(str(path.relative_to(SRC_DIR)) for path in SRC_DIR.rglob('*.py')
+                         if '__pycache__' not in path.parts)
+    else:
+        sources = handler_sources()
+
+    with tempfile.TemporaryDirectory() as compiled_dir:
+        compiler = runtime_python(python) if build == 'optimized' else None
+        if compiler:
+            # Bytecode is only valid for the interpreter version that wrote it
+            subprocess.run([compiler, '-c', _COMPILE_DRIVER, str(SRC_DIR), compiled_dir, *sources],
+                           check=True)
+        elif build == 'optimized':
+            print(f"Warning: {LAMBDA_RUNTIME} not found (pass --python); "
+                  f"shipping sources, which the runtime compiles at cold start")
+
+        with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+            for relative in sources:
+                # Handler is 'lambda_handler.lambda_handler', so modules sit at the archive root
+                if compiler:
+                    # Sourceless .pyc imports directly; the filesystem is read-only, so no cache
+                    pyc = str(Path(relative).with_suffix('.pyc'))
+                    zipf.write(os.path.join(compiled_dir, pyc), pyc)
+                else:
+                    zipf.write(SRC_DIR / relative, relative)
+
+    if build == 'standard':
         print("Note: For production deployment, use Lambda layers for dependencies")
-    
-    print("Deployment package created: iam_automation_lambda.zip")
-    return 'iam_automation_lambda.zip'
 
-def create_lambda_function(function_name: str, role_arn: str, zip_file: str):
+    print(f"Deployment package created: {zip_file}")
+    return zip_file
+
+def _layer_requirements() -> list:
+    """Pinned requirement lines for the packages the Lambda imports"""
+    requirements = []
+    with open(PROJECT_ROOT / 'requirements.txt') as f:
+        for line in f:
+            name = line.split('==')[0].strip().lower()
+            if name in LAYER_PACKAGES:
+                requirements.append(line.strip())
+    return requirements
+
+def build_dependency_layer(output_dir: Path = None, python: str = None) -> str:
+    """Bundle stripped, precompiled dependencies into a Lambda layer zip"""
+    print("Building dependency layer...")
+    output_dir = Path(output_dir or BUILD_DIR)
+    layer_dir = output_dir / 'layer'
+    site_dir = layer_dir / 'python'
+    shutil.rmtree(layer_dir, ignore_errors=True)
+
+    # Resolve and compile with the runtime interpreter; host-resolved wheels may not import on it
+    compiler = runtime_python(python)
+    if not compiler:
+        print(f"Warning: {LAMBDA_RUNTIME} not found (pass --python); "
+              f"layer is resolved for Python {sys.version_info.major}.{sys.version_info.minor} "
+              f"and ships without bytecode")
+    subprocess.run([compiler or sys.executable, '-m', 'pip', 'install', '--quiet', '--no-compile',
+                    '--target', str(site_dir), *_layer_requirements()], check=True)
+
+    # Drop service models the handler never loads
+    data_dir = site_dir / 'botocore' / 'data'
+    for service_dir in data_dir.iterdir():
+        if service_dir.is_dir() and service_dir.name not in BOTOCORE_SERVICES:
+            shutil.rmtree(service_dir)
+
+    for path in list(site_dir.rglob('*')):
+        if path.is_dir() and (path.name in ('tests', 'test', '__pycache__')):
+            shutil.rmtree(path, ignore_errors=True)
+
+    # __pycache__ entries are tagged per interpreter version; only the runtime's own are used
+    if compiler:
+        subprocess.run([compiler, '-m', 'compileall', '-q', '--invalidation-mode', 'unchecked-hash',
+                        str(site_dir)], check=True)
+
+    zip_file = str(output_dir / 'iam_automation_layer.zip')
+    with zipfile.ZipFile(zip_file, 'w', zipfile.ZIP_DEFLATED) as zipf:
+        for path in sorted(site_dir.rglob('*')):
+            if path.is_file():
+                zipf.write(path, path.relative_to(layer_dir))
+
+    print(f"Dependency layer created: {zip_file}")
+    return zip_file
+
+def publish_layer(zip_file: str, layer_name: str = 'iam-automation-dependencies'):
+    """Publish dependency layer and return its version ARN"""
+    lambda_client = boto3.client('lambda')
+
+    try:
+        with open(zip_file, 'rb') as f:
+            response = lambda_client.publish_layer_version(
+                LayerName=layer_name,
+                Content={'ZipFile': f.read()},
+                CompatibleRuntimes=[LAMBDA_RUNTIME],
+                Description='boto3/botocore trimmed to the services used by IAM Automation Tool'
+            )
+
+        print(f"Layer published: {response['LayerVersionArn']}")
+        return response['LayerVersionArn']
+
+    except Exception as e:
+        print(f"Failed to publish layer: {e}")
+        return None
+
+def create_lambda_function(function_name: str, role_arn: str, zip_file: str,
+                           memory_size: int = 512, layers: list = None):
     """Create Lambda function"""
     lambda_client = boto3.client('lambda')
-    
+
     try:
         with open(zip_file, 'rb') as f:
             zip_content = f.read()
-        
+
         response = lambda_client.create_function(
             FunctionName=function_name,
-            Runtime='python3.9',
+            Runtime=LAMBDA_RUNTIME,
             Role=role_arn,
             Handler='lambda_handler.lambda_handler',
             Code={'ZipFile': zip_content},
             Description='IAM Automation Tool',
             Timeout=300,
-            MemorySize=512,
+            MemorySize=memory_size,
+            Layers=layers or [],
             Environment={
                 'Variables': {
                     'LOG_LEVEL': 'INFO'
                 }
             }
         )
-        
+
         print(f"Lambda function created: {response['FunctionArn']}")
         return response
-        
+
     except Exception as e:
         print(f"Failed to create Lambda function: {e}")
         return None
@@ -61,7 +235,7 @@ def create_lambda_function(function_name: str, role_arn: str, zip_file: str):
 def create_lambda_role():
     """Create IAM role for Lambda function"""
     iam_client = boto3.client('iam')
-    
+
     trust_policy = {
         "Version": "2012-10-17",
         "Statement": [
@@ -74,7 +248,7 @@ def create_lambda_role():
             }
         ]
     }
-    
+
     try:
         # Create role
         role_response = iam_client.create_role(
@@ -82,49 +256,156 @@ def create_lambda_role():
             AssumeRolePolicyDocument=json.dumps(trust_policy),
             Description='Role for IAM Automation Lambda function'
         )
-        
+
         # Attach policies
         policies = [
             'arn:aws:iam::aws:policy/service-role/AWSLambdaBasicExecutionRole',
             'arn:aws:iam::aws:policy/IAMFullAccess'  # Adjust permissions as needed
         ]
-        
+
         for policy in policies:
             iam_client.attach_role_policy(
                 RoleName='IAMAutomationLambdaRole',
                 PolicyArn=policy
             )
-        
+
         print(f"Lambda role created: {role_response['Role']['Arn']}")
         return role_response['Role']['Arn']
-        
+
     except Exception as e:
         print(f"Failed to create Lambda role: {e}")
         return None
 
-if __name__ == '__main__':
+# Runs inside a fresh interpreter per measurement to reproduce a cold start
+_COLD_START_DRIVER = '''
+import json, sys, time
+start = time.perf_counter()
+import lambda_handler
+imported = time.perf_counter()
+lambda_handler.lambda_handler(json.loads(sys.argv[1]), None)
+invoked = time.perf_counter()
+print(json.dumps({"import_ms": (imported - start) * 1000, "first_invoke_ms": (invoked - imported) * 1000}))
+'''
+
+BENCHMARK_EVENT = {
+    "action": "create_user",
+    "parameters": {"username": "cold-start-probe"},
+    "dry_run": True
+}
+
+def measure_cold_start(zip_file: str, layer_zip: str = None, runs: int = 5,
+                       python: str = None) -> dict:
+    """Measure import and first-invocation latency of lambda_handler in fresh interpreters"""
+    # Runtime bytecode only loads in the runtime's interpreter
+    interpreter = runtime_python(python) or sys.executable
+    with tempfile.TemporaryDirectory() as work_dir:
+        function_dir = os.path.join(work_dir, 'function')
+        with zipfile.ZipFile(zip_file) as zipf:
+            zipf.extractall(function_dir)
+
+        # Lambda puts the function code first and layer code after it on sys.path
+        python_path = [function_dir]
+        if layer_zip:
+            layer_dir = os.path.join(work_dir, 'layer')
+            with zipfile.ZipFile(layer_zip) as zipf:
+                zipf.extractall(layer_dir)
+            python_path.append(os.path.join(layer_dir, 'python'))
+
+        env = dict(os.environ, PYTHONPATH=os.pathsep.join(python_path), PYTHONDONTWRITEBYTECODE='1',
+                   AWS_DEFAULT_REGION='us-east-1', LOG_LEVEL='WARNING')
+
+        samples = []
+        for _ in range(runs):
+            started = time.perf_counter()
+            output = subprocess.run([interpreter, '-c', _COLD_START_DRIVER, json.dumps(BENCHMARK_EVENT)],
+                                    cwd=work_dir, env=env, capture_output=True, text=True, check=True)
+            sample = json.loads(output.stdout.strip().splitlines()[-1])
+            sample['process_ms'] = (time.perf_counter() - started) * 1000
+            samples.append(sample)
+
+    size = os.path.getsize(zip_file) + (os.path.getsize(layer_zip) if layer_zip else 0)
+    return {
+        "package_bytes": size,
+        "import_ms": round(statistics.median(s['import_ms'] for s in samples), 1),
+        "first_invoke_ms": round(statistics.median(s['first_invoke_ms'] for s in samples), 1),
+        "process_ms": round(statistics.median(s['process_ms'] for s in samples), 1)
+    }
+
+def benchmark_packages(runs: int = 5, with_layer: bool = True, python: str = None) -> dict:
+    """Build each package variant and compare their cold-start cost"""
+    variants = {
+        "standard": (create_deployment_package('standard', BUILD_DIR), None),
+        "optimized": (create_deployment_package('optimized', BUILD_DIR, python), None)
+    }
+    if with_layer:
+        variants["optimized+layer"] = (variants["optimized"][0],
+                                       build_dependency_layer(BUILD_DIR, python))
+
+    results = {name: measure_cold_start(zip_file, layer_zip, runs, python)
+               for name, (zip_file, layer_zip) in variants.items()}
+
+    print(f"\n{'variant':<18}{'size (KB)':>12}{'import (ms)':>14}{'1st call (ms)':>16}{'process (ms)':>15}")
+    for name, result in results.items():
+        print(f"{name:<18}{result['package_bytes'] / 1024:>12.1f}{result['import_ms']:>14}"
+              f"{result['first_invoke_ms']:>16}{result['process_ms']:>15}")
+    return results
+
+def deploy(build: str = 'standard', memory_size: int = 512, with_layer: bool = False,
+           python: str = None):
+    """Create the execution role, package and deploy the function"""
     print("Deploying IAM Automation Tool to AWS Lambda...")
-    
+
     # Create Lambda execution role
     role_arn = create_lambda_role()
     if not role_arn:
         exit(1)
-    
+
     # Wait for role to be available
     print("Waiting for role to be available...")
-    import time
     time.sleep(10)
-    
+
     # Create deployment package
-    zip_file = create_deployment_package()
-    
+    zip_file = create_deployment_package(build, python=python)
+
+    layers = []
+    if with_layer:
+        layer_arn = publish_layer(build_dependency_layer(python=python))
+        if not layer_arn:
+            exit(1)
+        layers.append(layer_arn)
+
     # Deploy Lambda function
     function_name = 'iam-automation-tool'
-    result = create_lambda_function(function_name, role_arn, zip_file)
-    
+    result = create_lambda_function(function_name, role_arn, zip_file, memory_size=memory_size, layers=layers)
+
     if result:
         print("Deployment completed successfully!")
         print(f"Function ARN: {result['FunctionArn']}")
     else:
         print("Deployment failed!")
-        exit(1)
\ No newline at end of file
+        exit(1)
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Build, benchmark and deploy the IAM automation Lambda')
+    parser.add_argument('command', nargs='?', default='deploy', choices=['deploy', 'build', 'benchmark'])
+    parser.add_argument('--build', default='standard', choices=['standard', 'optimized'],
+                        help='Package variant to build or deploy')
+    parser.add_argument('--layer', action='store_true', help='Bundle dependencies into a Lambda layer')
+    parser.add_argument('--memory-size', type=int, default=512, help='Function memory in MB')
+    parser.add_argument('--runs', type=int, default=5, help='Cold starts measured per variant')
+    parser.add_argument('--output-file', help='Write benchmark results as JSON')
+    parser.add_argument('--python', help=f'{LAMBDA_RUNTIME} interpreter used to compile bytecode '
+                                         f'(default: {LAMBDA_RUNTIME} on PATH)')
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        create_deployment_package(args.build, BUILD_DIR, args.python)
+        if args.layer:
+            build_dependency_layer(BUILD_DIR, args.python)
+    elif args.command == 'benchmark':
+        results = benchmark_packages(runs=args.runs, with_layer=args.layer, python=args.python)
+        if args.output_file:
+            with open(args.output_file, 'w') as f:
+                json.dump(results, f, indent=2)
+    else:
+        deploy(args.build, memory_size=args.memory_size, with_layer=args.layer, python=args.python)
@@ -0,0 +1,220 @@
+"""
+Service Last Accessed Analyzer - Unused service detection for IAM principals
+"""
+
+import json
+import logging
+import os
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+
+class ServiceAccessAnalyzer:
+    def __init__(self, iam_manager, max_concurrency: int = 10, poll_batch_size: int = 20,
+                 initial_poll_delay: float = 1.0, max_poll_delay: float = 30.0,
+                 timeout: float = 900.0, cache_dir: str = '.cache/last_accessed'):
+        """Initialize analyzer on top of an existing IAM Manager"""
+        self.iam_manager = iam_manager
+        self.iam_client = iam_manager.iam_client
+        self.max_concurrency = max_concurrency
+        self.poll_batch_size = poll_batch_size
+        self.initial_poll_delay = initial_poll_delay
+        self.max_poll_delay = max_poll_delay
+        self.timeout = timeout
+        self.cache_dir = cache_dir
+
+    def analyze(self, audit_file: str, output_file: str,
+                unused_days: Optional[int] = None) -> Dict[str, Any]:
+        """Report unused services for every principal found in an audit report"""
+        try:
+            with open(audit_file, 'r') as f:
+                audit_data = json.load(f)
+
+            principals = self._principals_from_audit(audit_data)
+            cache = self._load_cache()
+
+            pending = [p for p in principals if p["arn"] not in cache]
+            cached = len(principals) - len(pending)
+            logger.info(f"Analyzing {len(principals)} principals ({cached} cached)")
+
+            jobs = self._submit_jobs(pending)
+            fetched = self._poll_jobs(jobs)
+            if fetched:
+                cache.update(fetched)
+                self._save_cache(cache)
+
+            report = self._build_report(principals, cache, unused_days)
+
+            with open(output_file, 'w') as f:
+                json.dump(report, f, indent=2, default=str)
+
+            logger.info(f"Service access analysis completed. Results saved to {output_file}")
+            return {"status": "success", "output_file": output_file, "summary": report["summary"]}
+
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to load audit report {audit_file}: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def _principals_from_audit(self, audit_data: Dict[str, Any]) -> List[Dict[str, str]]:
+        """Extract principal ARNs from an audit_permissions report"""
+        principals = []
+        for user in audit_data.get("users", []):
+            if user.get("arn"):
+                principals.append({"type": "user", "name": user["username"], "arn": user["arn"]})
+        for role in audit_data.get("roles", []):
+            if role.get("arn"):
+                principals.append({"type": "role", "name": role["role_name"], "arn": role["arn"]})
+        return principals
+
+    def _submit_jobs(self, principals: List[Dict[str, str]]) -> Dict[str, str]:
+        """Submit one last-accessed job per principal under the concurrency limit"""
+        jobs = {}
+        if not principals:
+            return jobs
+
+        def submit(arn: str) -> Optional[str]:
+            try:
+                response = self.iam_client.generate_service_last_accessed_details(Arn=arn)
+                return response['JobId']
+            except ClientError as e:
+                logger.error(f"Failed to submit last-accessed job for {arn}: {e}")
+                return None
+
+        arns = [p["arn"] for p in principals]
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            for arn, job_id in zip(arns, executor.map(submit, arns)):
+                if job_id:
+                    jobs[job_id] = arn
+
+        logger.info(f"Submitted {len(jobs)} last-accessed jobs")
+        return jobs
+
+    def _poll_jobs(self, jobs: Dict[str, str]) -> Dict[str, Any]:
+        """Poll outstanding jobs in batches with exponential backoff"""
+        results = {}
+        outstanding = deque(jobs)
+        delay = self.initial_poll_delay
+        deadline = time.monotonic() + self.timeout
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency) as executor:
+            while outstanding:
+                batch_size = min(self.poll_batch_size, len(outstanding))
+                batch = [outstanding.popleft() for _ in range(batch_size)]
+                finished = 0
+                for job_id, details in zip(batch, executor.map(self._get_job_details, batch)):
+                    if details is None:
+                        outstanding.append(job_id)
+                        continue
+                    finished += 1
+                    arn = jobs[job_id]
+                    if details["status"] == "COMPLETED":
+                        results[arn] = details["services"]
+                    else:
+                        logger.error(f"Last-accessed job for {arn} failed: {details.get('error')}")
+
+                if not outstanding:
+                    break
+                if time.monotonic() > deadline:
+                    logger.error(f"Timed out waiting for {len(outstanding)} last-accessed jobs")
+                    break
+
+                # Back off while jobs are still running, reset once they start completing
+                if finished:
+                    delay = self.initial_poll_delay
+                else:
+                    time.sleep(delay)
+                    delay = min(delay * 2, self.max_poll_delay)
+
+        return results
+
+    def _get_job_details(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Fetch all pages of a job's result, or None while it is still running"""
+        try:
+            services = []
+            kwargs = {"JobId": job_id}
+            while True:
+                response = self.iam_client.get_service_last_accessed_details(**kwargs)
+                if response['JobStatus'] == 'IN_PROGRESS':
+                    return None
+                if response['JobStatus'] == 'FAILED':
+                    return {"status": "FAILED", "error": response.get('Error', {}).get('Message')}
+
+                for service in response['ServicesLastAccessed']:
+                    services.append({
+                        "namespace": service['ServiceNamespace'],
+                        "name": service['ServiceName'],
+                        "last_authenticated": service.get('LastAuthenticated')
+                    })
+
+                if not response.get('IsTruncated'):
+                    return {"status": "COMPLETED", "services": services}
+                kwargs["Marker"] = response['Marker']
+
+        except ClientError as e:
+            return {"status": "FAILED", "error": str(e)}
+
+    def _build_report(self, principals: List[Dict[str, str]], cache: Dict[str, Any],
+                      unused_days: Optional[int]) -> Dict[str, Any]:
+        """Build the unused-service report from cached job results"""
+        cutoff = None
+        if unused_days is not None:
+            cutoff = datetime.now(timezone.utc) - timedelta(days=unused_days)
+
+        report = {"principals": [], "summary": {}}
+        for principal in principals:
+            services = cache.get(principal["arn"])
+            if services is None:
+                report["principals"].append(
+                    {**principal, "error": "No last-accessed data available"})
+                continue
+
+            unused = [s["namespace"] for s in services if self._is_unused(s, cutoff)]
+            report["principals"].append({
+                **principal,
+                "services_granted": len(services),
+                "unused_services": sorted(unused)
+            })
+
+        analyzed = [p for p in report["principals"] if "error" not in p]
+        report["summary"] = {
+            "total_principals": len(principals),
+            "analyzed_principals": len(analyzed),
+            "principals_with_unused_services": len([p for p in analyzed if p["unused_services"]]),
+            "unused_days": unused_days
+        }
+        return report
+
+    def _is_unused(self, service: Dict[str, Any], cutoff: Optional[datetime]) -> bool:
+        """Check whether a service was never used, or not used since the cutoff"""
+        last = service.get("last_authenticated")
+        if not last:
+            return True
+        if cutoff is None:
+            return False
+        if isinstance(last, str):
+            last = datetime.fromisoformat(last)
+        return last < cutoff
+
+    def _cache_file(self) -> str:
+        """Cache file for today's results, keyed by principal ARN"""
+        return os.path.join(self.cache_dir, f"{datetime.now(timezone.utc).date().isoformat()}.json")
+
+    def _load_cache(self) -> Dict[str, Any]:
+        """Load today's cached results"""
+        try:
+            with open(self._cache_file(), 'r') as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return {}
+
+    def _save_cache(self, cache: Dict[str, Any]):
+        """Persist today's cached results"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        with open(self._cache_file(), 'w') as f:
+            json.dump(cache, f, default=str)
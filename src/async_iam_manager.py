@@ -0,0 +1,351 @@
+"""
+Async IAM Manager - asyncio-native IAM operations handler
+"""
+
+import asyncio
+import functools
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import AsyncExitStack
+from botocore.exceptions import ClientError
+from typing import List, Dict, Any
+from iam_manager import IAMManager
+from utils.read_cache import AsyncReadCache
+from utils.policy_validator import PolicyValidator
+
+try:
+    from aiobotocore.config import AioConfig
+    from aiobotocore.session import get_session
+    AIOBOTOCORE_AVAILABLE = True
+except ImportError:  # Fall back to the sync client on a worker thread
+    AIOBOTOCORE_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncIAMManager:
+    def __init__(self, region: str = 'us-east-1', profile: str = 'default', dry_run: bool = False,
+                 max_concurrency: int = 100):
+        """Initialize async IAM Manager; use as ``async with AsyncIAMManager(...) as manager``"""
+        self.region = region
+        self.profile = profile
+        self.dry_run = dry_run
+        self.max_concurrency = max_concurrency
+        self.native = AIOBOTOCORE_AVAILABLE
+
+        self.iam_client = None
+        self._exit_stack = None
+        self._semaphore = None
+        self._executor = None
+        self.validator = PolicyValidator()
+
+        if not self.native:
+            # Without aiobotocore each call runs on a thread of a pool sized to max_concurrency
+            self.iam_client = IAMManager(region=region, profile=profile, dry_run=dry_run).iam_client
+
+        logger.info(f"Async IAM Manager initialized - Region: {region}, Profile: {profile}, "
+                    f"Dry Run: {dry_run}, Native: {self.native}")
+
+    async def __aenter__(self):
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._exit_stack = AsyncExitStack()
+        if not self.native:
+            # asyncio.to_thread would cap in-flight calls at the default executor's size
+            self._executor = self._exit_stack.enter_context(
+                ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='async-iam')
+            )
+        else:
+            session = get_session()
+            if self.profile != 'default':
+                session.set_config_variable('profile', self.profile)
+            # One pooled connection per allowed in-flight call
+            self.iam_client = await self._exit_stack.enter_async_context(
+                session.create_client('iam', region_name=self.region,
+                                      config=AioConfig(max_pool_connections=self.max_concurrency))
+            )
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        if self._exit_stack is not None:
+            await self._exit_stack.aclose()
+            self._exit_stack = None
+            self._executor = None
+            if self.native:
+                self.iam_client = None
+
+    async def _call(self, operation: str, **kwargs) -> Dict[str, Any]:
+        """Invoke an IAM operation under the concurrency limit"""
+        async with self._semaphore:
+            method = getattr(self.iam_client, operation)
+            if self.native:
+                return await method(**kwargs)
+            return await self._in_thread(functools.partial(method, **kwargs))
+
+    async def _in_thread(self, func):
+        """Run a blocking call on the manager's own worker pool"""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func)
+
+    async def _cached_call(self, read_cache: AsyncReadCache, operation: str,
+                           **kwargs) -> Dict[str, Any]:
+        """Invoke an idempotent IAM read operation through the run's read cache"""
+        key = (operation, tuple(sorted(kwargs.items())))
+        return await read_cache.get_or_load(key, lambda: self._call(operation, **kwargs))
+
+    async def _paginate(self, operation: str, result_key: str, **kwargs) -> List[Dict[str, Any]]:
+        """Collect all items of a paginated IAM operation"""
+        items = []
+        for page in await self._pages(operation, **kwargs):
+            items.extend(page[result_key])
+        return items
+
+    async def _pages(self, operation: str, **kwargs) -> List[Dict[str, Any]]:
+        """Collect all pages of a paginated IAM operation"""
+        paginator = self.iam_client.get_paginator(operation)
+        async with self._semaphore:
+            if self.native:
+                return [page async for page in paginator.paginate(**kwargs)]
+            return await self._in_thread(lambda: list(paginator.paginate(**kwargs)))
+
+    async def create_user(self, username: str, groups: List[str] = None,
+                          policies: List[str] = None) -> Dict[str, Any]:
+        """Create IAM user with optional groups and policies"""
+        try:
+            if self.dry_run:
+                logger.info(f"[DRY RUN] Would create user: {username}")
+                return {"status": "dry_run", "username": username}
+
+            # Create user
+            response = await self._call('create_user', UserName=username)
+            logger.info(f"Created user: {username}")
+
+            result = {"status": "success", "username": username, "arn": response['User']['Arn']}
+
+            async def add_to_group(group):
+                try:
+                    await self._call('add_user_to_group', GroupName=group, UserName=username)
+                    logger.info(f"Added user {username} to group {group}")
+                except ClientError as e:
+                    logger.error(f"Failed to add user to group {group}: {e}")
+
+            async def attach_policy(policy):
+                try:
+                    await self._call('attach_user_policy', UserName=username, PolicyArn=policy)
+                    logger.info(f"Attached policy {policy} to user {username}")
+                except ClientError as e:
+                    logger.error(f"Failed to attach policy {policy}: {e}")
+
+            await asyncio.gather(
+                *[add_to_group(group) for group in groups or []],
+                *[attach_policy(policy) for policy in policies or []]
+            )
+
+            return result
+
+        except ClientError as e:
+            logger.error(f"Failed to create user {username}: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def create_role(self, role_name: str, trust_policy_file: str,
+                          policies: List[str] = None) -> Dict[str, Any]:
+        """Create IAM role with trust policy"""
+        try:
+            # Load trust policy
+            with open(trust_policy_file, 'r') as f:
+                trust_policy = json.load(f)
+
+            # Validate locally, dry runs included, before spending an API call
+            errors = self.validator.validate_policy_document(
+                trust_policy, "trust", trust_policy_file)
+            if errors:
+                logger.error(f"Trust policy for role {role_name} failed validation: {errors}")
+                return {"status": "error", "message": "Trust policy failed validation",
+                        "errors": errors}
+
+            if self.dry_run:
+                logger.info(f"[DRY RUN] Would create role: {role_name}")
+                return {"status": "dry_run", "role_name": role_name}
+
+            # Create role
+            response = await self._call(
+                'create_role',
+                RoleName=role_name,
+                AssumeRolePolicyDocument=json.dumps(trust_policy)
+            )
+
+            logger.info(f"Created role: {role_name}")
+            result = {"status": "success", "role_name": role_name, "arn": response['Role']['Arn']}
+
+            async def attach_policy(policy):
+                try:
+                    await self._call('attach_role_policy', RoleName=role_name, PolicyArn=policy)
+                    logger.info(f"Attached policy {policy} to role {role_name}")
+                except ClientError as e:
+                    logger.error(f"Failed to attach policy {policy}: {e}")
+
+            await asyncio.gather(*[attach_policy(policy) for policy in policies or []])
+
+            return result
+
+        except (ClientError, FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to create role {role_name}: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def create_policy(self, policy_name: str, policy_file: str) -> Dict[str, Any]:
+        """Create IAM policy from file"""
+        try:
+            # Load policy document
+            with open(policy_file, 'r') as f:
+                policy_document = json.load(f)
+
+            # Validate locally, dry runs included, before spending an API call
+            errors = self.validator.validate_policy_document(
+                policy_document, "managed", policy_file)
+            if errors:
+                logger.error(f"Policy {policy_name} failed validation: {errors}")
+                return {"status": "error", "message": "Policy document failed validation",
+                        "errors": errors}
+
+            if self.dry_run:
+                logger.info(f"[DRY RUN] Would create policy: {policy_name}")
+                return {"status": "dry_run", "policy_name": policy_name}
+
+            # Create policy
+            response = await self._call(
+                'create_policy',
+                PolicyName=policy_name,
+                PolicyDocument=json.dumps(policy_document)
+            )
+
+            logger.info(f"Created policy: {policy_name}")
+            return {"status": "success", "policy_name": policy_name,
+                    "arn": response['Policy']['Arn']}
+
+        except (ClientError, FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to create policy {policy_name}: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def audit_permissions(self, output_file: str) -> Dict[str, Any]:
+        """Audit IAM permissions and generate report"""
+        try:
+            read_cache = AsyncReadCache()
+            audit_results = {
+                "users": [],
+                "roles": [],
+                "groups": [],
+                "policies": [],
+                "summary": {}
+            }
+
+            # Authorization details carry the policies, groups and tags of every user and role
+            groups, policies, detail_pages = await asyncio.gather(
+                self._paginate('list_groups', 'Groups'),
+                self._paginate('list_policies', 'Policies', Scope='Local'),
+                self._pages('get_account_authorization_details', Filter=['User', 'Role'])
+            )
+
+            # Audit groups once; users reference them by group ID
+            audit_results["groups"] = list(await asyncio.gather(
+                *[self._audit_group(group, read_cache) for group in groups]))
+            audit_results["policies"] = [IAMManager._policy_entry(policy) for policy in policies]
+
+            group_ids = {group["group_name"]: group["group_id"]
+                         for group in audit_results["groups"]}
+            for page in detail_pages:
+                audit_results["users"].extend(IAMManager._user_detail_entry(user, group_ids)
+                                              for user in page.get('UserDetailList', []))
+                audit_results["roles"].extend(IAMManager._role_detail_entry(role)
+                                              for role in page.get('RoleDetailList', []))
+
+            # Generate summary
+            audit_results["summary"] = IAMManager._build_audit_summary(audit_results)
+            audit_results["summary"]["read_cache"] = read_cache.stats()
+
+            # Save results
+            with open(output_file, 'w') as f:
+                json.dump(audit_results, f, indent=2, default=str)
+
+            hit_rate = audit_results['summary']['read_cache']['hit_rate']
+            logger.info(f"Audit completed. Results saved to {output_file} "
+                        f"(read cache hit rate: {hit_rate:.1%})")
+            return {"status": "success", "output_file": output_file}
+
+        except ClientError as e:
+            logger.error(f"Audit failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+    async def _audit_group(self, group: Dict[str, Any],
+                           read_cache: AsyncReadCache) -> Dict[str, Any]:
+        """Audit individual group permissions"""
+        group_info = {
+            "group_id": group['GroupId'],
+            "group_name": group['GroupName'],
+            "arn": group['Arn'],
+            "attached_policies": [],
+            "inline_policies": []
+        }
+
+        async def fetch(operation):
+            try:
+                return await self._cached_call(read_cache, operation, GroupName=group['GroupName'])
+            except ClientError:
+                return None
+
+        attached, inline = await asyncio.gather(
+            fetch('list_attached_group_policies'),
+            fetch('list_group_policies')
+        )
+
+        if attached is not None:
+            group_info["attached_policies"] = [p['PolicyArn'] for p in attached['AttachedPolicies']]
+        if inline is not None:
+            group_info["inline_policies"] = inline['PolicyNames']
+
+        return group_info
+
+    async def bulk_create_from_config(self, config_file: str) -> Dict[str, Any]:
+        """Create multiple IAM resources from configuration file"""
+        try:
+            config = IAMManager._load_config(config_file)
+
+            # Fail fast with every problem in the config before any mutating call
+            errors = self.validator.validate_bulk_config(config)
+            if errors:
+                logger.error(f"Config file {config_file} failed validation "
+                             f"with {len(errors)} errors")
+                return {"status": "error",
+                        "message": f"Config validation failed with {len(errors)} errors",
+                        "errors": errors}
+
+            users, roles, policies = await asyncio.gather(
+                asyncio.gather(*[
+                    self.create_user(
+                        user_config['name'],
+                        groups=user_config.get('groups', []),
+                        policies=user_config.get('policies', [])
+                    )
+                    for user_config in config.get('users', [])
+                ]),
+                asyncio.gather(*[
+                    self.create_role(
+                        role_config['name'],
+                        role_config['trust_policy_file'],
+                        policies=role_config.get('policies', [])
+                    )
+                    for role_config in config.get('roles', [])
+                ]),
+                asyncio.gather(*[
+                    self.create_policy(
+                        policy_config['name'],
+                        policy_config['policy_file']
+                    )
+                    for policy_config in config.get('policies', [])
+                ])
+            )
+
+            results = {"users": list(users), "roles": list(roles), "policies": list(policies)}
+            return {"status": "success", "results": results}
+
+        except (FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"Failed to process config file {config_file}: {e}")
+            return {"status": "error", "message": str(e)}
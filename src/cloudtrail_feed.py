@@ -0,0 +1,264 @@
+"""
+CloudTrail Feed - Incremental audit snapshot updates from CloudTrail IAM events
+"""
+
+import gzip
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple
+from botocore.exceptions import ClientError
+from utils.client_registry import registry as client_registry
+from utils.read_cache import ReadCache
+
+logger = logging.getLogger(__name__)
+
+# Request fields naming the entity an IAM event touches
+ENTITY_FIELDS = {
+    "userName": "user",
+    "newUserName": "user",
+    "roleName": "role",
+    "groupName": "group",
+    "newGroupName": "group",
+    "policyArn": "policy"
+}
+
+# Read-only calls without a readOnly flag in the record; they never change an entity
+READ_ONLY_EVENT_PREFIXES = ("Get", "List", "Generate", "Simulate")
+
+# Snapshot section and key field per entity type
+SECTIONS = {
+    "user": ("users", "username"),
+    "role": ("roles", "role_name"),
+    "group": ("groups", "group_name"),
+    "policy": ("policies", "arn")
+}
+
+# Event IDs remembered across runs to drop duplicate deliveries
+MAX_REMEMBERED_EVENT_IDS = 100000
+
+
+class CloudTrailFeed:
+    def __init__(self, iam_manager, snapshot_file: str, checkpoint_file: str = None,
+                 max_workers: int = 10, endpoint_url: str = None):
+        """Initialize feed consumer for a persisted audit snapshot"""
+        self.iam_manager = iam_manager
+        self.iam_client = iam_manager.iam_client
+        self.snapshot_file = snapshot_file
+        self.checkpoint_file = checkpoint_file or f"{snapshot_file}.checkpoint"
+        self.max_workers = max_workers
+        self.endpoint_url = endpoint_url
+        self._s3 = None
+
+    def sync(self, source: str) -> Dict[str, Any]:
+        """Apply all unprocessed CloudTrail log files from a directory or s3://bucket/prefix"""
+        try:
+            with open(self.snapshot_file, 'r') as f:
+                snapshot = json.load(f)
+            checkpoint = self._load_checkpoint()
+
+            processed = set(checkpoint["processed_files"])
+            pending = [name for name in self._list_files(source) if name not in processed]
+            if not pending:
+                logger.info("No new CloudTrail files to process")
+                return {"status": "success", "files_processed": 0, "events": 0}
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                batches = list(executor.map(lambda name: self._read_records(source, name), pending))
+
+            seen = set(checkpoint["recent_event_ids"])
+            events, duplicates = [], 0
+            for records in batches:
+                for record in records:
+                    if record.get('eventSource') != 'iam.amazonaws.com' or record.get('errorCode'):
+                        continue
+                    # Reads, including the audit's and this feed's own, change nothing
+                    if self._is_read_only(record):
+                        continue
+                    if record['eventID'] in seen:
+                        duplicates += 1
+                        continue
+                    seen.add(record['eventID'])
+                    events.append(record)
+            events.sort(key=lambda record: record['eventTime'])
+
+            touched = self._touched_entities(events)
+            refreshed, removed = self._apply(snapshot, touched)
+
+            self._write_json(self.snapshot_file, snapshot)
+            checkpoint["processed_files"].extend(pending)
+            recent = checkpoint["recent_event_ids"] + [record['eventID'] for record in events]
+            checkpoint["recent_event_ids"] = recent[-MAX_REMEMBERED_EVENT_IDS:]
+            if events:
+                checkpoint["last_event_time"] = events[-1]['eventTime']
+            self._write_json(self.checkpoint_file, checkpoint)
+
+            logger.info(f"Applied {len(events)} IAM events from {len(pending)} files: "
+                        f"{refreshed} entities refreshed, {removed} removed")
+            return {
+                "status": "success",
+                "files_processed": len(pending),
+                "events": len(events),
+                "duplicates": duplicates,
+                "entities_refreshed": refreshed,
+                "entities_removed": removed
+            }
+
+        except (ClientError, FileNotFoundError, json.JSONDecodeError) as e:
+            logger.error(f"CloudTrail sync failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+    @staticmethod
+    def _is_read_only(record: Dict[str, Any]) -> bool:
+        """True for events that cannot have changed an entity"""
+        read_only = record.get('readOnly')
+        if read_only is not None:
+            return read_only in (True, 'true')
+        return record.get('eventName', '').startswith(READ_ONLY_EVENT_PREFIXES)
+
+    def _touched_entities(self, events: List[Dict[str, Any]]) -> List[Tuple[str, str]]:
+        """Every (type, key) touched by the events, once each"""
+        touched = {}
+        for record in events:
+            fields = dict(record.get('requestParameters') or {})
+            # CreatePolicy only reports the new ARN in its response
+            policy = (record.get('responseElements') or {}).get('policy')
+            if isinstance(policy, dict) and policy.get('arn'):
+                fields.setdefault('policyArn', policy['arn'])
+
+            for field, entity_type in ENTITY_FIELDS.items():
+                value = fields.get(field)
+                if not value:
+                    continue
+                # AWS-managed policies are not part of the snapshot
+                if entity_type == "policy":
+                    parts = value.split(':')
+                    if len(parts) < 6 or parts[4] == 'aws':
+                        continue
+                touched[(entity_type, value)] = None
+
+        return list(touched)
+
+    def _apply(self, snapshot: Dict[str, Any], touched: List[Tuple[str, str]]) -> Tuple[int, int]:
+        """Re-fetch touched entities and update the snapshot in place"""
+        # Deletes are re-checked too: files arrive late and out of order, so a DeleteUser
+        # may be processed after the CreateUser that recreated the name
+        # Fresh cache so re-fetched entities never see reads from an earlier batch
+        read_cache = ReadCache()
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            fetched = list(executor.map(lambda key: self._fetch(*key, read_cache), touched))
+
+        indexes = {}
+        for entity_type, (section, key_field) in SECTIONS.items():
+            snapshot.setdefault(section, [])
+            indexes[entity_type] = {entry.get(key_field): i
+                                    for i, entry in enumerate(snapshot[section])}
+
+        removed = set()
+        for (entity_type, key), entry in zip(touched, fetched):
+            section, _ = SECTIONS[entity_type]
+            position = indexes[entity_type].get(key)
+            if entry is None:
+                if position is not None:
+                    removed.add((entity_type, key))
+            elif position is None:
+                indexes[entity_type][key] = len(snapshot[section])
+                snapshot[section].append(entry)
+            else:
+                snapshot[section][position] = entry
+
+        for entity_type, (section, key_field) in SECTIONS.items():
+            snapshot[section] = [entry for entry in snapshot[section]
+                                 if (entity_type, entry.get(key_field)) not in removed]
+
+        cache_stats = snapshot.get("summary", {}).get("read_cache")
+        snapshot["summary"] = self.iam_manager._build_audit_summary(snapshot)
+        if cache_stats is not None:
+            snapshot["summary"]["read_cache"] = cache_stats
+
+        return len([entry for entry in fetched if entry is not None]), len(removed)
+
+    def _fetch(self, entity_type: str, key: str, read_cache: ReadCache) -> Optional[Dict[str, Any]]:
+        """Build a fresh snapshot entry, or None if the entity no longer exists"""
+        try:
+            if entity_type == "user":
+                user = self.iam_client.get_user(UserName=key)['User']
+                entry = self.iam_manager._audit_user(key, read_cache)
+                entry["arn"] = user['Arn']
+                entry["tags"] = {tag['Key']: tag['Value'] for tag in user.get('Tags', [])}
+            elif entity_type == "role":
+                role = self.iam_client.get_role(RoleName=key)['Role']
+                entry = self.iam_manager._audit_role(key, read_cache)
+                entry["arn"] = role['Arn']
+                entry["tags"] = {tag['Key']: tag['Value'] for tag in role.get('Tags', [])}
+            elif entity_type == "group":
+                group = self.iam_client.get_group(GroupName=key, MaxItems=1)['Group']
+                entry = self.iam_manager._audit_group(group, read_cache)
+            else:
+                policy = self.iam_client.get_policy(PolicyArn=key)['Policy']
+                entry = self.iam_manager._policy_entry(policy)
+            return entry
+
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchEntity':
+                return None
+            raise
+
+    def _list_files(self, source: str) -> List[str]:
+        """List CloudTrail log files in name order"""
+        if source.startswith('s3://'):
+            bucket, prefix = self._parse_s3(source)
+            names = []
+            paginator = self._s3_client().get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                names.extend(obj['Key'] for obj in page.get('Contents', [])
+                             if obj['Key'].endswith('.json.gz'))
+            return sorted(names)
+
+        names = []
+        for root, _, files in os.walk(source):
+            for name in files:
+                if name.endswith('.json.gz'):
+                    names.append(os.path.relpath(os.path.join(root, name), source))
+        return sorted(names)
+
+    def _read_records(self, source: str, name: str) -> List[Dict[str, Any]]:
+        """Read the Records of one gzipped CloudTrail log file"""
+        if source.startswith('s3://'):
+            bucket, _ = self._parse_s3(source)
+            body = self._s3_client().get_object(Bucket=bucket, Key=name)['Body'].read()
+            return json.loads(gzip.decompress(body)).get('Records', [])
+
+        with gzip.open(os.path.join(source, name), 'rt') as f:
+            return json.load(f).get('Records', [])
+
+    def _s3_client(self):
+        """S3 client, optionally pointed at an S3-compatible endpoint"""
+        if self._s3 is None:
+            self._s3 = client_registry.client(
+                's3', self.iam_manager.region, self.iam_manager.profile,
+                self.iam_manager.role_arn, endpoint_url=self.endpoint_url)
+        return self._s3
+
+    @staticmethod
+    def _parse_s3(source: str) -> Tuple[str, str]:
+        """Split s3://bucket/prefix into bucket and prefix"""
+        bucket, _, prefix = source[len('s3://'):].partition('/')
+        return bucket, prefix
+
+    def _load_checkpoint(self) -> Dict[str, Any]:
+        """Load processed-file checkpoint"""
+        try:
+            with open(self.checkpoint_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {"processed_files": [], "recent_event_ids": [], "last_event_time": None}
+
+    @staticmethod
+    def _write_json(path: str, data: Dict[str, Any]):
+        """Write JSON atomically so an interrupted run never leaves a truncated file"""
+        temp_path = f"{path}.tmp"
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=2, default=str)
+        os.replace(temp_path, path)
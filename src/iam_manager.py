@@ -2,52 +2,65 @@
 IAM Manager - Core IAM operations handler
 """
 
-import boto3
 import json
+import os
 # import yaml  # Not available in Lambda by default
 import logging
 from botocore.exceptions import ClientError
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Callable
 from utils.policy_templates import PolicyTemplateManager
+from utils.read_cache import ReadCache
+from utils.policy_validator import PolicyValidator
+from utils.rate_limiter import RateLimiter
+from utils.client_registry import registry as client_registry
+from utils.tag_index import TagIndex
+from teardown_engine import TeardownEngine
+from key_rotation import KeyRotator, SecretSink
 
 logger = logging.getLogger(__name__)
 
+# IAM allows at most this many tags on a user or role, and tags or keys per Tag*/Untag* call
+MAX_TAGS_PER_CALL = 50
+
+
 class IAMManager:
-    def __init__(self, region: str = 'us-east-1', profile: str = 'default', dry_run: bool = False):
-        """Initialize IAM Manager with AWS session"""
+    def __init__(self, region: str = 'us-east-1', profile: str = 'default', dry_run: bool = False,
+                 role_arn: Optional[str] = None):
+        """Initialize IAM Manager over the process-wide shared AWS clients"""
         self.region = region
         self.profile = profile
         self.dry_run = dry_run
-        
-        # Initialize AWS session (Lambda uses IAM role, no profile needed)
-        if profile == 'default':
-            # In Lambda, use default session without profile
-            self.iam_client = boto3.client('iam', region_name=region)
-            self.sts_client = boto3.client('sts', region_name=region)
-        else:
-            # For local development with profiles
-            session = boto3.Session(profile_name=profile)
-            self.iam_client = session.client('iam', region_name=region)
-            self.sts_client = session.client('sts', region_name=region)
-        
+        self.role_arn = role_arn
+
+        # Sessions and pooled clients are shared per (profile, region, role), so managers are cheap
+        self.iam_client = client_registry.client('iam', region, profile, role_arn)
+        self.sts_client = client_registry.client('sts', region, profile, role_arn)
+
         # Initialize policy template manager
         self.policy_manager = PolicyTemplateManager()
-        
-        logger.info(f"IAM Manager initialized - Region: {region}, Profile: {profile}, Dry Run: {dry_run}")
+        self.validator = PolicyValidator()
+
+        # Shared pacing for bulk mutating calls, kept under the IAM API throttling limits
+        self.rate_limiter = RateLimiter(rate=float(os.getenv('IAM_MAX_CALLS_PER_SECOND', '10')))
 
-    def create_user(self, username: str, groups: List[str] = None, policies: List[str] = None) -> Dict[str, Any]:
+        logger.info(f"IAM Manager initialized - Region: {region}, Profile: {profile}, "
+                    f"Dry Run: {dry_run}")
+
+    def create_user(self, username: str, groups: List[str] = None,
+                    policies: List[str] = None) -> Dict[str, Any]:
         """Create IAM user with optional groups and policies"""
         try:
             if self.dry_run:
                 logger.info(f"[DRY RUN] Would create user: {username}")
                 return {"status": "dry_run", "username": username}
-            
+
             # Create user
             response = self.iam_client.create_user(UserName=username)
             logger.info(f"Created user: {username}")
-            
+
             result = {"status": "success", "username": username, "arn": response['User']['Arn']}
-            
+
             # Add to groups if specified
             if groups:
                 for group in groups:
@@ -56,7 +69,7 @@ class IAMManager:
                         logger.info(f"Added user {username} to group {group}")
                     except ClientError as e:
                         logger.error(f"Failed to add user to group {group}: {e}")
-            
+
             # Attach policies if specified
             if policies:
                 for policy in policies:
@@ -65,33 +78,42 @@ class IAMManager:
                         logger.info(f"Attached policy {policy} to user {username}")
                     except ClientError as e:
                         logger.error(f"Failed to attach policy {policy}: {e}")
-            
+
             return result
-            
+
         except ClientError as e:
             logger.error(f"Failed to create user {username}: {e}")
             return {"status": "error", "message": str(e)}
 
-    def create_role(self, role_name: str, trust_policy_file: str, policies: List[str] = None) -> Dict[str, Any]:
+    def create_role(self, role_name: str, trust_policy_file: str,
+                    policies: List[str] = None) -> Dict[str, Any]:
         """Create IAM role with trust policy"""
         try:
             # Load trust policy
             with open(trust_policy_file, 'r') as f:
                 trust_policy = json.load(f)
-            
+
+            # Validate locally, dry runs included, before spending an API call
+            errors = self.validator.validate_policy_document(trust_policy, "trust",
+                                                             trust_policy_file)
+            if errors:
+                logger.error(f"Trust policy for role {role_name} failed validation: {errors}")
+                return {"status": "error", "message": "Trust policy failed validation",
+                        "errors": errors}
+
             if self.dry_run:
                 logger.info(f"[DRY RUN] Would create role: {role_name}")
                 return {"status": "dry_run", "role_name": role_name}
-            
+
             # Create role
             response = self.iam_client.create_role(
                 RoleName=role_name,
                 AssumeRolePolicyDocument=json.dumps(trust_policy)
             )
-            
+
             logger.info(f"Created role: {role_name}")
             result = {"status": "success", "role_name": role_name, "arn": response['Role']['Arn']}
-            
+
             # Attach policies if specified
             if policies:
                 for policy in policies:
@@ -100,9 +122,9 @@ class IAMManager:
                         logger.info(f"Attached policy {policy} to role {role_name}")
                     except ClientError as e:
                         logger.error(f"Failed to attach policy {policy}: {e}")
-            
+
             return result
-            
+
         except (ClientError, FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"Failed to create role {role_name}: {e}")
             return {"status": "error", "message": str(e)}
@@ -113,105 +135,328 @@ class IAMManager:
             # Load policy document
             with open(policy_file, 'r') as f:
                 policy_document = json.load(f)
-            
+
+            # Validate locally, dry runs included, before spending an API call
+            errors = self.validator.validate_policy_document(policy_document, "managed",
+                                                             policy_file)
+            if errors:
+                logger.error(f"Policy {policy_name} failed validation: {errors}")
+                return {"status": "error", "message": "Policy document failed validation",
+                        "errors": errors}
+
             if self.dry_run:
                 logger.info(f"[DRY RUN] Would create policy: {policy_name}")
                 return {"status": "dry_run", "policy_name": policy_name}
-            
+
             # Create policy
             response = self.iam_client.create_policy(
                 PolicyName=policy_name,
                 PolicyDocument=json.dumps(policy_document)
             )
-            
+
             logger.info(f"Created policy: {policy_name}")
-            return {"status": "success", "policy_name": policy_name, "arn": response['Policy']['Arn']}
-            
+            return {"status": "success", "policy_name": policy_name,
+                    "arn": response['Policy']['Arn']}
+
         except (ClientError, FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"Failed to create policy {policy_name}: {e}")
             return {"status": "error", "message": str(e)}
 
-    def audit_permissions(self, output_file: str) -> Dict[str, Any]:
-        """Audit IAM permissions and generate report"""
+    def audit_permissions(self, output_file: str,
+                          progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None,
+                          selectors: List[str] = None) -> Dict[str, Any]:
+        """Audit IAM permissions and generate report.
+
+        progress_callback(kind, entry) sees each entry as it is built.
+        With tag selectors (e.g. ["team=payments"]) only matching users and roles are audited.
+        """
         try:
+            # One cache per run, passed down so concurrent audits on a shared manager never mix
+            read_cache = ReadCache()
+            # One authorization-details pass carries the policies, groups and tags of every
+            # user and role, so principals need no per-entity list calls
+            paginator = self.iam_client.get_paginator('get_account_authorization_details')
+            details = list(paginator.paginate(Filter=['User', 'Role']))
+            selected = None
+            if selectors:
+                tag_index = TagIndex.from_authorization_details(details)
+                selected = self.select_principals(selectors, tag_index)
             audit_results = {
                 "users": [],
                 "roles": [],
+                "groups": [],
                 "policies": [],
                 "summary": {}
             }
-            
-            # Audit users
-            paginator = self.iam_client.get_paginator('list_users')
+
+            # Audit groups once; users reference them by group ID
+            paginator = self.iam_client.get_paginator('list_groups')
             for page in paginator.paginate():
-                for user in page['Users']:
-                    user_info = self._audit_user(user['UserName'])
+                for group in page['Groups']:
+                    group_info = self._audit_group(group, read_cache)
+                    audit_results["groups"].append(group_info)
+                    self._report_progress(progress_callback, "group", group_info)
+
+            # Audit customer-managed policies
+            paginator = self.iam_client.get_paginator('list_policies')
+            for page in paginator.paginate(Scope='Local'):
+                for policy in page['Policies']:
+                    policy_info = self._policy_entry(policy)
+                    audit_results["policies"].append(policy_info)
+                    self._report_progress(progress_callback, "policy", policy_info)
+
+            # Audit users
+            group_ids = {group["group_name"]: group["group_id"]
+                         for group in audit_results["groups"]}
+            for page in details:
+                for user in page.get('UserDetailList', []):
+                    if selected is not None and user['UserName'] not in selected["users"]:
+                        continue
+                    user_info = self._user_detail_entry(user, group_ids)
                     audit_results["users"].append(user_info)
-            
+                    self._report_progress(progress_callback, "user", user_info)
+
             # Audit roles
-            paginator = self.iam_client.get_paginator('list_roles')
-            for page in paginator.paginate():
-                for role in page['Roles']:
-                    role_info = self._audit_role(role['RoleName'])
+            for page in details:
+                for role in page.get('RoleDetailList', []):
+                    if selected is not None and role['RoleName'] not in selected["roles"]:
+                        continue
+                    role_info = self._role_detail_entry(role)
                     audit_results["roles"].append(role_info)
-            
+                    self._report_progress(progress_callback, "role", role_info)
+
             # Generate summary
-            audit_results["summary"] = {
-                "total_users": len(audit_results["users"]),
-                "total_roles": len(audit_results["roles"]),
-                "users_with_policies": len([u for u in audit_results["users"] if u["attached_policies"]]),
-                "roles_with_policies": len([r for r in audit_results["roles"] if r["attached_policies"]])
-            }
-            
+            audit_results["summary"] = self._build_audit_summary(audit_results)
+            audit_results["summary"]["read_cache"] = read_cache.stats()
+
             # Save results
             with open(output_file, 'w') as f:
                 json.dump(audit_results, f, indent=2, default=str)
-            
-            logger.info(f"Audit completed. Results saved to {output_file}")
+
+            hit_rate = audit_results['summary']['read_cache']['hit_rate']
+            logger.info(f"Audit completed. Results saved to {output_file} "
+                        f"(read cache hit rate: {hit_rate:.1%})")
             return {"status": "success", "output_file": output_file}
-            
-        except ClientError as e:
+
+        except (ClientError, ValueError) as e:
             logger.error(f"Audit failed: {e}")
             return {"status": "error", "message": str(e)}
 
-    def _audit_user(self, username: str) -> Dict[str, Any]:
+    def load_tag_index(self) -> TagIndex:
+        """Build a tag index from one paginated get_account_authorization_details pass"""
+        paginator = self.iam_client.get_paginator('get_account_authorization_details')
+        tag_index = TagIndex.from_authorization_details(paginator.paginate(Filter=['User', 'Role']))
+        logger.info(f"Tag index built for {len(tag_index)} principals")
+        return tag_index
+
+    def select_principals(self, selectors: List[str],
+                          tag_index: Optional[TagIndex] = None) -> Dict[str, List[str]]:
+        """Users and roles whose tags match every selector (key=value or key)"""
+        if tag_index is None:
+            tag_index = self.load_tag_index()
+        return {
+            "users": tag_index.select(selectors, kind="user"),
+            "roles": tag_index.select(selectors, kind="role")
+        }
+
+    def bulk_tag(self, tags: Dict[str, str], users: List[str] = None, roles: List[str] = None,
+                 max_workers: int = 10) -> Dict[str, Any]:
+        """Apply tags to many users and roles concurrently"""
+        if len(tags) > MAX_TAGS_PER_CALL:
+            # Every call would fail with LimitExceeded, so do not make any
+            message = (f"IAM allows at most {MAX_TAGS_PER_CALL} tags per user or role, "
+                       f"got {len(tags)}")
+            logger.error(f"Cannot apply tags: {message}")
+            return {"status": "error", "message": message}
+        tag_list = [{"Key": key, "Value": value} for key, value in tags.items()]
+        calls = {"user": ('tag_user', 'UserName', 'Tags'), "role": ('tag_role', 'RoleName', 'Tags')}
+        return self._bulk_tag_calls("tag", calls, tag_list, users, roles, max_workers)
+
+    def bulk_untag(self, tag_keys: List[str], users: List[str] = None, roles: List[str] = None,
+                   max_workers: int = 10) -> Dict[str, Any]:
+        """Remove tag keys from many users and roles concurrently"""
+        calls = {"user": ('untag_user', 'UserName', 'TagKeys'),
+                 "role": ('untag_role', 'RoleName', 'TagKeys')}
+        return self._bulk_tag_calls("untag", calls, list(tag_keys), users, roles, max_workers)
+
+    def _bulk_tag_calls(self, action: str, calls: Dict[str, tuple], items: List[Any],
+                        users: List[str], roles: List[str], max_workers: int) -> Dict[str, Any]:
+        """Run one tagging call per principal and batch of up to MAX_TAGS_PER_CALL items"""
+        principals = ([("user", name) for name in users or []]
+                      + [("role", name) for name in roles or []])
+        batches = [items[i:i + MAX_TAGS_PER_CALL] for i in range(0, len(items), MAX_TAGS_PER_CALL)]
+
+        if self.dry_run:
+            logger.info(f"[DRY RUN] Would {action} {len(principals)} principals "
+                        f"with {len(items)} tags")
+            return {"status": "dry_run", "principals": len(principals),
+                    "calls": len(principals) * len(batches)}
+
+        def apply(principal):
+            kind, name = principal
+            operation, name_param, items_param = calls[kind]
+            try:
+                for batch in batches:
+                    self.rate_limiter.acquire()
+                    getattr(self.iam_client, operation)(**{name_param: name, items_param: batch})
+                logger.info(f"{action.capitalize()}ged {kind} {name} ({len(items)} tags)")
+                return {"type": kind, "name": name, "status": "success"}
+            except ClientError as e:
+                logger.error(f"Failed to {action} {kind} {name}: {e}")
+                return {"type": kind, "name": name, "status": "error", "message": str(e)}
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(apply, principals))
+
+        failed = len([r for r in results if r["status"] == "error"])
+        if not failed:
+            status = "success"
+        else:
+            status = "error" if failed == len(principals) else "partial"
+        return {
+            "status": status,
+            "results": results,
+            "summary": {"principals": len(principals), "succeeded": len(principals) - failed,
+                        "failed": failed}
+        }
+
+    @staticmethod
+    def _report_progress(progress_callback: Optional[Callable[[str, Dict[str, Any]], None]],
+                         kind: str, entry: Dict[str, Any]):
+        """Forward a finished entry to the progress callback, never failing the run"""
+        if progress_callback is None:
+            return
+        try:
+            progress_callback(kind, entry)
+        except Exception as e:
+            logger.warning(f"Progress callback failed for {kind}: {e}")
+
+    def _cached_read(self, read_cache: ReadCache, operation: str, **kwargs) -> Dict[str, Any]:
+        """Call an idempotent IAM read operation through the run's read cache"""
+        key = (operation, tuple(sorted(kwargs.items())))
+        return read_cache.get_or_load(key, lambda: getattr(self.iam_client, operation)(**kwargs))
+
+    @staticmethod
+    def _build_audit_summary(audit_results: Dict[str, Any]) -> Dict[str, Any]:
+        """Generate summary counts for an audit report"""
+        users, roles = audit_results["users"], audit_results["roles"]
+        policies = audit_results.get("policies", [])
+        return {
+            "total_users": len(users),
+            "total_roles": len(roles),
+            "users_with_policies": len([u for u in users if u.get("attached_policies")]),
+            "roles_with_policies": len([r for r in roles if r.get("attached_policies")]),
+            "total_groups": len(audit_results.get("groups", [])),
+            "total_policies": len(policies),
+            "unattached_policies": len([p for p in policies if p["attachment_count"] == 0])
+        }
+
+    @staticmethod
+    def _policy_entry(policy: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the audit entry for a managed policy"""
+        return {
+            "policy_id": policy['PolicyId'],
+            "policy_name": policy['PolicyName'],
+            "arn": policy['Arn'],
+            "attachment_count": policy.get('AttachmentCount', 0),
+            "default_version_id": policy.get('DefaultVersionId')
+        }
+
+    @staticmethod
+    def _user_detail_entry(user: Dict[str, Any], group_ids: Dict[str, str]) -> Dict[str, Any]:
+        """Build the audit entry for a user from its authorization details"""
+        return {
+            "username": user['UserName'],
+            "attached_policies": [p['PolicyArn'] for p in user.get('AttachedManagedPolicies', [])],
+            "groups": list(user.get('GroupList', [])),
+            "group_ids": [group_ids[name] for name in user.get('GroupList', [])
+                          if name in group_ids],
+            "inline_policies": [p['PolicyName'] for p in user.get('UserPolicyList', [])],
+            "arn": user['Arn'],
+            "tags": {tag['Key']: tag['Value'] for tag in user.get('Tags', [])}
+        }
+
+    @staticmethod
+    def _role_detail_entry(role: Dict[str, Any]) -> Dict[str, Any]:
+        """Build the audit entry for a role from its authorization details"""
+        return {
+            "role_name": role['RoleName'],
+            "attached_policies": [p['PolicyArn'] for p in role.get('AttachedManagedPolicies', [])],
+            "inline_policies": [p['PolicyName'] for p in role.get('RolePolicyList', [])],
+            "arn": role['Arn'],
+            "tags": {tag['Key']: tag['Value'] for tag in role.get('Tags', [])}
+        }
+
+    def _audit_group(self, group: Dict[str, Any], read_cache: ReadCache) -> Dict[str, Any]:
+        """Audit individual group permissions"""
+        group_info = {
+            "group_id": group['GroupId'],
+            "group_name": group['GroupName'],
+            "arn": group['Arn'],
+            "attached_policies": [],
+            "inline_policies": []
+        }
+
+        # Get attached policies
+        try:
+            response = self._cached_read(read_cache, 'list_attached_group_policies',
+                                         GroupName=group['GroupName'])
+            group_info["attached_policies"] = [p['PolicyArn'] for p in response['AttachedPolicies']]
+        except ClientError:
+            pass
+
+        # Get inline policies
+        try:
+            response = self._cached_read(read_cache, 'list_group_policies',
+                                         GroupName=group['GroupName'])
+            group_info["inline_policies"] = response['PolicyNames']
+        except ClientError:
+            pass
+
+        return group_info
+
+    def _audit_user(self, username: str, read_cache: ReadCache) -> Dict[str, Any]:
         """Audit individual user permissions"""
         try:
             user_info = {
                 "username": username,
                 "attached_policies": [],
                 "groups": [],
+                "group_ids": [],
                 "inline_policies": []
             }
-            
+
             # Get attached policies
             try:
-                response = self.iam_client.list_attached_user_policies(UserName=username)
-                user_info["attached_policies"] = [p['PolicyArn'] for p in response['AttachedPolicies']]
+                response = self._cached_read(read_cache, 'list_attached_user_policies',
+                                             UserName=username)
+                user_info["attached_policies"] = [p['PolicyArn']
+                                                  for p in response['AttachedPolicies']]
             except ClientError:
                 pass
-            
+
             # Get groups
             try:
-                response = self.iam_client.list_groups_for_user(UserName=username)
+                response = self._cached_read(read_cache, 'list_groups_for_user', UserName=username)
                 user_info["groups"] = [g['GroupName'] for g in response['Groups']]
+                user_info["group_ids"] = [g['GroupId'] for g in response['Groups']]
             except ClientError:
                 pass
-            
+
             # Get inline policies
             try:
-                response = self.iam_client.list_user_policies(UserName=username)
+                response = self._cached_read(read_cache, 'list_user_policies', UserName=username)
                 user_info["inline_policies"] = response['PolicyNames']
             except ClientError:
                 pass
-            
+
             return user_info
-            
+
         except ClientError as e:
             logger.error(f"Failed to audit user {username}: {e}")
             return {"username": username, "error": str(e)}
 
-    def _audit_role(self, role_name: str) -> Dict[str, Any]:
+    def _audit_role(self, role_name: str, read_cache: ReadCache) -> Dict[str, Any]:
         """Audit individual role permissions"""
         try:
             role_info = {
@@ -219,38 +464,72 @@ class IAMManager:
                 "attached_policies": [],
                 "inline_policies": []
             }
-            
+
             # Get attached policies
             try:
-                response = self.iam_client.list_attached_role_policies(RoleName=role_name)
-                role_info["attached_policies"] = [p['PolicyArn'] for p in response['AttachedPolicies']]
+                response = self._cached_read(read_cache, 'list_attached_role_policies',
+                                             RoleName=role_name)
+                role_info["attached_policies"] = [p['PolicyArn']
+                                                  for p in response['AttachedPolicies']]
             except ClientError:
                 pass
-            
+
             # Get inline policies
             try:
-                response = self.iam_client.list_role_policies(RoleName=role_name)
+                response = self._cached_read(read_cache, 'list_role_policies', RoleName=role_name)
                 role_info["inline_policies"] = response['PolicyNames']
             except ClientError:
                 pass
-            
+
             return role_info
-            
+
         except ClientError as e:
             logger.error(f"Failed to audit role {role_name}: {e}")
             return {"role_name": role_name, "error": str(e)}
 
-    def bulk_create_from_config(self, config_file: str) -> Dict[str, Any]:
-        """Create multiple IAM resources from configuration file"""
+    def bulk_delete(self, users: List[str] = None, roles: List[str] = None,
+                    policies: List[str] = None, max_workers: int = 10) -> Dict[str, Any]:
+        """Delete users, roles and policies with all their dependents (plan only in dry run mode)"""
+        return TeardownEngine(self, max_workers=max_workers).teardown(users, roles, policies)
+
+    def rotate_access_keys(self, sink: SecretSink, max_age_days: int = 90, stage: str = "created",
+                           state_file: str = 'key_rotation_state.json',
+                           max_workers: int = 10) -> Dict[str, Any]:
+        """Rotate access keys older than max_age_days, advancing each user up to the given stage"""
+        rotator = KeyRotator(self, sink, state_file=state_file, max_workers=max_workers)
+        return rotator.rotate(max_age_days=max_age_days, target_stage=stage)
+
+    @staticmethod
+    def _load_config(config_file: str) -> Dict[str, Any]:
+        """Load bulk configuration file"""
+        with open(config_file, 'r') as f:
+            if config_file.endswith('.yaml') or config_file.endswith('.yml'):
+                raise Exception("YAML files not supported in Lambda. Use JSON instead.")
+            else:
+                return json.load(f)
+
+    def bulk_create_from_config(
+            self, config_file: str,
+            progress_callback: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """Create multiple IAM resources from configuration file.
+
+        progress_callback(kind, result) sees each result as it finishes.
+        """
         try:
-            with open(config_file, 'r') as f:
-                if config_file.endswith('.yaml') or config_file.endswith('.yml'):
-                    raise Exception("YAML files not supported in Lambda. Use JSON instead.")
-                else:
-                    config = json.load(f)
-            
+            config = self._load_config(config_file)
+
+            # Fail fast with every problem in the config before any mutating call
+            errors = self.validator.validate_bulk_config(config)
+            if errors:
+                logger.error(f"Config file {config_file} failed validation "
+                             f"with {len(errors)} errors")
+                return {"status": "error",
+                        "message": f"Config validation failed with {len(errors)} errors",
+                        "errors": errors}
+
             results = {"users": [], "roles": [], "policies": []}
-            
+
             # Create users
             if 'users' in config:
                 for user_config in config['users']:
@@ -260,7 +539,8 @@ class IAMManager:
                         policies=user_config.get('policies', [])
                     )
                     results["users"].append(result)
-            
+                    self._report_progress(progress_callback, "user", result)
+
             # Create roles
             if 'roles' in config:
                 for role_config in config['roles']:
@@ -270,7 +550,8 @@ class IAMManager:
                         policies=role_config.get('policies', [])
                     )
                     results["roles"].append(result)
-            
+                    self._report_progress(progress_callback, "role", result)
+
             # Create policies
             if 'policies' in config:
                 for policy_config in config['policies']:
@@ -279,9 +560,10 @@ class IAMManager:
                         policy_config['policy_file']
                     )
                     results["policies"].append(result)
-            
+                    self._report_progress(progress_callback, "policy", result)
+
             return {"status": "success", "results": results}
-            
+
         except (FileNotFoundError, json.JSONDecodeError) as e:
             logger.error(f"Failed to process config file {config_file}: {e}")
-            return {"status": "error", "message": str(e)}
\ No newline at end of file
+            return {"status": "error", "message": str(e)}
@@ -0,0 +1,266 @@
+"""
+Access Key Rotation - Staged, resumable rotation of IAM user access keys
+"""
+
+import csv
+import io
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Dict, Any, Optional
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+# Rotation stages in order; each run advances users up to a target stage
+STAGES = ("created", "deactivated", "deleted")
+
+# Recorded just before create_access_key so a crash there can be reconciled on resume
+CREATING = "creating"
+
+
+class SecretSink:
+    """Destination for newly created secret access keys"""
+
+    def store(self, username: str, access_key: Dict[str, Any]):
+        """Persist a new key; raise to abort the rotation for this user"""
+        raise NotImplementedError
+
+
+class EncryptedFileSink(SecretSink):
+    """Local stand-in for a secrets manager: one Fernet-encrypted JSON record per line"""
+
+    def __init__(self, path: str, key: Optional[str] = None):
+        """Initialize sink; the key defaults to the ROTATION_SINK_KEY environment variable"""
+        try:
+            from cryptography.fernet import Fernet
+        except ImportError:
+            raise RuntimeError("EncryptedFileSink requires the 'cryptography' package")
+
+        key = key or os.getenv('ROTATION_SINK_KEY')
+        if not key:
+            raise RuntimeError("Set ROTATION_SINK_KEY to a Fernet key (Fernet.generate_key())")
+
+        self.path = path
+        self._fernet = Fernet(key)
+        self._lock = threading.Lock()
+
+    def store(self, username: str, access_key: Dict[str, Any]):
+        record = json.dumps({
+            "username": username,
+            "access_key_id": access_key['AccessKeyId'],
+            "secret_access_key": access_key['SecretAccessKey'],
+            "created": str(access_key.get('CreateDate'))
+        })
+        token = self._fernet.encrypt(record.encode()).decode()
+        with self._lock:
+            with open(self.path, 'a') as f:
+                f.write(token + '\n')
+                f.flush()
+                os.fsync(f.fileno())
+
+    def read_all(self) -> List[Dict[str, Any]]:
+        """Decrypt every stored record"""
+        with open(self.path, 'r') as f:
+            return [json.loads(self._fernet.decrypt(line.strip().encode()))
+                    for line in f if line.strip()]
+
+
+class KeyRotator:
+    def __init__(self, iam_manager, sink: SecretSink, state_file: str = 'key_rotation_state.json',
+                 max_workers: int = 10, report_timeout: float = 120.0):
+        """Initialize rotator on top of an existing IAM Manager"""
+        self.iam_manager = iam_manager
+        self.iam_client = iam_manager.iam_client
+        self.rate_limiter = iam_manager.rate_limiter
+        self.dry_run = iam_manager.dry_run
+        self.sink = sink
+        self.state_file = state_file
+        self.max_workers = max_workers
+        self.report_timeout = report_timeout
+        self._state_lock = threading.Lock()
+        self.state = self._load_state()
+
+    def rotate(self, max_age_days: int = 90, target_stage: str = "created") -> Dict[str, Any]:
+        """Advance stale keys to target_stage: 'created', 'deactivated' or 'deleted'"""
+        try:
+            if target_stage not in STAGES:
+                raise ValueError(f"Unknown stage {target_stage}; "
+                                 f"expected one of {', '.join(STAGES)}")
+
+            # Users already mid-rotation continue; new candidates come from the credential report
+            candidates = self._stale_key_users(max_age_days)
+            in_progress = {u for u, s in self.state.items() if s["stage"] != "deleted"}
+            usernames = sorted(set(candidates) | in_progress)
+
+            if self.dry_run:
+                logger.info(f"[DRY RUN] Would advance {len(usernames)} users "
+                            f"to stage {target_stage}")
+                return {"status": "dry_run", "users": usernames, "target_stage": target_stage}
+
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(
+                    lambda username: self._advance(username, max_age_days, target_stage), usernames
+                ))
+
+            summary = {}
+            for result in results:
+                summary[result["status"]] = summary.get(result["status"], 0) + 1
+            logger.info(f"Key rotation to stage {target_stage} finished: {summary}")
+            return {"status": "success", "target_stage": target_stage, "results": results,
+                    "summary": summary}
+
+        except (ClientError, ValueError, TimeoutError) as e:
+            logger.error(f"Key rotation failed: {e}")
+            return {"status": "error", "message": str(e)}
+
+    def _stale_key_users(self, max_age_days: int) -> List[str]:
+        """Users with an active key older than max_age_days, from one credential report read"""
+        deadline = time.monotonic() + self.report_timeout
+        while self.iam_client.generate_credential_report()['State'] != 'COMPLETE':
+            if time.monotonic() > deadline:
+                raise TimeoutError("Credential report was not ready in time")
+            time.sleep(2)
+
+        content = self.iam_client.get_credential_report()['Content'].decode('utf-8')
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+
+        users = []
+        for row in csv.DictReader(io.StringIO(content)):
+            if row['user'] == '<root_account>':
+                continue
+            for slot in ('1', '2'):
+                rotated = row.get(f'access_key_{slot}_last_rotated')
+                active = row.get(f'access_key_{slot}_active') == 'true'
+                if active and rotated not in (None, '', 'N/A'):
+                    if datetime.fromisoformat(rotated.replace('Z', '+00:00')) < cutoff:
+                        users.append(row['user'])
+                        break
+        return users
+
+    def _advance(self, username: str, max_age_days: int, target_stage: str) -> Dict[str, Any]:
+        """Move one user through the stages, recording each step before the next"""
+        try:
+            entry = self.state.get(username)
+            if entry is None or entry["stage"] in (CREATING, "deleted"):
+                # A finished user is only here because the report flagged them again
+                entry = self._create(username, max_age_days, previous=entry)
+                if "status" in entry:
+                    return entry
+
+            target = STAGES.index(target_stage)
+            if STAGES.index(entry["stage"]) < STAGES.index("deactivated") <= target:
+                self._call('update_access_key', UserName=username,
+                           AccessKeyId=entry["old_key_id"], Status='Inactive')
+                self._record(username, dict(entry, stage="deactivated"))
+                entry = self.state[username]
+                logger.info(f"Deactivated old access key {entry['old_key_id']} for {username}")
+
+            if STAGES.index(entry["stage"]) < STAGES.index("deleted") <= target:
+                self._call('delete_access_key', UserName=username, AccessKeyId=entry["old_key_id"])
+                self._record(username, dict(entry, stage="deleted"))
+                entry = self.state[username]
+                logger.info(f"Deleted old access key {entry['old_key_id']} for {username}")
+
+            return {"username": username, "status": entry["stage"],
+                    "new_key_id": entry["new_key_id"]}
+
+        except ClientError as e:
+            logger.error(f"Failed to rotate access key for {username}: {e}")
+            return {"username": username, "status": "error", "message": str(e)}
+
+    def _create(self, username: str, max_age_days: int,
+                previous: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """Create the replacement key and hand its secret to the sink; past cycles go to history"""
+        keys = self.iam_client.list_access_keys(UserName=username)['AccessKeyMetadata']
+        history = previous.get("history", []) if previous else []
+        if previous and previous["stage"] == CREATING:
+            # The last run stopped between create_access_key and recording the new key, so its
+            # secret may never have reached the sink; remove the orphan and start over
+            for key in keys:
+                if key['AccessKeyId'] not in previous["known_key_ids"]:
+                    self._call('delete_access_key', UserName=username,
+                               AccessKeyId=key['AccessKeyId'])
+                    logger.warning(f"Deleted unrecorded access key {key['AccessKeyId']} "
+                                   f"for {username} left by an interrupted rotation")
+            keys = [k for k in keys if k['AccessKeyId'] in previous["known_key_ids"]]
+        elif previous:
+            history = history + [{k: v for k, v in previous.items() if k != "history"}]
+
+        cutoff = datetime.now(timezone.utc) - timedelta(days=max_age_days)
+        stale = [k for k in keys if k['Status'] == 'Active' and k['CreateDate'] < cutoff]
+
+        skipped = None
+        if not stale:
+            skipped = "no stale active key"
+        elif len(keys) >= 2:
+            # A new key would exceed the two-key limit; never delete a key here that was not rotated
+            skipped = "user already has two access keys"
+        if skipped:
+            if previous and previous["stage"] == CREATING:
+                self._restore(username, history)
+            return {"username": username, "status": "skipped", "message": skipped}
+
+        creating = {"old_key_id": stale[0]['AccessKeyId'],
+                    "known_key_ids": [k['AccessKeyId'] for k in keys], "stage": CREATING}
+        if history:
+            creating["history"] = history
+        self._record(username, creating)
+
+        new_key = self._call('create_access_key', UserName=username)['AccessKey']
+        try:
+            self.sink.store(username, new_key)
+        except Exception as e:
+            # Without a stored secret the new key is useless; remove it so the user keeps one key
+            self._call('delete_access_key', UserName=username, AccessKeyId=new_key['AccessKeyId'])
+            self._restore(username, history)
+            logger.error(f"Failed to store new access key for {username}: {e}")
+            return {"username": username, "status": "error", "message": f"secret sink failed: {e}"}
+
+        entry = {"old_key_id": stale[0]['AccessKeyId'], "new_key_id": new_key['AccessKeyId'],
+                 "stage": "created"}
+        if history:
+            entry["history"] = history
+        self._record(username, entry)
+        logger.info(f"Created access key {new_key['AccessKeyId']} for {username}")
+        return entry
+
+    def _call(self, operation: str, **kwargs) -> Dict[str, Any]:
+        """Make a mutating IAM call under the shared rate limiter"""
+        self.rate_limiter.acquire()
+        return getattr(self.iam_client, operation)(**kwargs)
+
+    def _restore(self, username: str, history: List[Dict[str, Any]]):
+        """Drop an abandoned creation, going back to the last finished cycle if there was one"""
+        if not history:
+            self._record(username, None)
+            return
+        restored = dict(history[-1])
+        if len(history) > 1:
+            restored["history"] = history[:-1]
+        self._record(username, restored)
+
+    def _record(self, username: str, entry: Optional[Dict[str, Any]]):
+        """Persist a user's stage so an interrupted run resumes from it; None forgets the user"""
+        with self._state_lock:
+            if entry is None:
+                self.state.pop(username, None)
+            else:
+                self.state[username] = dict(entry,
+                                            updated_at=datetime.now(timezone.utc).isoformat())
+            temp_path = f"{self.state_file}.tmp"
+            with open(temp_path, 'w') as f:
+                json.dump(self.state, f, indent=2)
+            os.replace(temp_path, self.state_file)
+
+    def _load_state(self) -> Dict[str, Any]:
+        """Load rotation state from a previous run"""
+        try:
+            with open(self.state_file, 'r') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            return {}
@@ -2,107 +2,93 @@
 AWS Lambda handler for IAM automation tool
 """
 
+import hashlib
 import json
 import logging
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
 from iam_manager import IAMManager
+import sharded_audit
+from manager_cache import get_iam_manager, with_json_file
+from utils.idempotency import IdempotencyCache
 from utils.logger import setup_logger
+from utils.profiling import RunProfiler
 
 # Setup logging
 setup_logger()
 logger = logging.getLogger(__name__)
 
+# Records processed concurrently within one batched invocation
+BATCH_MAX_WORKERS = int(os.environ.get('LAMBDA_BATCH_MAX_WORKERS', '10'))
+
+# Message IDs that already succeeded in this warm container, so redeliveries are not re-run
+_processed_messages = IdempotencyCache(
+    ttl_seconds=float(os.environ.get('LAMBDA_DEDUP_TTL_SECONDS', '3600')))
+
+
 def lambda_handler(event, context):
     """
     Lambda function handler for IAM automation
-    
+
     Expected event structure:
     {
-        "action": "create_user|create_role|create_policy|audit",
+        "action": "create_user|create_role|create_policy|audit|audit_shard",
         "parameters": {
             // Action-specific parameters
         }
     }
+
+    Batched event sources (SQS) deliver {"Records": [...]} whose bodies have the same
+    structure; the response then lists failed records as batchItemFailures.
+
+    Set "profile_run": true in the event (or PROFILE_RUN=true for the whole function)
+    to profile the invocation; the hotspot report is logged and written to PROFILE_OUTPUT_DIR.
     """
+    if not (event.get('profile_run') or os.environ.get('PROFILE_RUN', 'false').lower() == 'true'):
+        return _handle_event(event)
+
+    request_id = getattr(context, 'aws_request_id', None) or str(int(time.time() * 1000))
+    output_dir = os.environ.get('PROFILE_OUTPUT_DIR', tempfile.gettempdir())
+    profiler = RunProfiler(os.path.join(output_dir, f"profile-{request_id}"))
+    profiler.start()
+    try:
+        response = _handle_event(event)
+    finally:
+        summary = profiler.stop()
+        # /tmp does not outlive the container; the log keeps the report for later diagnosis
+        with open(summary['report_file'], 'r') as f:
+            logger.info(f"Profile for request {request_id}:\n{f.read()}")
+
+    # Batch responses must keep the shape the event source mapping expects
+    if 'statusCode' in response:
+        body = json.loads(response['body'])
+        body['profile'] = summary
+        response['body'] = json.dumps(body)
+    return response
+
+
+def _handle_event(event: Dict[str, Any]) -> Dict[str, Any]:
+    """Dispatch a single action event or a batch of records"""
+    if 'Records' in event:
+        return _process_records(event['Records'])
+
     try:
-        # Initialize IAM Manager
-        iam_manager = IAMManager(
+        iam_manager = get_iam_manager(
             region=event.get('region', 'us-east-1'),
             dry_run=event.get('dry_run', False)
         )
-        
-        action = event.get('action')
-        parameters = event.get('parameters', {})
-        
-        if action == 'create_user':
-            result = iam_manager.create_user(
-                username=parameters['username'],
-                groups=parameters.get('groups', []),
-                policies=parameters.get('policies', [])
-            )
-        
-        elif action == 'create_role':
-            # For Lambda, trust policy should be provided in parameters
-            trust_policy = parameters.get('trust_policy')
-            if not trust_policy:
-                raise ValueError("Trust policy is required for role creation")
-            
-            # Create temporary file for trust policy
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                json.dump(trust_policy, f)
-                trust_policy_file = f.name
-            
-            try:
-                result = iam_manager.create_role(
-                    role_name=parameters['role_name'],
-                    trust_policy_file=trust_policy_file,
-                    policies=parameters.get('policies', [])
-                )
-            finally:
-                # Clean up temporary file
-                import os
-                os.unlink(trust_policy_file)
-        
-        elif action == 'create_policy':
-            # For Lambda, policy document should be provided in parameters
-            policy_document = parameters.get('policy_document')
-            if not policy_document:
-                raise ValueError("Policy document is required for policy creation")
-            
-            # Create temporary file for policy document
-            import tempfile
-            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-                json.dump(policy_document, f)
-                policy_file = f.name
-            
-            try:
-                result = iam_manager.create_policy(
-                    policy_name=parameters['policy_name'],
-                    policy_file=policy_file
-                )
-            finally:
-                # Clean up temporary file
-                import os
-                os.unlink(policy_file)
-        
-        elif action == 'audit':
-            # For Lambda, return audit results directly instead of saving to file
-            result = iam_manager.audit_permissions('/tmp/audit_results.json')
-            
-            # Read the audit results and include in response
-            if result['status'] == 'success':
-                with open('/tmp/audit_results.json', 'r') as f:
-                    audit_data = json.load(f)
-                result['audit_data'] = audit_data
-        
-        else:
-            raise ValueError(f"Unsupported action: {action}")
-        
+
+        result = _process_action(iam_manager, event.get('action'), event.get('parameters', {}))
+
         return {
             'statusCode': 200,
             'body': json.dumps(result)
         }
-    
+
     except Exception as e:
         logger.error(f"Lambda execution failed: {e}")
         return {
@@ -113,6 +99,105 @@ def lambda_handler(event, context):
             })
         }
 
+
+def _process_action(iam_manager: IAMManager, action: str,
+                    parameters: Dict[str, Any]) -> Dict[str, Any]:
+    """Run a single action and return its result"""
+    if action == 'create_user':
+        return iam_manager.create_user(
+            username=parameters['username'],
+            groups=parameters.get('groups', []),
+            policies=parameters.get('policies', [])
+        )
+
+    if action == 'create_role':
+        # For Lambda, trust policy should be provided in parameters
+        trust_policy = parameters.get('trust_policy')
+        if not trust_policy:
+            raise ValueError("Trust policy is required for role creation")
+
+        return with_json_file(trust_policy, lambda trust_policy_file: iam_manager.create_role(
+            role_name=parameters['role_name'],
+            trust_policy_file=trust_policy_file,
+            policies=parameters.get('policies', [])
+        ))
+
+    if action == 'create_policy':
+        # For Lambda, policy document should be provided in parameters
+        policy_document = parameters.get('policy_document')
+        if not policy_document:
+            raise ValueError("Policy document is required for policy creation")
+
+        return with_json_file(policy_document, lambda policy_file: iam_manager.create_policy(
+            policy_name=parameters['policy_name'],
+            policy_file=policy_file
+        ))
+
+    if action == 'audit':
+        # For Lambda, return audit results directly instead of saving to file
+        with tempfile.NamedTemporaryFile(suffix='.json', delete=False) as f:
+            audit_file = f.name
+        try:
+            result = iam_manager.audit_permissions(audit_file)
+
+            # Read the audit results and include in response
+            if result['status'] == 'success':
+                with open(audit_file, 'r') as f:
+                    result['audit_data'] = json.load(f)
+        finally:
+            os.unlink(audit_file)
+        return result
+
+    if action == 'audit_shard':
+        # One shard of a sharded audit; the orchestrator merges the returned outputs
+        spec = parameters.get('spec')
+        if not spec:
+            raise ValueError("Shard spec is required for a shard audit")
+        return {'status': 'success', 'shard_output': sharded_audit.audit_shard(iam_manager, spec)}
+
+    raise ValueError(f"Unsupported action: {action}")
+
+
+def _process_records(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Process a batch of SQS records concurrently and report the ones to retry"""
+    # Duplicate deliveries within the batch share one execution and one outcome
+    unique = {}
+    for record in records:
+        unique.setdefault(record['messageId'], record)
+
+    with ThreadPoolExecutor(max_workers=max(1, min(BATCH_MAX_WORKERS, len(unique)))) as executor:
+        outcomes = dict(zip(unique, executor.map(_process_record, unique.values())))
+
+    failures = [message_id for message_id, succeeded in outcomes.items() if not succeeded]
+    logger.info(f"Processed {len(records)} records ({len(unique)} unique): {len(failures)} failed")
+    return {'batchItemFailures': [{'itemIdentifier': message_id} for message_id in failures]}
+
+
+def _process_record(record: Dict[str, Any]) -> bool:
+    """Run the action in one record's body; True when it need not be retried"""
+    def run():
+        message = json.loads(record['body'])
+        iam_manager = get_iam_manager(
+            region=message.get('region', 'us-east-1'),
+            dry_run=message.get('dry_run', False)
+        )
+        return _process_action(iam_manager, message.get('action'), message.get('parameters', {}))
+
+    try:
+        fingerprint = hashlib.sha256(record['body'].encode()).hexdigest()
+        result, replayed = _processed_messages.run(record['messageId'], fingerprint, run)
+        if replayed:
+            logger.info(f"Skipped already processed message {record['messageId']}")
+        if result.get('status') == 'error':
+            logger.error(f"Message {record['messageId']} failed: {result.get('message')}")
+            return False
+        return True
+
+    except Exception as e:
+        logger.error(f"Message {record['messageId']} failed: {e}")
+        return False
+
+
 # Example event structures for testing
 EXAMPLE_EVENTS = {
     "create_user": {
@@ -146,4 +231,13 @@ EXAMPLE_EVENTS = {
         "action": "audit",
         "parameters": {}
     }
-}
\ No newline at end of file
+}
+
+if __name__ == '__main__':
+    # Replay a recorded event: python src/lambda_handler.py [fixture-name] [fixtures-file]
+    fixture = sys.argv[1] if len(sys.argv) > 1 else 'audit_test'
+    fixtures_file = sys.argv[2] if len(sys.argv) > 2 else os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'lambda-test-configs.json')
+    with open(fixtures_file, 'r') as f:
+        event = json.load(f)[fixture]
+    print(json.dumps(lambda_handler(event, None), indent=2))
@@ -4,32 +4,82 @@ IAM Automation Tool - Main Entry Point
 """
 
 import click
+import json
 import os
+import time
 from dotenv import load_dotenv
 from iam_manager import IAMManager
+from access_analyzer import ServiceAccessAnalyzer
+from cloudtrail_feed import CloudTrailFeed
+from trust_graph import TrustGraph
+import sharded_audit
+from key_rotation import EncryptedFileSink, STAGES
+from utils.tag_index import parse_tags
+from utils.client_registry import registry as client_registry
 from utils.logger import setup_logger
+from utils.profiling import RunProfiler
 
 # Load environment variables
 load_dotenv()
 
-@click.group()
+
+class CLIGroup(click.Group):
+    """Group that keeps the subcommand's arguments so --profile-run can find its output file"""
+
+    def resolve_command(self, ctx, args):
+        cmd_name, cmd, remaining = super().resolve_command(ctx, args)
+        ctx.meta['subcommand_args'] = list(remaining)
+        return cmd_name, cmd, remaining
+
+
+def profile_output_prefix(ctx) -> str:
+    """Profile reports sit next to the subcommand's --output-file, else in the working directory"""
+    name = ctx.invoked_subcommand
+    command = ctx.command.get_command(ctx, name) if name else None
+    output_file = None
+    if command is not None:
+        sub_ctx = command.make_context(name, list(ctx.meta.get('subcommand_args', [])),
+                                       parent=ctx, resilient_parsing=True)
+        output_file = sub_ctx.params.get('output_file')
+    if output_file:
+        return f"{os.path.splitext(output_file)[0]}.profile"
+    return f"{name or 'cli'}.profile"
+
+
+@click.group(cls=CLIGroup)
 @click.option('--region', default=os.getenv('AWS_REGION', 'us-east-1'), help='AWS region')
 @click.option('--profile', default=os.getenv('AWS_PROFILE', 'default'), help='AWS profile')
 @click.option('--dry-run', is_flag=True, help='Show what would be done without executing')
+@click.option('--max-pool-connections', type=int, default=None,
+              help='HTTP connections pooled per AWS client '
+                   '(default: AWS_MAX_POOL_CONNECTIONS or 50)')
+@click.option('--profile-run', is_flag=True,
+              help='Profile the command; writes hotspot report, pstats and collapsed stacks '
+                   'next to its output')
 @click.pass_context
-def cli(ctx, region, profile, dry_run):
+def cli(ctx, region, profile, dry_run, max_pool_connections, profile_run):
     """IAM Automation Tool - Manage AWS IAM resources at scale"""
     ctx.ensure_object(dict)
     ctx.obj['region'] = region
     ctx.obj['profile'] = profile
     ctx.obj['dry_run'] = dry_run
-    
+
     # Setup logging
     setup_logger()
-    
+
+    if profile_run:
+        profiler = RunProfiler(profile_output_prefix(ctx))
+        profiler.start()
+        ctx.call_on_close(
+            lambda: click.echo(f"Profile report saved to: {profiler.stop()['report_file']}"))
+
+    # Size shared connection pools to the concurrency of the command
+    client_registry.configure(max_pool_connections=max_pool_connections)
+
     # Initialize IAM Manager
     ctx.obj['iam_manager'] = IAMManager(region=region, profile=profile, dry_run=dry_run)
 
+
 @cli.command()
 @click.argument('username')
 @click.option('--groups', multiple=True, help='Groups to add user to')
@@ -41,6 +91,7 @@ def create_user(ctx, username, groups, policies):
     result = iam_manager.create_user(username, groups=list(groups), policies=list(policies))
     click.echo(f"User creation result: {result}")
 
+
 @cli.command()
 @click.argument('role_name')
 @click.argument('trust_policy_file')
@@ -52,6 +103,7 @@ def create_role(ctx, role_name, trust_policy_file, policies):
     result = iam_manager.create_role(role_name, trust_policy_file, policies=list(policies))
     click.echo(f"Role creation result: {result}")
 
+
 @cli.command()
 @click.argument('policy_name')
 @click.argument('policy_file')
@@ -62,15 +114,37 @@ def create_policy(ctx, policy_name, policy_file):
     result = iam_manager.create_policy(policy_name, policy_file)
     click.echo(f"Policy creation result: {result}")
 
+
+@cli.command()
+@click.argument('config_file')
+@click.pass_context
+def validate(ctx, config_file):
+    """Validate a bulk configuration file offline"""
+    iam_manager = ctx.obj['iam_manager']
+    try:
+        config = iam_manager._load_config(config_file)
+    except Exception as e:
+        raise click.ClickException(f"Cannot load {config_file}: {e}")
+    errors = iam_manager.validator.validate_bulk_config(config)
+    for error in errors:
+        click.echo(f"ERROR {error}")
+    if errors:
+        raise click.ClickException(f"{len(errors)} validation errors in {config_file}")
+    click.echo(f"{config_file} is valid")
+
+
 @cli.command()
 @click.option('--output-file', default='iam_audit.json', help='Output file for audit results')
+@click.option('--select', 'selectors', multiple=True,
+              help='Only audit principals tagged key=value (or key)')
 @click.pass_context
-def audit(ctx, output_file):
+def audit(ctx, output_file, selectors):
     """Audit IAM permissions and generate report"""
     iam_manager = ctx.obj['iam_manager']
-    result = iam_manager.audit_permissions(output_file)
+    iam_manager.audit_permissions(output_file, selectors=list(selectors))
     click.echo(f"Audit completed. Results saved to: {output_file}")
 
+
 @cli.command()
 @click.argument('config_file')
 @click.pass_context
@@ -80,5 +154,261 @@ def bulk_create(ctx, config_file):
     result = iam_manager.bulk_create_from_config(config_file)
     click.echo(f"Bulk creation completed: {result}")
 
+
+@cli.command()
+@click.option('--audit-file', default='iam_audit.json', help='Audit report to take principals from')
+@click.option('--output-file', default='unused_services.json',
+              help='Output file for analysis results')
+@click.option('--unused-days', type=int, default=None,
+              help='Treat services not used for this many days as unused')
+@click.option('--max-concurrency', type=int, default=10, help='Maximum concurrent IAM API calls')
+@click.pass_context
+def unused_services(ctx, audit_file, output_file, unused_days, max_concurrency):
+    """Report unused services per principal from service last-accessed data"""
+    iam_manager = ctx.obj['iam_manager']
+    if not os.path.exists(audit_file):
+        iam_manager.audit_permissions(audit_file)
+    analyzer = ServiceAccessAnalyzer(iam_manager, max_concurrency=max_concurrency)
+    result = analyzer.analyze(audit_file, output_file, unused_days=unused_days)
+    click.echo(f"Service access analysis result: {result}")
+
+
+@cli.command()
+@click.option('--user', 'users', multiple=True, help='User to delete')
+@click.option('--role', 'roles', multiple=True, help='Role to delete')
+@click.option('--policy', 'policies', multiple=True, help='Customer-managed policy ARN to delete')
+@click.option('--select', 'selectors', multiple=True,
+              help='Also delete users and roles tagged key=value (or key)')
+@click.option('--max-workers', type=int, default=10, help='Principals torn down concurrently')
+@click.option('--output-file', default='teardown_results.json',
+              help='Output file for the plan or results')
+@click.pass_context
+def teardown(ctx, users, roles, policies, selectors, max_workers, output_file):
+    """Delete users, roles and policies with all their dependents"""
+    iam_manager = ctx.obj['iam_manager']
+    users, roles = resolve_principals(iam_manager, users, roles, selectors)
+    result = iam_manager.bulk_delete(users, roles, list(policies), max_workers=max_workers)
+    with open(output_file, 'w') as f:
+        json.dump(result, f, indent=2, default=str)
+    click.echo(f"Teardown {result['status']}: {result['summary']}. Details saved to: {output_file}")
+
+
+@cli.command()
+@click.option('--user', 'users', multiple=True, help='User to tag')
+@click.option('--role', 'roles', multiple=True, help='Role to tag')
+@click.option('--select', 'selectors', multiple=True,
+              help='Also tag users and roles tagged key=value (or key)')
+@click.option('--tag', 'tags', multiple=True, required=True, help='Tag to apply as key=value')
+@click.option('--max-workers', type=int, default=10, help='Principals tagged concurrently')
+@click.pass_context
+def tag(ctx, users, roles, selectors, tags, max_workers):
+    """Apply tags to many users and roles"""
+    iam_manager = ctx.obj['iam_manager']
+    try:
+        tags = parse_tags(tags)
+    except ValueError as e:
+        raise click.BadParameter(str(e), param_hint='--tag')
+    users, roles = resolve_principals(iam_manager, users, roles, selectors)
+    result = iam_manager.bulk_tag(tags, users, roles, max_workers=max_workers)
+    click.echo(f"Tagging {result['status']}: {result.get('summary', result)}")
+
+
+@cli.command()
+@click.option('--user', 'users', multiple=True, help='User to untag')
+@click.option('--role', 'roles', multiple=True, help='Role to untag')
+@click.option('--select', 'selectors', multiple=True,
+              help='Also untag users and roles tagged key=value (or key)')
+@click.option('--key', 'tag_keys', multiple=True, required=True, help='Tag key to remove')
+@click.option('--max-workers', type=int, default=10, help='Principals untagged concurrently')
+@click.pass_context
+def untag(ctx, users, roles, selectors, tag_keys, max_workers):
+    """Remove tag keys from many users and roles"""
+    iam_manager = ctx.obj['iam_manager']
+    users, roles = resolve_principals(iam_manager, users, roles, selectors)
+    result = iam_manager.bulk_untag(list(tag_keys), users, roles, max_workers=max_workers)
+    click.echo(f"Untagging {result['status']}: {result.get('summary', result)}")
+
+
+def resolve_principals(iam_manager, users, roles, selectors):
+    """Merge explicitly named users and roles with those matched by tag selectors"""
+    users, roles = list(users), list(roles)
+    if selectors:
+        try:
+            selected = iam_manager.select_principals(list(selectors))
+        except ValueError as e:
+            raise click.BadParameter(str(e), param_hint='--select')
+        users += [name for name in selected["users"] if name not in users]
+        roles += [name for name in selected["roles"] if name not in roles]
+        click.echo(f"Selected {len(selected['users'])} users and "
+                   f"{len(selected['roles'])} roles by tag")
+    return users, roles
+
+
+@cli.command()
+@click.option('--max-age-days', type=int, default=90,
+              help='Rotate active keys older than this many days')
+@click.option('--stage', type=click.Choice(STAGES), default='created',
+              help='Stage to advance users to')
+@click.option('--state-file', default='key_rotation_state.json', help='Resumable rotation state')
+@click.option('--sink-file', default='rotated_keys.enc',
+              help='Encrypted file receiving new secrets (key: ROTATION_SINK_KEY)')
+@click.option('--max-workers', type=int, default=10, help='Users rotated concurrently')
+@click.option('--output-file', default='key_rotation_results.json',
+              help='Output file for rotation results')
+@click.pass_context
+def rotate_keys(ctx, max_age_days, stage, state_file, sink_file, max_workers, output_file):
+    """Rotate stale access keys: create new keys, then deactivate and delete the old ones"""
+    iam_manager = ctx.obj['iam_manager']
+    result = iam_manager.rotate_access_keys(EncryptedFileSink(sink_file),
+                                            max_age_days=max_age_days, stage=stage,
+                                            state_file=state_file, max_workers=max_workers)
+    with open(output_file, 'w') as f:
+        json.dump(result, f, indent=2, default=str)
+    outcome = result.get('summary', result.get('message', ''))
+    click.echo(f"Key rotation {result['status']}: {outcome}. Details saved to: {output_file}")
+
+
+@cli.command()
+@click.argument('source')
+@click.option('--snapshot-file', default='iam_audit.json', help='Audit snapshot to keep up to date')
+@click.option('--checkpoint-file', default=None,
+              help='Processed-file checkpoint (default: <snapshot>.checkpoint)')
+@click.option('--endpoint-url', default=None, help='S3-compatible endpoint for s3:// sources')
+@click.option('--max-workers', type=int, default=10,
+              help='Concurrent file reads and IAM re-fetches')
+@click.pass_context
+def audit_sync(ctx, source, snapshot_file, checkpoint_file, endpoint_url, max_workers):
+    """Apply CloudTrail IAM events from a directory or s3://bucket/prefix to an audit snapshot"""
+    iam_manager = ctx.obj['iam_manager']
+    if not os.path.exists(snapshot_file):
+        iam_manager.audit_permissions(snapshot_file)
+    feed = CloudTrailFeed(iam_manager, snapshot_file, checkpoint_file=checkpoint_file,
+                          max_workers=max_workers, endpoint_url=endpoint_url)
+    result = feed.sync(source)
+    click.echo(f"Audit sync result: {result}")
+
+
+@cli.group()
+def audit_sharded():
+    """Audit principals in parallel shards (processes, containers or Lambdas) and merge them"""
+
+
+@audit_sharded.command('plan')
+@click.option('--shards', type=int, default=8, help='Number of shards')
+@click.option('--strategy', type=click.Choice(sharded_audit.STRATEGIES), default='hash',
+              help='Partition by hash of name or by top-level IAM path')
+@click.option('--work-dir', default='.cache/audit_shards', help='Directory for shard spec files')
+@click.pass_context
+def audit_sharded_plan(ctx, shards, strategy, work_dir):
+    """Run the listing pass and write one spec file per shard"""
+    principals = sharded_audit.list_principals(ctx.obj['iam_manager'].iam_client)
+    os.makedirs(work_dir, exist_ok=True)
+    for spec in sharded_audit.plan_shards(principals, shards, strategy):
+        spec_file = os.path.join(work_dir, f"spec-{spec['shard']:04d}.json")
+        with open(spec_file, 'w') as f:
+            json.dump(spec, f)
+        click.echo(f"{spec_file}: {len(spec['users'])} users, {len(spec['roles'])} roles")
+
+
+@audit_sharded.command('run-shard')
+@click.argument('spec_file')
+@click.argument('output_file')
+@click.pass_context
+def audit_sharded_run_shard(ctx, spec_file, output_file):
+    """Audit the shard described by SPEC_FILE into OUTPUT_FILE"""
+    with open(spec_file, 'r') as f:
+        spec = json.load(f)
+    output = sharded_audit.audit_shard(ctx.obj['iam_manager'], spec)
+    with open(output_file, 'w') as f:
+        json.dump(output, f, default=str)
+    click.echo(f"Shard {spec['shard']} audited. Results saved to: {output_file}")
+
+
+@audit_sharded.command('merge')
+@click.argument('shard_files', nargs=-1, required=True)
+@click.option('--output-file', default='iam_audit.json',
+              help='Output file for the merged audit report')
+def audit_sharded_merge(shard_files, output_file):
+    """Merge shard outputs into one audit report"""
+    outputs = []
+    for path in shard_files:
+        with open(path, 'r') as f:
+            outputs.append(json.load(f))
+    try:
+        report = sharded_audit.merge_shard_outputs(outputs)
+    except ValueError as e:
+        raise click.ClickException(str(e))
+    with open(output_file, 'w') as f:
+        json.dump(report, f, indent=2, default=str)
+    click.echo(f"Merged {len(outputs)} shards. Results saved to: {output_file}")
+
+
+@audit_sharded.command('local')
+@click.option('--shards', type=int, default=8, help='Number of shards')
+@click.option('--strategy', type=click.Choice(sharded_audit.STRATEGIES), default='hash',
+              help='Partition by hash of name or by top-level IAM path')
+@click.option('--processes', type=int, default=None,
+              help='Worker processes (default: one per shard)')
+@click.option('--benchmark', is_flag=True,
+              help='Repeat with 1, 2, 4 ... processes up to --shards and print timings')
+@click.option('--output-file', default='iam_audit.json',
+              help='Output file for the merged audit report')
+@click.option('--work-dir', default='.cache/audit_shards', help='Directory for shard output files')
+@click.pass_context
+def audit_sharded_local(ctx, shards, strategy, processes, benchmark, output_file, work_dir):
+    """Run every shard in a local process pool and merge the results"""
+    counts = [processes or shards]
+    if benchmark:
+        counts = sorted({min(2 ** i, shards) for i in range(shards.bit_length() + 1)})
+    for count in counts:
+        result = sharded_audit.run_local(ctx.obj['region'], ctx.obj['profile'], shards, output_file,
+                                         strategy=strategy, processes=count, work_dir=work_dir)
+        if result['status'] != 'success':
+            raise click.ClickException(result['message'])
+        click.echo(f"{count:>4} processes: {result['timings']}")
+    click.echo(f"Sharded audit completed. Results saved to: {output_file}")
+
+
+@cli.group()
+@click.option('--graph-file', default='trust_graph.json',
+              help='Cached trust graph built from list_roles')
+@click.option('--refresh', is_flag=True, help='Rebuild the cached trust graph from IAM')
+@click.pass_context
+def trust_graph(ctx, graph_file, refresh):
+    """Analyze sts:AssumeRole reachability between principals and roles"""
+    if refresh or not os.path.exists(graph_file):
+        graph = TrustGraph.from_iam(ctx.obj['iam_manager'].iam_client)
+        graph.save(graph_file)
+    else:
+        graph = TrustGraph.load(graph_file)
+    ctx.obj['trust_graph'] = graph
+
+
+@trust_graph.command('blast-radius')
+@click.argument('principal')
+@click.pass_context
+def blast_radius(ctx, principal):
+    """List every role PRINCIPAL can reach through chains of sts:AssumeRole"""
+    started = time.perf_counter()
+    roles = ctx.obj['trust_graph'].reachable_from(principal)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for role in roles:
+        click.echo(role)
+    click.echo(f"{len(roles)} roles reachable from {principal} ({elapsed_ms:.2f} ms)")
+
+
+@trust_graph.command('who-can-reach')
+@click.argument('role_arn')
+@click.pass_context
+def who_can_reach(ctx, role_arn):
+    """List every principal that can reach ROLE_ARN through chains of sts:AssumeRole"""
+    started = time.perf_counter()
+    principals = ctx.obj['trust_graph'].principals_reaching(role_arn)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    for principal in principals:
+        click.echo(principal)
+    click.echo(f"{len(principals)} principals can reach {role_arn} ({elapsed_ms:.2f} ms)")
+
+
 if __name__ == '__main__':
-    cli()
\ No newline at end of file
+    cli()
@@ -0,0 +1,42 @@
+"""
+Manager Cache - IAM Managers and request helpers shared by the web interface and Lambda handler
+"""
+
+import json
+import os
+import tempfile
+import threading
+from typing import Any
+from iam_manager import IAMManager
+
+# IAM Managers shared across requests and warm invocations within this process
+# Per-run audit state (read cache, tag index) stays in locals, so concurrent runs never mix
+_managers = {}
+_managers_lock = threading.Lock()
+
+
+def get_iam_manager(region: str = 'us-east-1', dry_run: bool = False) -> IAMManager:
+    """Return the process's shared IAM Manager for a region and dry-run mode"""
+    key = (region, bool(dry_run))
+    with _managers_lock:
+        if key not in _managers:
+            _managers[key] = IAMManager(region=region, dry_run=dry_run)
+        return _managers[key]
+
+
+def clear_managers():
+    """Forget every shared IAM Manager"""
+    with _managers_lock:
+        _managers.clear()
+
+
+def with_json_file(document: Any, func):
+    """Write a document to a temporary JSON file for the duration of func(path)"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        json.dump(document, f)
+        path = f.name
+
+    try:
+        return func(path)
+    finally:
+        os.unlink(path)
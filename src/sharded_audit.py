@@ -0,0 +1,205 @@
+"""
+Sharded Audit - Partitioned permission audits that run in parallel and merge into one report
+"""
+
+import json
+import logging
+import os
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional
+from botocore.exceptions import ClientError
+from iam_manager import IAMManager
+from utils.client_registry import registry as client_registry
+from utils.read_cache import ReadCache, merge_stats
+
+logger = logging.getLogger(__name__)
+
+STRATEGIES = ("hash", "path")
+
+
+def list_principals(iam_client) -> Dict[str, List[Dict[str, Any]]]:
+    """Listing pass: path and audit entry of every user and role from one paginated stream"""
+    paginator = iam_client.get_paginator('get_account_authorization_details')
+    # Group details may arrive on a later page than their members
+    pages = list(paginator.paginate(Filter=['User', 'Role', 'Group']))
+    group_ids = {group['GroupName']: group['GroupId']
+                 for page in pages for group in page.get('GroupDetailList', [])}
+
+    principals = {"users": [], "roles": []}
+    for page in pages:
+        for user in page.get('UserDetailList', []):
+            principals["users"].append({
+                "name": user['UserName'],
+                "path": user.get('Path', '/'),
+                "entry": IAMManager._user_detail_entry(user, group_ids)
+            })
+        for role in page.get('RoleDetailList', []):
+            principals["roles"].append({
+                "name": role['RoleName'],
+                "path": role.get('Path', '/'),
+                "entry": IAMManager._role_detail_entry(role)
+            })
+    return principals
+
+
+def plan_shards(principals: Dict[str, List[Dict[str, Any]]], shard_count: int,
+                strategy: str = "hash") -> List[Dict[str, Any]]:
+    """Split principals into shard specs; shard 0 also audits account-wide groups and policies"""
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown shard strategy {strategy}; "
+                         f"expected one of {', '.join(STRATEGIES)}")
+    if shard_count < 1:
+        raise ValueError("shard_count must be at least 1")
+
+    specs = [{"shard": i, "shard_count": shard_count, "strategy": strategy,
+              "include_shared": i == 0, "path_prefixes": [], "users": [], "roles": []}
+             for i in range(shard_count)]
+
+    if strategy == "hash":
+        for section in ("users", "roles"):
+            for principal in principals[section]:
+                # crc32 rather than hash(): it must agree across processes and runs
+                shard = zlib.crc32(principal["name"].encode()) % shard_count
+                specs[shard][section].append(principal)
+        return specs
+
+    # Whole top-level paths go to the least loaded shard, largest first
+    by_prefix: Dict[str, Dict[str, list]] = {}
+    for section in ("users", "roles"):
+        for principal in principals[section]:
+            prefix = _path_prefix(principal["path"])
+            by_prefix.setdefault(prefix, {"users": [], "roles": []})[section].append(principal)
+
+    loads = [0] * shard_count
+    for prefix, members in sorted(by_prefix.items(), key=lambda item: (-_size(item[1]), item[0])):
+        target = loads.index(min(loads))
+        specs[target]["path_prefixes"].append(prefix)
+        specs[target]["users"].extend(members["users"])
+        specs[target]["roles"].extend(members["roles"])
+        loads[target] += _size(members)
+    return specs
+
+
+def audit_shard(iam_manager: IAMManager, spec: Dict[str, Any]) -> Dict[str, Any]:
+    """Audit the principals of one shard spec and return the shard output"""
+    read_cache = ReadCache()
+    output = {
+        "shard": spec["shard"],
+        "shard_count": spec["shard_count"],
+        "users": [],
+        "roles": [],
+        "groups": [],
+        "policies": []
+    }
+
+    if spec.get("include_shared"):
+        paginator = iam_manager.iam_client.get_paginator('list_groups')
+        for page in paginator.paginate():
+            for group in page['Groups']:
+                output["groups"].append(iam_manager._audit_group(group, read_cache))
+
+        paginator = iam_manager.iam_client.get_paginator('list_policies')
+        for page in paginator.paginate(Scope='Local'):
+            output["policies"].extend(
+                IAMManager._policy_entry(policy) for policy in page['Policies'])
+
+    # The listing pass already read every principal's details, so shards make no per-principal calls
+    output["users"] = [user["entry"] for user in spec["users"]]
+    output["roles"] = [role["entry"] for role in spec["roles"]]
+
+    output["read_cache"] = read_cache.stats()
+    logger.info(f"Shard {spec['shard'] + 1}/{spec['shard_count']} audited: "
+                f"{len(output['users'])} users, {len(output['roles'])} roles")
+    return output
+
+
+def merge_shard_outputs(outputs: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Merge shard outputs into one audit report with the summary recomputed over all shards"""
+    if not outputs:
+        raise ValueError("No shard outputs to merge")
+
+    shard_count = outputs[0]["shard_count"]
+    shards = sorted(output["shard"] for output in outputs)
+    if shards != list(range(shard_count)) or any(o["shard_count"] != shard_count for o in outputs):
+        missing = sorted(set(range(shard_count)) - set(shards))
+        raise ValueError(f"Incomplete or inconsistent shard set: expected {shard_count} shards, "
+                         f"got {shards} (missing {missing})")
+
+    report = {
+        "users": sorted((u for o in outputs for u in o["users"]), key=lambda u: u["username"]),
+        "roles": sorted((r for o in outputs for r in o["roles"]), key=lambda r: r["role_name"]),
+        "groups": [g for o in outputs for g in o["groups"]],
+        "policies": [p for o in outputs for p in o["policies"]],
+        "summary": {}
+    }
+    report["summary"] = IAMManager._build_audit_summary(report)
+    report["summary"]["read_cache"] = merge_stats([o["read_cache"] for o in outputs])
+    report["summary"]["shards"] = shard_count
+    return report
+
+
+def run_local(region: str, profile: str, shard_count: int, output_file: str,
+              strategy: str = "hash", processes: Optional[int] = None,
+              work_dir: str = '.cache/audit_shards') -> Dict[str, Any]:
+    """List, audit every shard in its own process, and merge; timings show the scaling curve"""
+    try:
+        started = time.perf_counter()
+        iam_manager = IAMManager(region=region, profile=profile)
+        specs = plan_shards(list_principals(iam_manager.iam_client), shard_count, strategy)
+        listed = time.perf_counter()
+
+        os.makedirs(work_dir, exist_ok=True)
+        shard_files = [os.path.join(work_dir, f"shard-{spec['shard']:04d}.json") for spec in specs]
+        with ProcessPoolExecutor(max_workers=processes or shard_count) as executor:
+            shard_seconds = list(executor.map(_run_shard_process, [region] * len(specs),
+                                              [profile] * len(specs), specs, shard_files))
+        audited = time.perf_counter()
+
+        outputs = []
+        for path in shard_files:
+            with open(path, 'r') as f:
+                outputs.append(json.load(f))
+        report = merge_shard_outputs(outputs)
+        with open(output_file, 'w') as f:
+            json.dump(report, f, indent=2, default=str)
+        finished = time.perf_counter()
+
+        timings = {
+            "listing_seconds": round(listed - started, 3),
+            "audit_seconds": round(audited - listed, 3),
+            "slowest_shard_seconds": round(max(shard_seconds), 3),
+            "merge_seconds": round(finished - audited, 3),
+            "total_seconds": round(finished - started, 3)
+        }
+        logger.info(f"Sharded audit completed with {shard_count} shards on "
+                    f"{processes or shard_count} processes. "
+                    f"Results saved to {output_file} ({timings})")
+        return {"status": "success", "output_file": output_file, "shards": shard_count,
+                "timings": timings}
+
+    except (ClientError, ValueError) as e:
+        logger.error(f"Sharded audit failed: {e}")
+        return {"status": "error", "message": str(e)}
+
+
+def _run_shard_process(region: str, profile: str, spec: Dict[str, Any], output_file: str) -> float:
+    """Worker process entry point: audit one shard into a file and return its duration"""
+    started = time.perf_counter()
+    # Forked workers must not reuse the parent's pooled sockets
+    client_registry.clear()
+    output = audit_shard(IAMManager(region=region, profile=profile), spec)
+    with open(output_file, 'w') as f:
+        json.dump(output, f, default=str)
+    return time.perf_counter() - started
+
+
+def _path_prefix(path: str) -> str:
+    """Top-level IAM path, e.g. /service/payments/ -> /service/"""
+    parts = [part for part in path.split('/') if part]
+    return f"/{parts[0]}/" if parts else "/"
+
+
+def _size(members: Dict[str, list]) -> int:
+    return len(members["users"]) + len(members["roles"])
@@ -0,0 +1,214 @@
+"""
+Teardown Engine - Dependency-ordered parallel deletion of IAM users, roles and policies
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any
+from botocore.exceptions import ClientError
+
+logger = logging.getLogger(__name__)
+
+
+def _call(operation: str, **params) -> Dict[str, Any]:
+    """Describe a single IAM API call in a teardown plan"""
+    return {"operation": operation, "params": params}
+
+
+class TeardownEngine:
+    def __init__(self, iam_manager, max_workers: int = 10, calls_per_principal: int = 5):
+        """Initialize teardown engine on top of an existing IAM Manager"""
+        self.iam_manager = iam_manager
+        self.iam_client = iam_manager.iam_client
+        self.dry_run = iam_manager.dry_run
+        self.rate_limiter = iam_manager.rate_limiter
+        self.max_workers = max_workers
+        self.calls_per_principal = calls_per_principal
+
+    def teardown(self, users: List[str] = None, roles: List[str] = None,
+                 policies: List[str] = None) -> Dict[str, Any]:
+        """Delete principals and policies with all their dependents, or return the dry-run plan"""
+        targets = [("user", name) for name in users or []]
+        targets += [("role", name) for name in roles or []]
+        targets += [("policy", arn) for arn in policies or []]
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            plans = list(executor.map(lambda target: self.plan(*target), targets))
+
+        if self.dry_run:
+            total_calls = sum(len(call_list) for p in plans for call_list in p.get("phases", []))
+            logger.info(f"[DRY RUN] Would make {total_calls} IAM calls "
+                        f"to tear down {len(plans)} resources")
+            return {"status": "dry_run", "plan": plans,
+                    "summary": {"resources": len(plans), "calls": total_calls}}
+
+        # Calls within a phase share one pool; principals are driven by a separate pool so that
+        # a principal waiting on its phase never holds a slot its own calls need
+        call_workers = self.max_workers * self.calls_per_principal
+        with ThreadPoolExecutor(max_workers=call_workers) as call_pool:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+                results = list(executor.map(lambda plan: self._execute(plan, call_pool), plans))
+
+        failed = [r for r in results if r["status"] != "success"]
+        summary = {
+            "resources": len(results),
+            "deleted": len(results) - len(failed),
+            "failed": len(failed),
+            "calls": sum(r["calls"] for r in results)
+        }
+        logger.info(f"Teardown completed: {summary['deleted']} deleted, {summary['failed']} failed")
+        if not failed:
+            status = "success"
+        else:
+            status = "error" if len(failed) == len(results) else "partial"
+        return {"status": status, "results": results, "summary": summary}
+
+    def plan(self, resource_type: str, name: str) -> Dict[str, Any]:
+        """Discover a resource's dependents and order the calls needed to delete it"""
+        try:
+            if resource_type == "user":
+                phases = self._plan_user(name)
+            elif resource_type == "role":
+                phases = self._plan_role(name)
+            else:
+                phases = self._plan_policy(name)
+            return {"resource_type": resource_type, "name": name, "phases": phases}
+
+        except ClientError as e:
+            logger.error(f"Failed to plan teardown of {resource_type} {name}: {e}")
+            return {"resource_type": resource_type, "name": name, "error": str(e)}
+
+    def _plan_user(self, username: str) -> List[List[Dict[str, Any]]]:
+        """Detach everything from a user, then delete MFA devices, then the user"""
+        detach = []
+        for policy in self._paginate('list_attached_user_policies', 'AttachedPolicies',
+                                     UserName=username):
+            detach.append(_call('detach_user_policy', UserName=username,
+                                PolicyArn=policy['PolicyArn']))
+        for policy_name in self._paginate('list_user_policies', 'PolicyNames', UserName=username):
+            detach.append(_call('delete_user_policy', UserName=username, PolicyName=policy_name))
+        for group in self._paginate('list_groups_for_user', 'Groups', UserName=username):
+            detach.append(_call('remove_user_from_group', UserName=username,
+                                GroupName=group['GroupName']))
+        for key in self._paginate('list_access_keys', 'AccessKeyMetadata', UserName=username):
+            detach.append(_call('delete_access_key', UserName=username,
+                                AccessKeyId=key['AccessKeyId']))
+        for cert in self._paginate('list_signing_certificates', 'Certificates', UserName=username):
+            detach.append(_call('delete_signing_certificate', UserName=username,
+                                CertificateId=cert['CertificateId']))
+        for key in self._paginate('list_ssh_public_keys', 'SSHPublicKeys', UserName=username):
+            detach.append(_call('delete_ssh_public_key', UserName=username,
+                                SSHPublicKeyId=key['SSHPublicKeyId']))
+
+        response = self.iam_client.list_service_specific_credentials(UserName=username)
+        for credential in response['ServiceSpecificCredentials']:
+            credential_id = credential['ServiceSpecificCredentialId']
+            detach.append(_call('delete_service_specific_credential', UserName=username,
+                                ServiceSpecificCredentialId=credential_id))
+
+        try:
+            self.iam_client.get_login_profile(UserName=username)
+            detach.append(_call('delete_login_profile', UserName=username))
+        except ClientError as e:
+            if e.response['Error']['Code'] != 'NoSuchEntity':
+                raise
+
+        # Virtual MFA devices can only be deleted once deactivated
+        delete_devices = []
+        for device in self._paginate('list_mfa_devices', 'MFADevices', UserName=username):
+            detach.append(_call('deactivate_mfa_device', UserName=username,
+                                SerialNumber=device['SerialNumber']))
+            if device['SerialNumber'].startswith('arn:'):
+                delete_devices.append(_call('delete_virtual_mfa_device',
+                                            SerialNumber=device['SerialNumber']))
+
+        delete = [_call('delete_user', UserName=username)]
+        return [phase for phase in (detach, delete_devices, delete) if phase]
+
+    def _plan_role(self, role_name: str) -> List[List[Dict[str, Any]]]:
+        """Detach everything from a role, then delete the role"""
+        role = self.iam_client.get_role(RoleName=role_name)['Role']
+        if role['Path'].startswith('/aws-service-role/'):
+            raise ClientError(
+                {"Error": {"Code": "UnmodifiableEntity",
+                           "Message": f"{role_name} is service-linked; "
+                                      f"delete it through its service"}},
+                'DeleteRole'
+            )
+
+        detach = []
+        for policy in self._paginate('list_attached_role_policies', 'AttachedPolicies',
+                                     RoleName=role_name):
+            detach.append(_call('detach_role_policy', RoleName=role_name,
+                                PolicyArn=policy['PolicyArn']))
+        for policy_name in self._paginate('list_role_policies', 'PolicyNames', RoleName=role_name):
+            detach.append(_call('delete_role_policy', RoleName=role_name, PolicyName=policy_name))
+        for profile in self._paginate('list_instance_profiles_for_role', 'InstanceProfiles',
+                                      RoleName=role_name):
+            detach.append(_call('remove_role_from_instance_profile', RoleName=role_name,
+                                InstanceProfileName=profile['InstanceProfileName']))
+
+        return [phase for phase in (detach, [_call('delete_role', RoleName=role_name)]) if phase]
+
+    def _plan_policy(self, policy_arn: str) -> List[List[Dict[str, Any]]]:
+        """Detach a managed policy everywhere and drop old versions, then delete it"""
+        detach = []
+        paginator = self.iam_client.get_paginator('list_entities_for_policy')
+        for page in paginator.paginate(PolicyArn=policy_arn):
+            for user in page['PolicyUsers']:
+                detach.append(_call('detach_user_policy', UserName=user['UserName'],
+                                    PolicyArn=policy_arn))
+            for group in page['PolicyGroups']:
+                detach.append(_call('detach_group_policy', GroupName=group['GroupName'],
+                                    PolicyArn=policy_arn))
+            for role in page['PolicyRoles']:
+                detach.append(_call('detach_role_policy', RoleName=role['RoleName'],
+                                    PolicyArn=policy_arn))
+        for version in self._paginate('list_policy_versions', 'Versions', PolicyArn=policy_arn):
+            if not version['IsDefaultVersion']:
+                detach.append(_call('delete_policy_version', PolicyArn=policy_arn,
+                                    VersionId=version['VersionId']))
+
+        delete = [_call('delete_policy', PolicyArn=policy_arn)]
+        return [phase for phase in (detach, delete) if phase]
+
+    def _paginate(self, operation: str, result_key: str, **kwargs) -> List[Any]:
+        """Collect all items of a paginated IAM listing"""
+        items = []
+        for page in self.iam_client.get_paginator(operation).paginate(**kwargs):
+            items.extend(page[result_key])
+        return items
+
+    def _execute(self, plan: Dict[str, Any], call_pool: ThreadPoolExecutor) -> Dict[str, Any]:
+        """Run a plan phase by phase, with the calls inside each phase in parallel"""
+        result = {"resource_type": plan["resource_type"], "name": plan["name"], "calls": 0,
+                  "errors": []}
+        if "error" in plan:
+            result.update(status="error", errors=[plan["error"]])
+            return result
+
+        for phase in plan["phases"]:
+            errors = [e for e in call_pool.map(self._invoke, phase) if e]
+            result["calls"] += len(phase)
+            if errors:
+                # Later phases depend on this one; stop before deleting the resource itself
+                result["errors"].extend(errors)
+                result["status"] = "error"
+                logger.error(f"Teardown of {plan['resource_type']} {plan['name']} "
+                             f"stopped: {errors}")
+                return result
+
+        result["status"] = "success"
+        logger.info(f"Deleted {plan['resource_type']} {plan['name']}")
+        return result
+
+    def _invoke(self, call: Dict[str, Any]) -> str:
+        """Make one planned call under the rate limiter; already-removed dependents count as done"""
+        try:
+            self.rate_limiter.acquire()
+            getattr(self.iam_client, call["operation"])(**call["params"])
+            return ""
+        except ClientError as e:
+            if e.response['Error']['Code'] == 'NoSuchEntity':
+                return ""
+            return f"{call['operation']}: {e}"
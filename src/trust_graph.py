@@ -0,0 +1,212 @@
+"""
+Trust Graph - Transitive sts:AssumeRole reachability between principals and roles
+"""
+
+import json
+import logging
+import re
+from array import array
+from collections import deque
+from typing import List, Dict, Any, Iterable, Optional
+from urllib.parse import unquote
+
+logger = logging.getLogger(__name__)
+
+ASSUME_ACTIONS = {
+    "sts:assumerole", "sts:assumerolewithsaml", "sts:assumerolewithwebidentity", "sts:*", "*"
+}
+
+ACCOUNT_ID_PATTERN = re.compile(r'^\d{12}$')
+SESSION_ARN_PATTERN = re.compile(r'^arn:(aws[-a-z]*):sts::(\d{12}):assumed-role/([^/]+)/.+$')
+IAM_ARN_PATTERN = re.compile(r'^arn:(aws[-a-z]*):iam::(\d{12}):(user|role)/.+$')
+
+# Anyone at all, when a trust policy names "*" as principal
+WILDCARD = "*"
+
+
+class TrustGraph:
+    """Principal -> role edges stored as compressed sparse rows over integer node IDs.
+
+    Edges are an over-approximation: Deny statements and Conditions are ignored, and every
+    user or role is assumed able to use trust granted to its account root.
+    """
+
+    def __init__(self, names: List[str], roles: Iterable[int], offsets: array, targets: array,
+                 reverse_offsets: array, reverse_targets: array):
+        """Initialize from prebuilt adjacency arrays; use from_roles() or load() instead"""
+        self.names = names
+        self.ids = {name: i for i, name in enumerate(names)}
+        self.roles = set(roles)
+        self.offsets, self.targets = offsets, targets
+        self.reverse_offsets, self.reverse_targets = reverse_offsets, reverse_targets
+
+    @classmethod
+    def from_roles(cls, roles: List[Dict[str, Any]]) -> 'TrustGraph':
+        """Build the graph from list_roles entries with their AssumeRolePolicyDocument"""
+        ids: Dict[str, int] = {}
+        names: List[str] = []
+        edges = []
+
+        def node(name: str) -> int:
+            if name not in ids:
+                ids[name] = len(names)
+                names.append(name)
+            return ids[name]
+
+        role_ids = []
+        for role in roles:
+            role_id = node(role['Arn'])
+            role_ids.append(role_id)
+
+            # Whatever trusts the role's account can also be reached through the role
+            root = _account_root(role['Arn'])
+            if root:
+                edges.append((role_id, node(root)))
+
+            for principal in _trusted_principals(role.get('AssumeRolePolicyDocument')):
+                edges.append((node(principal), role_id))
+
+        graph = cls(names, role_ids, *_compress(edges, len(names)),
+                    *_compress([(b, a) for a, b in edges], len(names)))
+        logger.info(f"Trust graph built: {len(role_ids)} roles, {len(names)} nodes, "
+                    f"{len(edges)} edges")
+        return graph
+
+    @classmethod
+    def from_iam(cls, iam_client) -> 'TrustGraph':
+        """Build the graph from a single paginated list_roles pass"""
+        roles = []
+        for page in iam_client.get_paginator('list_roles').paginate():
+            roles.extend(page['Roles'])
+        return cls.from_roles(roles)
+
+    def reachable_from(self, principal: str) -> List[str]:
+        """Every role the principal can reach through chains of sts:AssumeRole"""
+        starts = [self.ids[name] for name in _start_nodes(principal) if name in self.ids]
+        visited = self._walk(starts, self.offsets, self.targets)
+        start_id = self.ids.get(_normalize(principal))
+        return sorted(self.names[i] for i in visited if i in self.roles and i != start_id)
+
+    def principals_reaching(self, role_arn: str) -> List[str]:
+        """Every principal (role, user, account, service or federated provider) reaching the role"""
+        if role_arn not in self.ids:
+            return []
+        target = self.ids[role_arn]
+        visited = self._walk([target], self.reverse_offsets, self.reverse_targets)
+        return sorted(self.names[i] for i in visited if i != target)
+
+    def _walk(self, starts: List[int], offsets: array, targets: array) -> List[int]:
+        """Breadth-first search over one adjacency direction"""
+        seen = bytearray(len(self.names))
+        queue = deque(starts)
+        for start in starts:
+            seen[start] = 1
+        visited = []
+        while queue:
+            current = queue.popleft()
+            visited.append(current)
+            for i in range(offsets[current], offsets[current + 1]):
+                nxt = targets[i]
+                if not seen[nxt]:
+                    seen[nxt] = 1
+                    queue.append(nxt)
+        return visited
+
+    def save(self, path: str):
+        """Persist the graph so later queries skip the IAM listing"""
+        with open(path, 'w') as f:
+            json.dump({
+                "names": self.names,
+                "roles": sorted(self.roles),
+                "offsets": self.offsets.tolist(),
+                "targets": self.targets.tolist()
+            }, f)
+
+    @classmethod
+    def load(cls, path: str) -> 'TrustGraph':
+        """Load a graph written by save()"""
+        with open(path, 'r') as f:
+            data = json.load(f)
+        offsets = array('I', data["offsets"])
+        targets = array('I', data["targets"])
+        edges = [(source, targets[i]) for source in range(len(data["names"]))
+                 for i in range(offsets[source], offsets[source + 1])]
+        return cls(data["names"], data["roles"], offsets, targets,
+                   *_compress([(b, a) for a, b in edges], len(data["names"])))
+
+
+def _compress(edges: List[tuple], node_count: int):
+    """Pack (source, target) pairs into offset and target arrays"""
+    counts = [0] * (node_count + 1)
+    for source, _ in edges:
+        counts[source + 1] += 1
+    for i in range(node_count):
+        counts[i + 1] += counts[i]
+    offsets = array('I', counts)
+
+    targets = array('I', [0]) * len(edges)
+    cursor = list(counts[:-1])
+    for source, target in edges:
+        targets[cursor[source]] = target
+        cursor[source] += 1
+    return offsets, targets
+
+
+def _trusted_principals(document: Any) -> List[str]:
+    """Principals allowed to assume a role by its trust policy"""
+    if isinstance(document, str):
+        document = json.loads(unquote(document))
+    if not document:
+        return []
+
+    statements = document.get('Statement', [])
+    if isinstance(statements, dict):
+        statements = [statements]
+
+    principals = []
+    for statement in statements:
+        if statement.get('Effect') != 'Allow':
+            continue
+        actions = statement.get('Action', [])
+        actions = [actions] if isinstance(actions, str) else actions
+        if not any(action.lower() in ASSUME_ACTIONS for action in actions):
+            continue
+
+        principal = statement.get('Principal')
+        if principal == WILDCARD:
+            principals.append(WILDCARD)
+            continue
+        for values in (principal or {}).values():
+            for value in [values] if isinstance(values, str) else values:
+                principals.append(_normalize(value))
+    return principals
+
+
+def _normalize(principal: str) -> str:
+    """Canonical node name: bare account IDs become account root ARNs"""
+    if ACCOUNT_ID_PATTERN.match(principal):
+        return f"arn:aws:iam::{principal}:root"
+    return principal
+
+
+def _account_root(arn: str) -> Optional[str]:
+    """Root ARN of the account owning an IAM user or role"""
+    match = IAM_ARN_PATTERN.match(arn)
+    if match:
+        return f"arn:{match.group(1)}:iam::{match.group(2)}:root"
+    return None
+
+
+def _start_nodes(principal: str) -> List[str]:
+    """Nodes a principal acts as: itself, its account root and the wildcard"""
+    principal = _normalize(principal)
+    session = SESSION_ARN_PATTERN.match(principal)
+    starts = [principal, WILDCARD]
+    if session:
+        # Trust policies name the role, not the session; the role's path is unknown here
+        starts.append(f"arn:{session.group(1)}:iam::{session.group(2)}:role/{session.group(3)}")
+        starts.append(f"arn:{session.group(1)}:iam::{session.group(2)}:root")
+    root = _account_root(principal)
+    if root:
+        starts.append(root)
+    return starts
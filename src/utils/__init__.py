@@ -1 +1 @@
-# Utils package
\ No newline at end of file
+# Utils package
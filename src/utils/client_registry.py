@@ -0,0 +1,156 @@
+"""
+Client registry - Process-wide boto3 sessions and clients shared by every IAM Manager
+"""
+
+import logging
+import os
+import threading
+from typing import List, Dict, Any, Optional
+import boto3
+from botocore.config import Config
+from botocore.credentials import RefreshableCredentials
+from botocore.session import get_session
+
+logger = logging.getLogger(__name__)
+
+
+class ClientRegistry:
+    def __init__(self, max_pool_connections: Optional[int] = None,
+                 tcp_keepalive: Optional[bool] = None):
+        """Initialize registry; defaults come from AWS_MAX_POOL_CONNECTIONS and AWS_TCP_KEEPALIVE"""
+        self.max_pool_connections = (max_pool_connections
+                                     or int(os.getenv('AWS_MAX_POOL_CONNECTIONS', '50')))
+        self.tcp_keepalive = tcp_keepalive if tcp_keepalive is not None else \
+            os.getenv('AWS_TCP_KEEPALIVE', 'true').lower() == 'true'
+        self._sessions: Dict[tuple, boto3.Session] = {}
+        self._clients: Dict[tuple, Any] = {}
+        self._handlers: List[tuple] = []
+        # Creating clients from a boto3 session is not thread-safe; using built clients is
+        self._lock = threading.RLock()
+
+    def configure(self, max_pool_connections: Optional[int] = None,
+                  tcp_keepalive: Optional[bool] = None):
+        """Change pool settings for clients created from now on, e.g. to match a worker count"""
+        with self._lock:
+            if max_pool_connections is not None:
+                self.max_pool_connections = max_pool_connections
+            if tcp_keepalive is not None:
+                self.tcp_keepalive = tcp_keepalive
+
+    def client(self, service: str, region: str, profile: str = 'default',
+               role_arn: Optional[str] = None, endpoint_url: Optional[str] = None):
+        """Return the shared client for (profile, region, role), creating it on first use"""
+        key = (service, profile, region, role_arn, endpoint_url)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            if key not in self._clients:
+                config = Config(max_pool_connections=self.max_pool_connections,
+                                tcp_keepalive=self.tcp_keepalive)
+                client = self._session(profile, role_arn).client(
+                    service, region_name=region, endpoint_url=endpoint_url, config=config
+                )
+                for event_name, handler in self._handlers:
+                    client.meta.events.register(event_name, handler)
+                self._clients[key] = client
+                logger.debug(f"Created {service} client - Region: {region}, Profile: {profile}, "
+                             f"Role: {role_arn}")
+            return self._clients[key]
+
+    def register_handler(self, event_name: str, handler):
+        """Attach a botocore event handler to every current and future client"""
+        with self._lock:
+            self._handlers.append((event_name, handler))
+            for client in self._clients.values():
+                client.meta.events.register(event_name, handler)
+
+    def unregister_handler(self, event_name: str, handler):
+        """Detach a handler added with register_handler"""
+        with self._lock:
+            self._handlers.remove((event_name, handler))
+            for client in self._clients.values():
+                client.meta.events.unregister(event_name, handler)
+
+    def stats(self) -> Dict[str, Any]:
+        """Connection pool statistics for every shared client"""
+        with self._lock:
+            clients = list(self._clients.items())
+            sessions = len(self._sessions)
+
+        entries = []
+        for (service, profile, region, role_arn, endpoint_url), client in clients:
+            entry = {
+                "service": service,
+                "profile": profile,
+                "region": region,
+                "role_arn": role_arn,
+                "max_pool_connections": client.meta.config.max_pool_connections,
+                "host_pools": 0,
+                "connections_opened": 0,
+                "idle_connections": 0,
+                "requests": 0
+            }
+            # urllib3 pools behind botocore's HTTP session; absent until the first request
+            manager = getattr(getattr(client._endpoint, 'http_session', None), '_manager', None)
+            for pool_key in list(getattr(manager, 'pools', {}).keys()) if manager else []:
+                pool = manager.pools.get(pool_key)
+                if pool is None:
+                    continue
+                entry["host_pools"] += 1
+                entry["connections_opened"] += pool.num_connections
+                entry["requests"] += pool.num_requests
+                # The queue is pre-filled with None slots; real entries are open idle connections
+                idle = list(pool.pool.queue) if pool.pool is not None else []
+                entry["idle_connections"] += len([conn for conn in idle if conn is not None])
+            entries.append(entry)
+
+        return {"sessions": sessions, "clients": entries}
+
+    def clear(self):
+        """Drop every cached session and client"""
+        with self._lock:
+            self._clients.clear()
+            self._sessions.clear()
+
+    def _session(self, profile: str, role_arn: Optional[str]) -> boto3.Session:
+        """Shared session per profile and role, so credentials are resolved once"""
+        key = (profile, role_arn)
+        if key not in self._sessions:
+            # Lambda and containers use the default credential chain, no profile needed
+            base = self._sessions.get((profile, None))
+            if base is None:
+                if profile == 'default':
+                    base = boto3.Session()
+                else:
+                    base = boto3.Session(profile_name=profile)
+                self._sessions[(profile, None)] = base
+            if role_arn:
+                self._sessions[key] = self._assume_role_session(base, role_arn)
+        return self._sessions[key]
+
+    @staticmethod
+    def _assume_role_session(base: boto3.Session, role_arn: str) -> boto3.Session:
+        """Session whose role credentials refresh themselves before they expire"""
+        sts_client = base.client('sts')
+
+        def refresh():
+            credentials = sts_client.assume_role(
+                RoleArn=role_arn, RoleSessionName='iam-automation')['Credentials']
+            return {
+                "access_key": credentials['AccessKeyId'],
+                "secret_key": credentials['SecretAccessKey'],
+                "token": credentials['SessionToken'],
+                "expiry_time": credentials['Expiration'].isoformat()
+            }
+
+        botocore_session = get_session()
+        botocore_session._credentials = RefreshableCredentials.create_from_metadata(
+            metadata=refresh(), refresh_using=refresh, method='sts-assume-role'
+        )
+        return boto3.Session(botocore_session=botocore_session)
+
+
+# Shared by every IAM Manager in this process
+registry = ClientRegistry()
@@ -0,0 +1,179 @@
+"""
+Idempotency cache - Replays results of retried requests instead of repeating them
+"""
+
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Dict, Any, Callable, Optional, Tuple
+
+
+class IdempotencyCache:
+    def __init__(self, ttl_seconds: float = 86400, max_entries: int = 10000):
+        """Remember results for ttl_seconds, keeping at most max_entries keys"""
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Any, Tuple[str, Future, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def run(self, key: Any, fingerprint: str,
+            func: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """Return (result, replayed); concurrent callers with one key share a single execution.
+
+        Error results and exceptions are not remembered, so a retry runs the operation again.
+        Reusing a key for a different request raises ValueError.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= time.monotonic():
+                # Expired lazily on lookup; stale keys also age out through max_entries
+                del self._entries[key]
+                entry = None
+            if entry is not None:
+                if entry[0] != fingerprint:
+                    raise ValueError("Idempotency key was already used for a different request")
+                future, owner = entry[1], False
+            else:
+                future, owner = Future(), True
+                self._entries[key] = (fingerprint, future, float('inf'))
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+
+        if not owner:
+            return future.result(), True
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._forget(key, future)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            if result.get("status") == "error":
+                self._forget_locked(key, future)
+            elif key in self._entries:
+                self._entries[key] = (fingerprint, future, time.monotonic() + self.ttl_seconds)
+        future.set_result(result)
+        return result, False
+
+    def clear(self):
+        """Forget every remembered result"""
+        with self._lock:
+            self._entries.clear()
+
+    def _forget(self, key: Any, future: Future):
+        """Remove the entry of a failed execution"""
+        with self._lock:
+            self._forget_locked(key, future)
+
+    def _forget_locked(self, key: Any, future: Future):
+        """Remove the entry only if it still belongs to this execution"""
+        entry = self._entries.get(key)
+        if entry is not None and entry[1] is future:
+            del self._entries[key]
+
+
+class SqliteIdempotencyCache:
+    """IdempotencyCache whose keys live in a SQLite file, shared by every process on the host"""
+
+    def __init__(self, path: str, ttl_seconds: float = 86400, pending_timeout: float = 900,
+                 poll_interval: float = 0.1):
+        """Remember results for ttl_seconds; a claim older than pending_timeout is abandoned"""
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.pending_timeout = pending_timeout
+        self.poll_interval = poll_interval
+        self._schema_ready = False
+
+    def run(self, key: Any, fingerprint: str,
+            func: Callable[[], Dict[str, Any]]) -> Tuple[Dict[str, Any], bool]:
+        """Return (result, replayed); callers in any process with one key share one execution.
+
+        Error results and exceptions are not remembered, so a retry runs the operation again.
+        Reusing a key for a different request raises ValueError.
+        """
+        key = json.dumps(key, default=str)
+        while True:
+            claim, stored = self._claim(key, fingerprint)
+            if stored is not None:
+                return stored, True
+            if claim is not None:
+                break
+            # Another worker is running this key; wait for its outcome
+            time.sleep(self.poll_interval)
+
+        try:
+            result = func()
+        except BaseException:
+            self._release(key, claim)
+            raise
+
+        if result.get("status") == "error":
+            self._release(key, claim)
+        else:
+            self._execute("UPDATE entries SET result = ?, expires_at = ? "
+                          "WHERE key = ? AND claim = ?",
+                          json.dumps(result, default=str), time.time() + self.ttl_seconds,
+                          key, claim)
+        return result, False
+
+    def clear(self):
+        """Forget every remembered result"""
+        self._execute("DELETE FROM entries")
+
+    def _claim(self, key: str, fingerprint: str) -> Tuple[Optional[str], Optional[Dict[str, Any]]]:
+        """Return (claim token, None) to run, (None, result) to replay or (None, None) to wait"""
+        now = time.time()
+        conn = self._connect()
+        try:
+            # IMMEDIATE takes the write lock up front, so two workers never both claim a key
+            conn.execute("BEGIN IMMEDIATE")
+            conn.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            row = conn.execute("SELECT fingerprint, result FROM entries WHERE key = ?",
+                               (key,)).fetchone()
+            if row is not None:
+                if row[0] != fingerprint:
+                    raise ValueError("Idempotency key was already used for a different request")
+                conn.execute("COMMIT")
+                return None, (json.loads(row[1]) if row[1] is not None else None)
+
+            claim = uuid.uuid4().hex
+            # A pending claim expires too, so a worker that died mid-call does not block the key
+            conn.execute("INSERT INTO entries (key, fingerprint, claim, result, expires_at) "
+                         "VALUES (?, ?, ?, NULL, ?)",
+                         (key, fingerprint, claim, now + self.pending_timeout))
+            conn.execute("COMMIT")
+            return claim, None
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.close()
+
+    def _release(self, key: str, claim: str):
+        """Remove the entry of a failed execution, if it is still this execution's"""
+        self._execute("DELETE FROM entries WHERE key = ? AND claim = ?", key, claim)
+
+    def _execute(self, sql: str, *params):
+        """Run one autocommitted statement"""
+        conn = self._connect()
+        try:
+            conn.execute(sql, params)
+        finally:
+            conn.close()
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open a connection; one per call, so forked workers never share a handle"""
+        conn = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        if not self._schema_ready:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, "
+                         "fingerprint TEXT NOT NULL, claim TEXT NOT NULL, result TEXT, "
+                         "expires_at REAL NOT NULL)")
+            self._schema_ready = True
+        return conn
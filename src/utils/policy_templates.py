@@ -2,11 +2,11 @@
 IAM Policy Template Manager
 """
 
-import json
 import os
 # from jinja2 import Template, Environment, FileSystemLoader  # Not available in Lambda
 from typing import Dict, Any
 
+
 class PolicyTemplateManager:
     def __init__(self, templates_dir: str = None):
         """Initialize policy template manager"""
@@ -14,10 +14,10 @@ class PolicyTemplateManager:
             # Default to templates directory relative to project root
             current_dir = os.path.dirname(os.path.abspath(__file__))
             templates_dir = os.path.join(os.path.dirname(os.path.dirname(current_dir)), 'templates')
-        
+
         self.templates_dir = templates_dir
         # self.env = Environment(loader=FileSystemLoader(templates_dir))  # Disabled for Lambda
-    
+
     def generate_policy(self, template_name: str, variables: Dict[str, Any]) -> Dict[str, Any]:
         """Generate policy from template with variables (simplified for Lambda)"""
         # For Lambda, return pre-defined policies instead of templating
@@ -25,8 +25,9 @@ class PolicyTemplateManager:
         if template_name in common_policies:
             return common_policies[template_name]
         else:
-            raise Exception(f"Template {template_name} not found. Available: {list(common_policies.keys())}")
-    
+            raise Exception(f"Template {template_name} not found. "
+                            f"Available: {list(common_policies.keys())}")
+
     def get_common_policies(self) -> Dict[str, Dict[str, Any]]:
         """Get common pre-defined policies"""
         return {
@@ -71,7 +72,7 @@ class PolicyTemplateManager:
                 ]
             }
         }
-    
+
     def get_trust_policies(self) -> Dict[str, Dict[str, Any]]:
         """Get common trust policies"""
         return {
@@ -116,4 +117,4 @@ class PolicyTemplateManager:
                     }
                 ]
             }
-        }
\ No newline at end of file
+        }
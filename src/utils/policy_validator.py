@@ -0,0 +1,197 @@
+"""
+Offline IAM Policy Validator - pre-flight checks before any mutating API call
+"""
+
+import json
+import re
+from typing import Dict, Any, List, Optional
+
+# Service quotas (characters, whitespace not counted)
+MANAGED_POLICY_MAX_SIZE = 6144
+TRUST_POLICY_MAX_SIZE = 2048
+
+# Name length limits per resource type
+NAME_MAX_LENGTH = {"user": 64, "role": 64, "group": 128, "policy": 128}
+
+NAME_PATTERN = re.compile(r'^[\w+=,.@-]+$')
+PLACEHOLDER_PATTERN = re.compile(r'\{\{\s*([^}]*?)\s*\}\}')
+POLICY_ARN_PATTERN = re.compile(
+    r'^arn:aws(-cn|-us-gov)?:iam::(aws|\d{12}):policy/([\w+=,.@-]+/)*[\w+=,.@-]+$')
+PRINCIPAL_ARN_PATTERN = re.compile(r'^arn:aws(-cn|-us-gov)?:(iam|sts)::\d{12}:.+$')
+ACCOUNT_ID_PATTERN = re.compile(r'^\d{12}$')
+
+VALID_VERSIONS = ("2012-10-17", "2008-10-17")
+VALID_EFFECTS = ("Allow", "Deny")
+
+
+class PolicyValidator:
+    def validate_bulk_config(self, config: Dict[str, Any]) -> List[str]:
+        """Validate every resource in a bulk configuration and return all errors found"""
+        errors = []
+        if not isinstance(config, dict):
+            return ["config: must be a mapping with 'users', 'roles' and 'policies' lists"]
+
+        sections = (("users", "user"), ("roles", "role"), ("policies", "policy"))
+        for section, resource_type in sections:
+            entries = config.get(section, [])
+            if not isinstance(entries, list):
+                errors.append(f"{section}: must be a list")
+                continue
+
+            seen = {}
+            for index, entry in enumerate(entries):
+                location = f"{section}[{index}]"
+                if not isinstance(entry, dict) or 'name' not in entry:
+                    errors.append(f"{location}: missing 'name'")
+                    continue
+
+                name = entry['name']
+                location = f"{location} ({name})"
+                errors.extend(self.validate_name(name, resource_type, location))
+                if name in seen:
+                    errors.append(f"{location}: duplicate {resource_type} name, "
+                                  f"first defined at {section}[{seen[name]}]")
+                else:
+                    seen[name] = index
+
+                for arn in entry.get('policies', []):
+                    if not POLICY_ARN_PATTERN.match(str(arn)):
+                        errors.append(f"{location}: invalid policy ARN '{arn}'")
+
+                if resource_type == "role":
+                    errors.extend(self.validate_policy_file(
+                        entry.get('trust_policy_file'), "trust", location))
+                elif resource_type == "policy":
+                    errors.extend(self.validate_policy_file(
+                        entry.get('policy_file'), "managed", location))
+
+        return errors
+
+    def validate_name(self, name: Any, resource_type: str, location: str) -> List[str]:
+        """Check an IAM name against the allowed characters and length"""
+        if not isinstance(name, str) or not name:
+            return [f"{location}: {resource_type} name must be a non-empty string"]
+
+        errors = []
+        if len(name) > NAME_MAX_LENGTH[resource_type]:
+            errors.append(f"{location}: {resource_type} name exceeds "
+                          f"{NAME_MAX_LENGTH[resource_type]} characters")
+        if not NAME_PATTERN.match(name):
+            errors.append(f"{location}: {resource_type} name contains characters "
+                          f"outside [A-Za-z0-9+=,.@_-]")
+        return errors
+
+    def validate_policy_file(self, policy_file: Optional[str], kind: str,
+                             location: str) -> List[str]:
+        """Load a policy file and validate its document"""
+        if not policy_file:
+            field = 'trust_policy_file' if kind == 'trust' else 'policy_file'
+            return [f"{location}: missing {field}"]
+
+        try:
+            with open(policy_file, 'r') as f:
+                raw = f.read()
+        except OSError as e:
+            return [f"{location}: cannot read {policy_file}: {e.strerror}"]
+
+        return self.validate_policy_text(raw, kind, f"{location} {policy_file}")
+
+    def validate_policy_text(self, raw: str, kind: str, location: str) -> List[str]:
+        """Validate a policy document given as JSON text"""
+        try:
+            document = json.loads(raw)
+        except json.JSONDecodeError as e:
+            return [f"{location}: invalid JSON: {e}"]
+
+        return self.validate_policy_document(document, kind, location)
+
+    def validate_policy_document(self, document: Any, kind: str, location: str) -> List[str]:
+        """Check document structure, size and ARN syntax; kind is 'managed' or 'trust'"""
+        if not isinstance(document, dict):
+            return [f"{location}: policy document must be a JSON object"]
+
+        if 'Statement' not in document:
+            nested = [k for k, v in document.items() if isinstance(v, dict) and 'Statement' in v]
+            hint = f" (file holds several documents: {', '.join(nested)})" if nested else ""
+            return [f"{location}: missing 'Statement'{hint}"]
+
+        compact = json.dumps(document, separators=(',', ':'))
+        errors = [f"{location}: unresolved template placeholder '{{{{ {name} }}}}'"
+                  for name in sorted(set(PLACEHOLDER_PATTERN.findall(compact)))]
+
+        max_size = TRUST_POLICY_MAX_SIZE if kind == "trust" else MANAGED_POLICY_MAX_SIZE
+        size = len(compact)
+        if size > max_size:
+            errors.append(f"{location}: document is {size} characters, limit is {max_size}")
+
+        if document.get('Version') not in VALID_VERSIONS:
+            errors.append(f"{location}: 'Version' must be one of {', '.join(VALID_VERSIONS)}")
+
+        statements = document['Statement']
+        if isinstance(statements, dict):
+            statements = [statements]
+        if not isinstance(statements, list) or not statements:
+            return errors + [f"{location}: 'Statement' must be a non-empty list"]
+
+        sids = set()
+        for index, statement in enumerate(statements):
+            statement_location = f"{location} Statement[{index}]"
+            if not isinstance(statement, dict):
+                errors.append(f"{statement_location}: must be an object")
+                continue
+
+            sid = statement.get('Sid')
+            if sid is not None:
+                if sid in sids:
+                    errors.append(f"{statement_location}: duplicate Sid '{sid}'")
+                sids.add(sid)
+
+            errors.extend(self._validate_statement(statement, kind, statement_location))
+
+        return errors
+
+    def _validate_statement(self, statement: Dict[str, Any], kind: str, location: str) -> List[str]:
+        """Check a single statement's elements"""
+        errors = []
+        if statement.get('Effect') not in VALID_EFFECTS:
+            errors.append(f"{location}: 'Effect' must be Allow or Deny")
+
+        if ('Action' in statement) == ('NotAction' in statement):
+            errors.append(f"{location}: exactly one of 'Action' or 'NotAction' is required")
+
+        if kind == "trust":
+            if ('Principal' in statement) == ('NotPrincipal' in statement):
+                errors.append(f"{location}: trust policy statement needs exactly one of "
+                              f"'Principal' or 'NotPrincipal'")
+            principal = statement.get('Principal', statement.get('NotPrincipal'))
+            if isinstance(principal, dict):
+                for value in _as_list(principal.get('AWS')):
+                    if value != '*' and not ACCOUNT_ID_PATTERN.match(str(value)) \
+                            and not PRINCIPAL_ARN_PATTERN.match(str(value)):
+                        errors.append(f"{location}: invalid AWS principal '{value}'")
+        else:
+            if 'Principal' in statement or 'NotPrincipal' in statement:
+                errors.append(f"{location}: identity policies must not contain 'Principal'")
+            if ('Resource' in statement) == ('NotResource' in statement):
+                errors.append(f"{location}: exactly one of 'Resource' or 'NotResource' is required")
+            for resource in _as_list(statement.get('Resource', statement.get('NotResource'))):
+                if not _is_valid_resource(resource):
+                    errors.append(f"{location}: invalid resource ARN '{resource}'")
+
+        return errors
+
+
+def _as_list(value: Any) -> List[Any]:
+    """Normalize a policy element that may be a string or a list"""
+    if value is None:
+        return []
+    return value if isinstance(value, list) else [value]
+
+
+def _is_valid_resource(resource: Any) -> bool:
+    """Resources are '*' or arn:partition:service:region:account:resource"""
+    if resource == '*':
+        return True
+    parts = str(resource).split(':', 5)
+    return (len(parts) == 6 and parts[0] == 'arn'
+            and bool(parts[1]) and bool(parts[2]) and bool(parts[5]))
@@ -0,0 +1,189 @@
+"""
+Run profiler - cProfile, tracemalloc, AWS call timing and stack sampling for one run
+"""
+
+import cProfile
+import io
+import logging
+import os
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from typing import List, Dict, Any, Optional
+from utils.client_registry import registry as client_registry
+
+logger = logging.getLogger(__name__)
+
+
+class RunProfiler:
+    def __init__(self, output_prefix: str, sample_interval: float = 0.005, top: int = 30):
+        """Profile a run; reports are written as <output_prefix>.txt, .prof and .collapsed"""
+        self.output_prefix = output_prefix
+        self.sample_interval = sample_interval
+        self.top = top
+        self._profile = cProfile.Profile()
+        self._lock = threading.Lock()
+        self._calls: Dict[str, List[float]] = {}
+        self._intervals: List[tuple] = []
+        self._stacks: Counter = Counter()
+        self._stop_sampling = threading.Event()
+        self._sampler: Optional[threading.Thread] = None
+        self._started_tracemalloc = False
+        # botocore events bracketing every API call, including retries and response parsing
+        self._hooks = [('before-call', self._before_call), ('after-call', self._after_call),
+                       ('after-call-error', self._after_call)]
+
+    def start(self):
+        """Begin profiling the calling thread, sampling all threads and timing AWS calls"""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracemalloc = True
+        for event_name, handler in self._hooks:
+            client_registry.register_handler(event_name, handler)
+
+        self._sampler = threading.Thread(target=self._sample, name='run-profiler-sampler',
+                                         daemon=True)
+        self._sampler.start()
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+        self._profile.enable()
+
+    def stop(self) -> Dict[str, Any]:
+        """Stop profiling, write the reports and return the summary"""
+        self._profile.disable()
+        wall_seconds = time.perf_counter() - self._wall_start
+        cpu_seconds = time.process_time() - self._cpu_start
+
+        self._stop_sampling.set()
+        self._sampler.join()
+        for event_name, handler in self._hooks:
+            client_registry.unregister_handler(event_name, handler)
+
+        _, peak_bytes = tracemalloc.get_traced_memory()
+        allocations = tracemalloc.take_snapshot().statistics('lineno')[:self.top]
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+
+        with self._lock:
+            calls = {name: list(durations) for name, durations in self._calls.items()}
+            intervals = list(self._intervals)
+            stacks = Counter(self._stacks)
+
+        summary = {
+            "wall_seconds": round(wall_seconds, 3),
+            "cpu_seconds": round(cpu_seconds, 3),
+            "aws_calls": sum(len(durations) for durations in calls.values()),
+            # Summed call durations exceed wall time when calls run concurrently
+            "aws_call_seconds": round(sum(sum(durations) for durations in calls.values()), 3),
+            "aws_wait_wall_seconds": round(_covered_seconds(intervals), 3),
+            "peak_memory_mb": round(peak_bytes / 1024 / 1024, 2),
+            "stack_samples": sum(stacks.values()),
+            "report_file": f"{self.output_prefix}.txt",
+            "pstats_file": f"{self.output_prefix}.prof",
+            "collapsed_stacks_file": f"{self.output_prefix}.collapsed"
+        }
+
+        directory = os.path.dirname(self.output_prefix)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._profile.dump_stats(summary["pstats_file"])
+        with open(summary["collapsed_stacks_file"], 'w') as f:
+            for stack, count in stacks.most_common():
+                f.write(f"{stack} {count}\n")
+        with open(summary["report_file"], 'w') as f:
+            f.write(self._report(summary, calls, allocations))
+
+        logger.info(f"Profile written to {summary['report_file']}: "
+                    f"{summary['wall_seconds']}s wall, {summary['cpu_seconds']}s CPU, "
+                    f"{summary['aws_wait_wall_seconds']}s waiting on "
+                    f"{summary['aws_calls']} AWS calls")
+        return summary
+
+    def _before_call(self, context=None, **kwargs):
+        """Stamp the call's start in its per-request context"""
+        if context is not None:
+            context['profiling_started'] = time.perf_counter()
+
+    def _after_call(self, model=None, context=None, **kwargs):
+        """Record the duration of a finished call"""
+        started = (context or {}).pop('profiling_started', None)
+        if started is None:
+            return
+        finished = time.perf_counter()
+        if model is not None:
+            name = f"{model.service_model.service_name}.{model.name}"
+        else:
+            name = "unknown"
+        with self._lock:
+            self._calls.setdefault(name, []).append(finished - started)
+            self._intervals.append((started, finished))
+
+    def _sample(self):
+        """Collect collapsed stacks of every other thread until stopped"""
+        own_id = threading.get_ident()
+        names = {}
+        while not self._stop_sampling.wait(self.sample_interval):
+            for thread in threading.enumerate():
+                names[thread.ident] = thread.name
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                frames = []
+                while frame is not None:
+                    code = frame.f_code
+                    frames.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+                    frame = frame.f_back
+                stack = ';'.join([names.get(thread_id, str(thread_id))] + frames[::-1])
+                with self._lock:
+                    self._stacks[stack] += 1
+
+    def _report(self, summary: Dict[str, Any], calls: Dict[str, List[float]],
+                allocations: list) -> str:
+        """Human-readable hotspot report"""
+        out = io.StringIO()
+        out.write("RUN PROFILE\n")
+        out.write(f"Wall time:                {summary['wall_seconds']:.3f}s\n")
+        out.write(f"Process CPU time:         {summary['cpu_seconds']:.3f}s (all threads)\n")
+        out.write(f"Wall time in AWS calls:   {summary['aws_wait_wall_seconds']:.3f}s "
+                  f"(at least one call in flight)\n")
+        out.write(f"Summed AWS call time:     {summary['aws_call_seconds']:.3f}s "
+                  f"over {summary['aws_calls']} calls\n")
+        out.write(f"Peak traced memory:       {summary['peak_memory_mb']:.2f} MB\n\n")
+
+        out.write("AWS CALLS (by total time)\n")
+        out.write(f"{'operation':<50}{'calls':>8}{'total s':>10}{'mean ms':>10}{'max ms':>10}\n")
+        for name, durations in sorted(calls.items(), key=lambda item: -sum(item[1])):
+            mean_ms = sum(durations) / len(durations) * 1000
+            out.write(f"{name:<50}{len(durations):>8}{sum(durations):>10.3f}"
+                      f"{mean_ms:>10.1f}{max(durations) * 1000:>10.1f}\n")
+
+        out.write("\nTOP ALLOCATION SITES (live at end of run)\n")
+        for stat in allocations:
+            frame = stat.traceback[0]
+            out.write(f"{stat.size / 1024:>10.1f} KiB {stat.count:>8} blocks  "
+                      f"{frame.filename}:{frame.lineno}\n")
+
+        # cProfile only sees the thread that started the run; the collapsed stacks cover all threads
+        for sort_key in ('cumulative', 'tottime'):
+            out.write(f"\nHOTSPOTS BY {sort_key.upper()} TIME (profiled thread)\n")
+            stats = pstats.Stats(self._profile, stream=out).strip_dirs()
+            stats.sort_stats(sort_key).print_stats(self.top)
+        return out.getvalue()
+
+
+def _covered_seconds(intervals: List[tuple]) -> float:
+    """Length of the union of (start, end) intervals"""
+    covered, current_start, current_end = 0.0, None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end:
+            if current_end is not None:
+                covered += current_end - current_start
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        covered += current_end - current_start
+    return covered
@@ -0,0 +1,29 @@
+"""
+Thread-safe token bucket for pacing IAM API calls
+"""
+
+import threading
+import time
+
+
+class RateLimiter:
+    def __init__(self, rate: float, burst: int = None):
+        """Allow `rate` calls per second on average, with bursts of up to `burst` calls"""
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a call may be made"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
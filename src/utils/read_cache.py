@@ -0,0 +1,112 @@
+"""
+Request-scoped read-through cache with call coalescing for idempotent IAM reads
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, Hashable, Awaitable, List
+
+
+class ReadCache:
+    def __init__(self):
+        """Initialize an empty cache; create one per audit or request"""
+        self._lock = threading.Lock()
+        self._entries = {}
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any]) -> Any:
+        """Return the cached value for key, loading it at most once across threads"""
+        with self._lock:
+            if key in self._entries:
+                self.hits += 1
+                return self._entries[key]
+
+            future = self._in_flight.get(key)
+            owner = future is None
+            if owner:
+                future = Future()
+                self._in_flight[key] = future
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not owner:
+            # Another thread is already loading this key
+            return future.result()
+
+        try:
+            value = loader()
+        except BaseException as e:
+            # Failures are not cached; waiters see the error and later callers retry
+            with self._lock:
+                self._in_flight.pop(key, None)
+            future.set_exception(e)
+            raise
+
+        with self._lock:
+            self._entries[key] = value
+            self._in_flight.pop(key, None)
+        future.set_result(value)
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the run summary"""
+        return _build_stats(self.hits, self.misses, self.coalesced)
+
+
+class AsyncReadCache:
+    def __init__(self):
+        """Initialize an empty cache for a single event loop"""
+        self._entries = {}
+        self._in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+
+    async def get_or_load(self, key: Hashable, loader: Callable[[], Awaitable[Any]]) -> Any:
+        """Return the cached value for key, awaiting at most one load per key"""
+        if key in self._entries:
+            self.hits += 1
+            return self._entries[key]
+
+        task = self._in_flight.get(key)
+        if task is not None:
+            self.coalesced += 1
+            return await asyncio.shield(task)
+
+        self.misses += 1
+        task = asyncio.ensure_future(loader())
+        self._in_flight[key] = task
+        try:
+            value = await asyncio.shield(task)
+        finally:
+            self._in_flight.pop(key, None)
+
+        self._entries[key] = value
+        return value
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters for the run summary"""
+        return _build_stats(self.hits, self.misses, self.coalesced)
+
+
+def _build_stats(hits: int, misses: int, coalesced: int) -> Dict[str, Any]:
+    """Summarize cache counters; coalesced waits count as hits"""
+    lookups = hits + misses + coalesced
+    return {
+        "lookups": lookups,
+        "hits": hits,
+        "coalesced": coalesced,
+        "misses": misses,
+        "hit_rate": round((hits + coalesced) / lookups, 4) if lookups else 0.0
+    }
+
+
+def merge_stats(stats: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Combine counters from several caches, e.g. one per audit shard"""
+    return _build_stats(sum(s["hits"] for s in stats), sum(s["misses"] for s in stats),
+                        sum(s["coalesced"] for s in stats))
@@ -0,0 +1,90 @@
+"""
+Tag Index - In-memory inverted index from IAM tags to principals
+"""
+
+from typing import List, Dict, Any, Iterable, Optional, Set, Tuple
+
+# Principal kinds held in the index, keyed by their get_account_authorization_details list
+DETAIL_LISTS = {
+    "user": ("UserDetailList", "UserName"),
+    "role": ("RoleDetailList", "RoleName")
+}
+
+
+def parse_selector(selector: str) -> Tuple[str, Optional[str]]:
+    """Split 'key=value' into (key, value); a bare 'key' matches any value"""
+    key, sep, value = selector.partition('=')
+    key = key.strip()
+    if not key:
+        raise ValueError(f"Invalid tag selector '{selector}': expected key=value or key")
+    return key, value.strip() if sep else None
+
+
+def parse_tags(pairs: Iterable[str]) -> Dict[str, str]:
+    """Turn 'key=value' strings into a tag dict"""
+    tags = {}
+    for pair in pairs:
+        key, value = parse_selector(pair)
+        if value is None:
+            raise ValueError(f"Invalid tag '{pair}': expected key=value")
+        tags[key] = value
+    return tags
+
+
+class TagIndex:
+    def __init__(self):
+        """Initialize an empty index"""
+        self._by_pair: Dict[Tuple[str, str], Set[Tuple[str, str]]] = {}
+        self._by_key: Dict[str, Set[Tuple[str, str]]] = {}
+        self._tags: Dict[Tuple[str, str], Dict[str, str]] = {}
+
+    def __len__(self) -> int:
+        return len(self._tags)
+
+    @classmethod
+    def from_authorization_details(cls, pages: Iterable[Dict[str, Any]]) -> 'TagIndex':
+        """Build the index from get_account_authorization_details pages"""
+        index = cls()
+        for page in pages:
+            for kind, (list_key, name_key) in DETAIL_LISTS.items():
+                for detail in page.get(list_key, []):
+                    index.add(kind, detail[name_key], detail.get('Tags', []))
+        return index
+
+    def add(self, kind: str, name: str, tags: List[Dict[str, str]]):
+        """Index a principal's tags, replacing any previously indexed tags"""
+        principal = (kind, name)
+        self.remove(kind, name)
+        self._tags[principal] = {tag['Key']: tag['Value'] for tag in tags}
+        for key, value in self._tags[principal].items():
+            self._by_pair.setdefault((key, value), set()).add(principal)
+            self._by_key.setdefault(key, set()).add(principal)
+
+    def remove(self, kind: str, name: str):
+        """Drop a principal from the index"""
+        principal = (kind, name)
+        for key, value in self._tags.pop(principal, {}).items():
+            self._by_pair[(key, value)].discard(principal)
+            self._by_key[key].discard(principal)
+
+    def tags_for(self, kind: str, name: str) -> Dict[str, str]:
+        """Tags of one principal"""
+        return dict(self._tags.get((kind, name), {}))
+
+    def select(self, selectors: List[str], kind: Optional[str] = None) -> List[str]:
+        """Names of principals matching every selector, optionally of one kind"""
+        matches = None
+        # Intersect smallest sets first so broad selectors cost little
+        candidate_sets = []
+        for selector in selectors:
+            key, value = parse_selector(selector)
+            candidate_sets.append(self._by_key.get(key, set()) if value is None
+                                  else self._by_pair.get((key, value), set()))
+        for candidates in sorted(candidate_sets, key=len):
+            matches = set(candidates) if matches is None else matches & candidates
+            if not matches:
+                break
+
+        matches = matches if matches is not None else set(self._tags)
+        return sorted(name for principal_kind, name in matches
+                      if kind is None or principal_kind == kind)
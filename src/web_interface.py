@@ -2,10 +2,18 @@
 Simple web interface for IAM automation tool
 """
 
-from flask import Flask, render_template, request, jsonify, flash
+from flask import Flask, request, jsonify, Response
+import hashlib
 import json
 import os
+import queue
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from iam_manager import IAMManager
+from manager_cache import get_iam_manager, with_json_file
+from utils.client_registry import registry as client_registry
+from utils.idempotency import SqliteIdempotencyCache
 from utils.logger import setup_logger
 
 app = Flask(__name__)
@@ -14,99 +22,286 @@ app.secret_key = os.environ.get('SECRET_KEY', 'dev-secret-key')
 # Setup logging
 setup_logger()
 
+# Seconds between keep-alive comments on an idle event stream
+SSE_KEEPALIVE_SECONDS = 15
+
+# Upper bounds for one /api/batch request
+BATCH_MAX_OPERATIONS = int(os.environ.get('BATCH_MAX_OPERATIONS', '1000'))
+BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', '16'))
+
+# Results of batch operations by idempotency key, shared by every gunicorn worker on the host;
+# point BATCH_IDEMPOTENCY_DB at a shared volume when several containers serve the same clients
+_idempotency = SqliteIdempotencyCache(
+    os.environ.get('BATCH_IDEMPOTENCY_DB',
+                   os.path.join(tempfile.gettempdir(), 'iam-automation-idempotency.sqlite3')),
+    ttl_seconds=float(os.environ.get('BATCH_IDEMPOTENCY_TTL_SECONDS', '86400')))
+
+
+def stream_events(run) -> Response:
+    """Run an operation on a worker thread and relay its progress as Server-Sent Events"""
+    events = queue.Queue()
+
+    def progress(kind, entry):
+        events.put((kind, entry))
+
+    def worker():
+        try:
+            events.put(('result', run(progress)))
+        except Exception as e:
+            events.put(('result', {'status': 'error', 'message': str(e)}))
+        finally:
+            events.put(None)
+
+    threading.Thread(target=worker, daemon=True).start()
+
+    def generate():
+        while True:
+            try:
+                item = events.get(timeout=SSE_KEEPALIVE_SECONDS)
+            except queue.Empty:
+                yield ': keepalive\n\n'
+                continue
+            if item is None:
+                return
+            kind, data = item
+            yield f"event: {kind}\ndata: {json.dumps(data, default=str)}\n\n"
+
+    return Response(generate(), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 @app.route('/')
 def index():
     """Main dashboard"""
-    return render_template('index.html')
+    return INDEX_HTML
+
 
 @app.route('/api/create-user', methods=['POST'])
 def api_create_user():
     """API endpoint to create user"""
     try:
         data = request.get_json()
-        
-        iam_manager = IAMManager(
+
+        iam_manager = get_iam_manager(
             region=data.get('region', 'us-east-1'),
             dry_run=data.get('dry_run', False)
         )
-        
+
         result = iam_manager.create_user(
             username=data['username'],
             groups=data.get('groups', []),
             policies=data.get('policies', [])
         )
-        
+
         return jsonify(result)
-    
+
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+
 @app.route('/api/create-role', methods=['POST'])
 def api_create_role():
     """API endpoint to create role"""
     try:
         data = request.get_json()
-        
-        iam_manager = IAMManager(
+
+        iam_manager = get_iam_manager(
             region=data.get('region', 'us-east-1'),
             dry_run=data.get('dry_run', False)
         )
-        
-        # Create temporary trust policy file
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            json.dump(data['trust_policy'], f)
-            trust_policy_file = f.name
-        
-        try:
-            result = iam_manager.create_role(
-                role_name=data['role_name'],
-                trust_policy_file=trust_policy_file,
-                policies=data.get('policies', [])
-            )
-        finally:
-            os.unlink(trust_policy_file)
-        
+
+        result = with_json_file(data['trust_policy'], lambda path: iam_manager.create_role(
+            role_name=data['role_name'],
+            trust_policy_file=path,
+            policies=data.get('policies', [])
+        ))
+
         return jsonify(result)
-    
+
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+
+# Operations accepted by /api/batch: name -> handler(iam_manager, params)
+BATCH_OPERATIONS = {
+    'create_user': lambda iam_manager, params: iam_manager.create_user(
+        username=params['username'],
+        groups=params.get('groups', []),
+        policies=params.get('policies', [])
+    ),
+    'create_role': lambda iam_manager, params: with_json_file(
+        params['trust_policy'],
+        lambda path: iam_manager.create_role(params['role_name'], path, params.get('policies', []))
+    ),
+    'create_policy': lambda iam_manager, params: with_json_file(
+        params['policy_document'],
+        lambda path: iam_manager.create_policy(params['policy_name'], path)
+    ),
+    'tag': lambda iam_manager, params: iam_manager.bulk_tag(
+        params['tags'], params.get('users', []), params.get('roles', [])
+    ),
+    'untag': lambda iam_manager, params: iam_manager.bulk_untag(
+        params['tag_keys'], params.get('users', []), params.get('roles', [])
+    )
+}
+
+
+def run_batch_operation(iam_manager: IAMManager, index: int, operation) -> dict:
+    """Run one batch operation, replaying the stored result for a known idempotency key"""
+    line = {'index': index}
+    try:
+        if not isinstance(operation, dict):
+            raise ValueError("Operation must be an object")
+        line['id'] = operation.get('id', index)
+        line['op'] = operation.get('op')
+        handler = BATCH_OPERATIONS.get(line['op'])
+        if handler is None:
+            raise ValueError(f"Unknown operation '{line['op']}'; "
+                             f"expected one of {', '.join(BATCH_OPERATIONS)}")
+
+        params = operation.get('params', {})
+        key = operation.get('idempotency_key')
+        if key is None:
+            result, replayed = handler(iam_manager, params), False
+        else:
+            request = json.dumps([line['op'], params], sort_keys=True)
+            fingerprint = hashlib.sha256(request.encode()).hexdigest()
+            scope = (iam_manager.region, iam_manager.dry_run, key)
+            result, replayed = _idempotency.run(scope, fingerprint,
+                                                lambda: handler(iam_manager, params))
+
+        line.update(result=result, replayed=replayed)
+    except KeyError as e:
+        line.update(result={'status': 'error', 'message': f"Missing parameter {e}"}, replayed=False)
+    except Exception as e:
+        line.update(result={'status': 'error', 'message': str(e)}, replayed=False)
+    return line
+
+
+@app.route('/api/pool-stats', methods=['GET'])
+def api_pool_stats():
+    """API endpoint reporting this worker's shared AWS client connection pools"""
+    return jsonify(client_registry.stats())
+
+
+def run_audit(iam_manager: IAMManager, progress_callback=None):
+    """Run an audit into a temporary file and return the result with its data"""
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        temp_file = f.name
+
+    try:
+        result = iam_manager.audit_permissions(temp_file, progress_callback=progress_callback)
+
+        # Read audit results
+        if result['status'] == 'success':
+            with open(temp_file, 'r') as f:
+                result['audit_data'] = json.load(f)
+    finally:
+        os.unlink(temp_file)
+
+    return result
+
+
 @app.route('/api/audit', methods=['POST'])
 def api_audit():
     """API endpoint to run audit"""
     try:
         data = request.get_json()
-        
-        iam_manager = IAMManager(
+
+        iam_manager = get_iam_manager(
             region=data.get('region', 'us-east-1')
         )
-        
-        # Use temporary file for audit results
-        import tempfile
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
-            temp_file = f.name
-        
-        try:
-            result = iam_manager.audit_permissions(temp_file)
-            
-            # Read audit results
-            with open(temp_file, 'r') as f:
-                audit_data = json.load(f)
-            
-            result['audit_data'] = audit_data
-        finally:
-            os.unlink(temp_file)
-        
-        return jsonify(result)
-    
+
+        return jsonify(run_audit(iam_manager))
+
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
 
+
+@app.route('/api/audit/stream', methods=['GET'])
+def api_audit_stream():
+    """API endpoint streaming audit entries as Server-Sent Events"""
+    iam_manager = get_iam_manager(
+        region=request.args.get('region', 'us-east-1')
+    )
+
+    def run(progress):
+        result = run_audit(iam_manager, progress_callback=progress)
+        # Entries were already streamed; only send the summary at the end
+        summary = result.pop('audit_data', {}).get('summary')
+        if summary is not None:
+            result['summary'] = summary
+        return result
+
+    return stream_events(run)
+
+
+@app.route('/api/bulk-create/stream', methods=['POST'])
+def api_bulk_create_stream():
+    """API endpoint streaming bulk creation results as Server-Sent Events"""
+    data = request.get_json()
+
+    iam_manager = get_iam_manager(
+        region=data.get('region', 'us-east-1'),
+        dry_run=data.get('dry_run', False)
+    )
+
+    # Create temporary config file
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+        json.dump(data['config'], f)
+        config_file = f.name
+
+    def run(progress):
+        try:
+            return iam_manager.bulk_create_from_config(config_file, progress_callback=progress)
+        finally:
+            os.unlink(config_file)
+
+    return stream_events(run)
+
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    """API endpoint running independent operations concurrently, streaming results as they finish"""
+    data = request.get_json(silent=True)
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list):
+        return jsonify({'status': 'error',
+                        'message': "Request body must contain an 'operations' list"}), 400
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        return jsonify({'status': 'error',
+                        'message': f"At most {BATCH_MAX_OPERATIONS} operations per batch"}), 413
+
+    try:
+        requested = int(data.get('max_workers', BATCH_MAX_WORKERS))
+        max_workers = max(1, min(requested, BATCH_MAX_WORKERS))
+    except (TypeError, ValueError):
+        return jsonify({'status': 'error', 'message': "'max_workers' must be an integer"}), 400
+
+    iam_manager = get_iam_manager(
+        region=data.get('region', 'us-east-1'),
+        dry_run=data.get('dry_run', False)
+    )
+
+    def generate():
+        summary = {}
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(run_batch_operation, iam_manager, index, operation)
+                       for index, operation in enumerate(operations)]
+            # Lines are sent in completion order; 'index' ties each back to the request
+            for future in as_completed(futures):
+                line = future.result()
+                status = line['result'].get('status', 'unknown')
+                summary[status] = summary.get(status, 0) + 1
+                yield json.dumps(line, default=str) + '\n'
+        yield json.dumps({'summary': summary, 'total': len(operations)}) + '\n'
+
+    return Response(generate(), mimetype='application/x-ndjson',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
 # Simple HTML template (you can create proper templates later)
-@app.route('/templates/index.html')
-def serve_template():
-    return '''
+INDEX_HTML = '''
 <!DOCTYPE html>
 <html>
 <head>
@@ -117,56 +312,83 @@ def serve_template():
         .form-group { margin: 20px 0; }
         label { display: block; margin-bottom: 5px; font-weight: bold; }
         input, select, textarea { width: 100%; padding: 8px; margin-bottom: 10px; }
-        button { background: #007cba; color: white; padding: 10px 20px; border: none; cursor: pointer; }
+        button { background: #007cba; color: white; padding: 10px 20px; border: none;
+                 cursor: pointer; }
         button:hover { background: #005a87; }
         .result { margin: 20px 0; padding: 15px; background: #f0f0f0; border-radius: 5px; }
         .error { background: #ffebee; color: #c62828; }
         .success { background: #e8f5e8; color: #2e7d32; }
+        table { width: 100%; border-collapse: collapse; }
+        th, td { text-align: left; padding: 4px 8px; border-bottom: 1px solid #ddd;
+                 font-size: 13px; }
     </style>
 </head>
 <body>
     <div class="container">
         <h1>IAM Automation Tool</h1>
-        
+
         <div class="form-group">
             <h2>Create User</h2>
             <form id="createUserForm">
                 <label>Username:</label>
                 <input type="text" id="username" required>
-                
+
                 <label>Groups (comma-separated):</label>
                 <input type="text" id="groups" placeholder="developers,admins">
-                
+
                 <label>Policies (comma-separated ARNs):</label>
-                <textarea id="policies" placeholder="arn:aws:iam::aws:policy/ReadOnlyAccess"></textarea>
-                
+                <textarea id="policies"
+                          placeholder="arn:aws:iam::aws:policy/ReadOnlyAccess"></textarea>
+
                 <label>
                     <input type="checkbox" id="dryRun"> Dry Run
                 </label>
-                
+
                 <button type="submit">Create User</button>
             </form>
         </div>
-        
+
         <div class="form-group">
             <h2>Run Audit</h2>
             <button onclick="runAudit()">Run IAM Audit</button>
+            <p id="auditProgress"></p>
+            <table id="auditTable" style="display: none;">
+                <thead><tr><th>Type</th><th>Name</th><th>Attached</th><th>Inline</th></tr></thead>
+                <tbody></tbody>
+            </table>
+        </div>
+
+        <div class="form-group">
+            <h2>Bulk Create</h2>
+            <label>Configuration (JSON with users, roles and policies):</label>
+            <textarea id="bulkConfig" rows="6"
+                placeholder='{"users": [{"name": "alice", "groups": ["developers"]}]}'></textarea>
+            <label>
+                <input type="checkbox" id="bulkDryRun"> Dry Run
+            </label>
+            <button onclick="runBulkCreate()">Run Bulk Create</button>
+            <p id="bulkProgress"></p>
+            <table id="bulkTable" style="display: none;">
+                <thead><tr><th>Type</th><th>Name</th><th>Status</th></tr></thead>
+                <tbody></tbody>
+            </table>
         </div>
-        
+
         <div id="result" class="result" style="display: none;"></div>
     </div>
-    
+
     <script>
         document.getElementById('createUserForm').addEventListener('submit', function(e) {
             e.preventDefault();
-            
+
             const data = {
                 username: document.getElementById('username').value,
                 groups: document.getElementById('groups').value.split(',').filter(g => g.trim()),
-                policies: document.getElementById('policies').value.split(',').filter(p => p.trim()),
+                policies: document.getElementById('policies').value.split(',')
+                    .filter(p => p.trim()),
                 dry_run: document.getElementById('dryRun').checked
             };
-            
+
             fetch('/api/create-user', {
                 method: 'POST',
                 headers: {'Content-Type': 'application/json'},
@@ -180,22 +402,102 @@ def serve_template():
                 showResult({status: 'error', message: error.message});
             });
         });
-        
+
         function runAudit() {
-            fetch('/api/audit', {
-                method: 'POST',
-                headers: {'Content-Type': 'application/json'},
-                body: JSON.stringify({})
-            })
-            .then(response => response.json())
-            .then(result => {
-                showResult(result);
-            })
-            .catch(error => {
-                showResult({status: 'error', message: error.message});
+            const table = document.getElementById('auditTable');
+            const body = table.querySelector('tbody');
+            const progress = document.getElementById('auditProgress');
+            body.innerHTML = '';
+            table.style.display = 'table';
+            let count = 0;
+
+            const source = new EventSource('/api/audit/stream');
+            ['user', 'role', 'group', 'policy'].forEach(kind => {
+                source.addEventListener(kind, event => {
+                    addRow(body, kind, JSON.parse(event.data));
+                    progress.textContent = 'Audited ' + (++count) + ' entries...';
+                });
+            });
+            source.addEventListener('result', event => {
+                source.close();
+                progress.textContent = 'Audit finished: ' + count + ' entries';
+                showResult(JSON.parse(event.data));
             });
+            source.onerror = () => {
+                source.close();
+                showResult({status: 'error', message: 'Audit stream interrupted'});
+            };
+        }
+
+        async function runBulkCreate() {
+            const table = document.getElementById('bulkTable');
+            const body = table.querySelector('tbody');
+            const progress = document.getElementById('bulkProgress');
+            body.innerHTML = '';
+            let count = 0;
+
+            let config;
+            try {
+                config = JSON.parse(document.getElementById('bulkConfig').value);
+            } catch (error) {
+                showResult({status: 'error',
+                            message: 'Invalid configuration JSON: ' + error.message});
+                return;
+            }
+            table.style.display = 'table';
+
+            // EventSource cannot POST, so read the same event stream from fetch
+            try {
+                const response = await fetch('/api/bulk-create/stream', {
+                    method: 'POST',
+                    headers: {'Content-Type': 'application/json'},
+                    body: JSON.stringify({config: config,
+                                          dry_run: document.getElementById('bulkDryRun').checked})
+                });
+                const reader = response.body.pipeThrough(new TextDecoderStream()).getReader();
+                let buffer = '';
+                while (true) {
+                    const {value, done} = await reader.read();
+                    if (done) break;
+                    buffer += value;
+                    const events = buffer.split('\\n\\n');
+                    buffer = events.pop();
+                    events.forEach(block => {
+                        const kind = (block.match(/^event: (.*)$/m) || [])[1];
+                        const data = (block.match(/^data: (.*)$/m) || [])[1];
+                        if (!kind || data === undefined) return;
+                        const entry = JSON.parse(data);
+                        if (kind === 'result') {
+                            progress.textContent = 'Bulk create finished: ' + count + ' resources';
+                            showResult(entry);
+                            return;
+                        }
+                        const row = body.insertRow();
+                        const name = entry.username || entry.role_name || entry.policy_name
+                            || entry.message;
+                        [kind, name, entry.status].forEach(text => {
+                            row.insertCell().textContent = text || '';
+                        });
+                        progress.textContent = 'Processed ' + (++count) + ' resources...';
+                    });
+                }
+            } catch (error) {
+                showResult({status: 'error',
+                            message: 'Bulk create stream interrupted: ' + error.message});
+            }
         }
-        
+
+        function addRow(body, kind, entry) {
+            const row = body.insertRow();
+            const name = entry.username || entry.role_name || entry.group_name || entry.policy_name;
+            const attached = entry.attached_policies
+                ? entry.attached_policies.length : entry.attachment_count;
+            const inline = entry.inline_policies ? entry.inline_policies.length : '';
+            [kind, name, attached, inline].forEach(value => {
+                row.insertCell().textContent = value === undefined ? '' : value;
+            });
+        }
+
         function showResult(result) {
             const resultDiv = document.getElementById('result');
             resultDiv.style.display = 'block';
@@ -207,6 +509,33 @@ def serve_template():
 </html>
     '''
 
+
+@app.route('/templates/index.html')
+def serve_template():
+    return INDEX_HTML
+
+
+def run_production_server(port: int):
+    """Serve the app with multiple gunicorn worker processes"""
+    from gunicorn.app.base import BaseApplication
+
+    class StandaloneApplication(BaseApplication):
+        def load_config(self):
+            config_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..',
+                                       'gunicorn.conf.py')
+            self.load_config_from_file(config_file)
+            self.cfg.set('bind', f'0.0.0.0:{port}')
+
+        def load(self):
+            return app
+
+    StandaloneApplication().run()
+
+
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 8000))
-    app.run(host='0.0.0.0', port=port, debug=True)
\ No newline at end of file
+    if os.environ.get('WEB_SERVER_MODE', 'development') == 'production':
+        run_production_server(port)
+    else:
+        app.run(host='0.0.0.0', port=port, debug=os.environ.get('FLASK_DEBUG', '1') == '1',
+                threaded=True)
@@ -0,0 +1,102 @@
+"""
+Shared mock IAM account for audit tests
+"""
+
+from unittest.mock import Mock
+from botocore.exceptions import ClientError
+
+ACCOUNT_ID = "123456789012"
+READ_ONLY_ACCESS = "arn:aws:iam::aws:policy/ReadOnlyAccess"
+POWER_USER_ACCESS = "arn:aws:iam::aws:policy/PowerUserAccess"
+
+def _attached(policies):
+    return [{"PolicyName": arn.split('/')[-1], "PolicyArn": arn} for arn in policies]
+
+def _inline(names):
+    return [{"PolicyName": name, "PolicyDocument": {}} for name in names]
+
+def _tags(tags):
+    return [{"Key": key, "Value": value} for key, value in (tags or {}).items()]
+
+def user(name, path="/", groups=(), policies=(), inline=(), tags=None):
+    """User as listed in get_account_authorization_details"""
+    return {"UserName": name, "Path": path, "Arn": f"arn:aws:iam::{ACCOUNT_ID}:user{path}{name}",
+            "GroupList": list(groups), "AttachedManagedPolicies": _attached(policies),
+            "UserPolicyList": _inline(inline), "Tags": _tags(tags)}
+
+def role(name, path="/", policies=(), inline=(), tags=None):
+    """Role as listed in get_account_authorization_details"""
+    return {"RoleName": name, "Path": path, "Arn": f"arn:aws:iam::{ACCOUNT_ID}:role{path}{name}",
+            "AttachedManagedPolicies": _attached(policies), "RolePolicyList": _inline(inline),
+            "Tags": _tags(tags)}
+
+def group(name, group_id, policies=(), inline=()):
+    """Group as listed in get_account_authorization_details and list_groups"""
+    return {"GroupName": name, "GroupId": group_id, "Path": "/",
+            "Arn": f"arn:aws:iam::{ACCOUNT_ID}:group/{name}",
+            "AttachedManagedPolicies": _attached(policies), "GroupPolicyList": _inline(inline)}
+
+def policy(name, attachment_count=0, default_version_id="v1"):
+    """Customer-managed policy as returned by list_policies"""
+    return {"PolicyName": name, "PolicyId": f"ANPA{name.upper()}", "AttachmentCount": attachment_count,
+            "Arn": f"arn:aws:iam::{ACCOUNT_ID}:policy/{name}", "DefaultVersionId": default_version_id}
+
+def make_iam_client(users=(), roles=(), groups=(), policies=(), page_size=None):
+    """Mock IAM client serving one account through paginators and per-entity reads
+
+    client.entities holds the users, roles and groups by name; tests may add or remove entries.
+    Authorization details come in pages of page_size users (all in one page by default).
+    """
+    client = Mock()
+    entities = {
+        "users": {u["UserName"]: u for u in users},
+        "roles": {r["RoleName"]: r for r in roles},
+        "groups": {g["GroupName"]: g for g in groups}
+    }
+    client.entities = entities
+
+    page_size = page_size or max(len(users), 1)
+    detail_pages = [{"UserDetailList": list(users[i:i + page_size]), "RoleDetailList": []}
+                    for i in range(0, max(len(users), 1), page_size)]
+    detail_pages[0]["RoleDetailList"] = list(roles)
+    detail_pages[-1]["GroupDetailList"] = list(groups)
+
+    pages = {
+        'get_account_authorization_details': detail_pages,
+        'list_users': [{"Users": [{"UserName": u["UserName"], "Arn": u["Arn"]} for u in users]}],
+        'list_roles': [{"Roles": [{"RoleName": r["RoleName"], "Arn": r["Arn"]} for r in roles]}],
+        'list_groups': [{"Groups": list(groups)}],
+        'list_policies': [{"Policies": list(policies)}]
+    }
+    # The same paginator per operation, so tests can assert on its calls
+    paginators = {op: Mock(paginate=Mock(return_value=op_pages)) for op, op_pages in pages.items()}
+    client.get_paginator.side_effect = lambda op: paginators[op]
+
+    def lookup(section, name, operation):
+        if name not in entities[section]:
+            raise ClientError({"Error": {"Code": "NoSuchEntity", "Message": f"{name} not found"}},
+                              operation)
+        return entities[section][name]
+
+    def groups_for_user(UserName):
+        names = lookup("users", UserName, "ListGroupsForUser")["GroupList"]
+        return {"Groups": [{"GroupName": n, "GroupId": entities["groups"][n]["GroupId"]} for n in names]}
+
+    client.get_user.side_effect = lambda UserName: {"User": lookup("users", UserName, "GetUser")}
+    client.get_role.side_effect = lambda RoleName: {"Role": lookup("roles", RoleName, "GetRole")}
+    client.get_group.side_effect = lambda GroupName, **kwargs: {
+        "Group": lookup("groups", GroupName, "GetGroup")}
+    client.list_attached_user_policies.side_effect = lambda UserName: {
+        "AttachedPolicies": lookup("users", UserName, "ListAttachedUserPolicies")["AttachedManagedPolicies"]}
+    client.list_groups_for_user.side_effect = groups_for_user
+    client.list_user_policies.side_effect = lambda UserName: {"PolicyNames": [
+        p["PolicyName"] for p in lookup("users", UserName, "ListUserPolicies")["UserPolicyList"]]}
+    client.list_attached_role_policies.side_effect = lambda RoleName: {
+        "AttachedPolicies": lookup("roles", RoleName, "ListAttachedRolePolicies")["AttachedManagedPolicies"]}
+    client.list_role_policies.side_effect = lambda RoleName: {"PolicyNames": [
+        p["PolicyName"] for p in lookup("roles", RoleName, "ListRolePolicies")["RolePolicyList"]]}
+    client.list_attached_group_policies.side_effect = lambda GroupName: {
+        "AttachedPolicies": lookup("groups", GroupName, "ListAttachedGroupPolicies")["AttachedManagedPolicies"]}
+    client.list_group_policies.side_effect = lambda GroupName: {"PolicyNames": [
+        p["PolicyName"] for p in lookup("groups", GroupName, "ListGroupPolicies")["GroupPolicyList"]]}
+    return client
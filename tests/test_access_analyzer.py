@@ -0,0 +1,85 @@
+"""
+Unit tests for Service Access Analyzer
+"""
+
+import unittest
+from unittest.mock import Mock
+import json
+import sys
+import os
+import tempfile
+from datetime import datetime, timezone
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from access_analyzer import ServiceAccessAnalyzer
+
+class TestServiceAccessAnalyzer(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.audit_file = os.path.join(self.tmp_dir.name, 'audit.json')
+        self.output_file = os.path.join(self.tmp_dir.name, 'unused.json')
+        with open(self.audit_file, 'w') as f:
+            json.dump({
+                "users": [{"username": "alice", "arn": "arn:aws:iam::123456789012:user/alice"}],
+                "roles": [{"role_name": "app", "arn": "arn:aws:iam::123456789012:role/app"}]
+            }, f)
+
+        self.iam_client = Mock()
+        self.iam_client.generate_service_last_accessed_details.side_effect = lambda Arn: {"JobId": Arn}
+        self.polls = {}
+
+        def details(JobId):
+            self.polls[JobId] = self.polls.get(JobId, 0) + 1
+            if self.polls[JobId] == 1:
+                return {"JobStatus": "IN_PROGRESS"}
+            return {
+                "JobStatus": "COMPLETED",
+                "ServicesLastAccessed": [
+                    {"ServiceNamespace": "s3", "ServiceName": "Amazon S3",
+                     "LastAuthenticated": datetime(2024, 1, 1, tzinfo=timezone.utc)},
+                    {"ServiceNamespace": "ec2", "ServiceName": "Amazon EC2"}
+                ],
+                "IsTruncated": False
+            }
+
+        self.iam_client.get_service_last_accessed_details.side_effect = details
+        self.analyzer = ServiceAccessAnalyzer(
+            Mock(iam_client=self.iam_client),
+            initial_poll_delay=0,
+            cache_dir=os.path.join(self.tmp_dir.name, 'cache')
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_reports_unused_services(self):
+        """Test never-used services are reported per principal"""
+        result = self.analyzer.analyze(self.audit_file, self.output_file)
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['summary']['principals_with_unused_services'], 2)
+        with open(self.output_file) as f:
+            report = json.load(f)
+        self.assertEqual(report['principals'][0]['unused_services'], ['ec2'])
+
+    def test_unused_days_threshold(self):
+        """Test services idle longer than the threshold are reported as unused"""
+        self.analyzer.analyze(self.audit_file, self.output_file, unused_days=30)
+
+        with open(self.output_file) as f:
+            report = json.load(f)
+        self.assertEqual(report['principals'][1]['unused_services'], ['ec2', 's3'])
+
+    def test_results_cached_by_principal(self):
+        """Test a second run reuses cached results instead of submitting jobs"""
+        self.analyzer.analyze(self.audit_file, self.output_file)
+        self.analyzer.analyze(self.audit_file, self.output_file, unused_days=30)
+
+        self.assertEqual(self.iam_client.generate_service_last_accessed_details.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
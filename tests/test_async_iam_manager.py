@@ -0,0 +1,189 @@
+"""
+Unit tests for Async IAM Manager
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import asyncio
+import json
+import sys
+import os
+import tempfile
+import threading
+from contextlib import asynccontextmanager
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import async_iam_manager
+from async_iam_manager import AsyncIAMManager
+from iam_manager import IAMManager
+from iam_fixtures import make_iam_client, user, role, group, policy, READ_ONLY_ACCESS, POWER_USER_ACCESS
+
+def make_account_client():
+    """Build a mock IAM client with two users and one role"""
+    client = make_iam_client(
+        users=[user("alice", groups=["developers"], policies=[READ_ONLY_ACCESS], tags={"team": "payments"}),
+               user("bob")],
+        roles=[role("app", inline=["inline"])],
+        groups=[group("developers", "AGPA1", policies=[POWER_USER_ACCESS])],
+        policies=[policy("custom")],
+        page_size=1
+    )
+    client.create_user.side_effect = lambda UserName: {"User": {"Arn": f"arn:aws:iam::123456789012:user/{UserName}"}}
+    return client
+
+class AsyncClientStub:
+    """aiobotocore-style client over a sync mock: awaitable calls and async paginators"""
+
+    def __init__(self, client):
+        self._client = client
+
+    def __getattr__(self, operation):
+        method = getattr(self._client, operation)
+
+        async def call(**kwargs):
+            await asyncio.sleep(0)
+            return method(**kwargs)
+        return call
+
+    def get_paginator(self, operation):
+        paginator = self._client.get_paginator(operation)
+
+        async def pages(**kwargs):
+            for page in paginator.paginate(**kwargs):
+                await asyncio.sleep(0)
+                yield page
+        return Mock(paginate=pages)
+
+@patch.object(async_iam_manager, 'AIOBOTOCORE_AVAILABLE', False)
+class TestAsyncIAMManager(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_create_user_dry_run(self):
+        """Test user creation in dry run mode"""
+        async def run():
+            async with AsyncIAMManager(dry_run=True) as manager:
+                return await manager.create_user('test-user')
+
+        result = asyncio.run(run())
+        self.assertEqual(result, {"status": "dry_run", "username": "test-user"})
+
+    def test_create_user_attaches_groups_and_policies(self):
+        """Test user creation adds groups and policies"""
+        client = make_account_client()
+
+        async def run():
+            async with AsyncIAMManager() as manager:
+                manager.iam_client = client
+                return await manager.create_user('carol', groups=['g1', 'g2'], policies=['arn:p'])
+
+        result = asyncio.run(run())
+        self.assertEqual(result['arn'], 'arn:aws:iam::123456789012:user/carol')
+        self.assertEqual(client.add_user_to_group.call_count, 2)
+        client.attach_user_policy.assert_called_once_with(UserName='carol', PolicyArn='arn:p')
+
+    def test_audit_matches_sync_manager(self):
+        """Test async audit writes the same report as the sync class"""
+        sync_file = os.path.join(self.tmp_dir.name, 'sync.json')
+        async_file = os.path.join(self.tmp_dir.name, 'async.json')
+
+        sync_manager = IAMManager()
+        sync_manager.iam_client = make_account_client()
+        sync_result = sync_manager.audit_permissions(sync_file)
+
+        async_client = make_account_client()
+
+        async def run():
+            async with AsyncIAMManager(max_concurrency=2) as manager:
+                manager.iam_client = async_client
+                return await manager.audit_permissions(async_file)
+
+        async_result = asyncio.run(run())
+
+        self.assertEqual(sync_result['status'], async_result['status'])
+        # Users and roles come from one authorization details pass, with no per-principal calls
+        async_client.get_paginator('get_account_authorization_details').paginate.assert_called_once_with(
+            Filter=['User', 'Role']
+        )
+        async_client.list_attached_user_policies.assert_not_called()
+        async_client.list_role_policies.assert_not_called()
+        with open(sync_file) as f1, open(async_file) as f2:
+            sync_report, async_report = json.load(f1), json.load(f2)
+
+        # Cache counters differ only in whether a repeat lookup was a hit or a coalesced wait
+        sync_cache = sync_report["summary"].pop("read_cache")
+        async_cache = async_report["summary"].pop("read_cache")
+        self.assertEqual(sync_cache["hit_rate"], async_cache["hit_rate"])
+        self.assertEqual(sync_report, async_report)
+
+    def test_fallback_runs_max_concurrency_calls_at_once(self):
+        """Test the thread fallback is not capped by the default executor size"""
+        client = Mock()
+        lock = threading.Lock()
+        in_flight, peak = [0], [0]
+
+        def slow_call(**kwargs):
+            with lock:
+                in_flight[0] += 1
+                peak[0] = max(peak[0], in_flight[0])
+            threading.Event().wait(0.05)
+            with lock:
+                in_flight[0] -= 1
+            return {"User": {"Arn": "arn"}}
+        client.create_user.side_effect = slow_call
+
+        async def run():
+            async with AsyncIAMManager(max_concurrency=64) as manager:
+                manager.iam_client = client
+                await asyncio.gather(*[manager.create_user(f'user{i}') for i in range(64)])
+
+        asyncio.run(run())
+        self.assertGreater(peak[0], 32)
+
+class TestAsyncIAMManagerNative(unittest.TestCase):
+
+    def test_audit_over_aiobotocore_client(self):
+        """Test the native path with a stubbed aiobotocore session writes the sync report"""
+        session = Mock()
+
+        @asynccontextmanager
+        async def create_client(service, region_name=None, config=None):
+            yield AsyncClientStub(make_account_client())
+        session.create_client.side_effect = create_client
+        aio_config = Mock()
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            sync_file = os.path.join(tmp_dir, 'sync.json')
+            async_file = os.path.join(tmp_dir, 'async.json')
+            sync_manager = IAMManager()
+            sync_manager.iam_client = make_account_client()
+            sync_manager.audit_permissions(sync_file)
+
+            async def run():
+                async with AsyncIAMManager(max_concurrency=4) as manager:
+                    self.assertIsInstance(manager.iam_client, AsyncClientStub)
+                    return await manager.audit_permissions(async_file)
+
+            with patch.object(async_iam_manager, 'AIOBOTOCORE_AVAILABLE', True), \
+                    patch.object(async_iam_manager, 'get_session', return_value=session, create=True), \
+                    patch.object(async_iam_manager, 'AioConfig', aio_config, create=True):
+                result = asyncio.run(run())
+
+            with open(sync_file) as f1, open(async_file) as f2:
+                sync_report, async_report = json.load(f1), json.load(f2)
+
+        self.assertEqual(result['status'], 'success')
+        aio_config.assert_called_once_with(max_pool_connections=4)
+        sync_report["summary"].pop("read_cache")
+        async_report["summary"].pop("read_cache")
+        self.assertEqual(sync_report, async_report)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+"""
+Unit tests for the client registry
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.client_registry import ClientRegistry
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every S3 request with an empty bucket listing"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'<ListAllMyBucketsResult><Buckets></Buckets></ListAllMyBucketsResult>'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@patch.dict(os.environ, {'AWS_ACCESS_KEY_ID': 'testing', 'AWS_SECRET_ACCESS_KEY': 'testing'})
+class TestClientRegistry(unittest.TestCase):
+
+    def test_clients_shared_per_key_across_threads(self):
+        """Test concurrent lookups build one client and one session per key"""
+        registry = ClientRegistry()
+        with patch('boto3.Session', wraps=__import__('boto3').Session) as session:
+            with ThreadPoolExecutor(max_workers=16) as executor:
+                clients = list(executor.map(lambda _: registry.client('iam', 'us-east-1'), range(64)))
+            other = registry.client('sts', 'us-east-1')
+
+        self.assertEqual(len({id(c) for c in clients}), 1)
+        self.assertIsNot(clients[0], registry.client('iam', 'eu-west-1'))
+        self.assertIsNot(clients[0], other)
+        self.assertEqual(session.call_count, 1)
+
+    def test_pool_settings_applied_to_new_clients(self):
+        """Test configured pool size and keep-alive reach the botocore config"""
+        registry = ClientRegistry(max_pool_connections=25, tcp_keepalive=False)
+        registry.configure(max_pool_connections=80, tcp_keepalive=True)
+        client = registry.client('iam', 'us-east-1')
+
+        self.assertEqual(client.meta.config.max_pool_connections, 80)
+        self.assertTrue(client.meta.config.tcp_keepalive)
+
+    def test_stats_report_reused_connections(self):
+        """Test pool statistics show one kept-alive connection serving repeated requests"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            registry = ClientRegistry()
+            client = registry.client('s3', 'us-east-1', endpoint_url=f"http://127.0.0.1:{server.server_port}")
+            for _ in range(3):
+                client.list_buckets()
+            stats = registry.stats()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        entry = stats["clients"][0]
+        self.assertEqual(stats["sessions"], 1)
+        self.assertEqual((entry["host_pools"], entry["connections_opened"], entry["requests"]), (1, 1, 3))
+        self.assertEqual(entry["idle_connections"], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,118 @@
+"""
+Unit tests for CloudTrail Feed
+"""
+
+import unittest
+import gzip
+import json
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from cloudtrail_feed import CloudTrailFeed
+from iam_manager import IAMManager
+from iam_fixtures import make_iam_client, user, READ_ONLY_ACCESS
+
+def event(event_id, event_time, event_name, **request):
+    """Build a CloudTrail IAM event record"""
+    return {
+        "eventID": event_id,
+        "eventTime": event_time,
+        "eventSource": "iam.amazonaws.com",
+        "eventName": event_name,
+        "requestParameters": request
+    }
+
+class TestCloudTrailFeed(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.log_dir = os.path.join(self.tmp_dir.name, 'logs')
+        os.makedirs(self.log_dir)
+        self.snapshot_file = os.path.join(self.tmp_dir.name, 'audit.json')
+        with open(self.snapshot_file, 'w') as f:
+            json.dump({
+                "users": [{"username": "alice", "attached_policies": []},
+                          {"username": "bob", "attached_policies": []}],
+                "roles": [], "groups": [], "policies": [], "summary": {}
+            }, f)
+
+        self.iam_manager = IAMManager()
+        # bob is gone from IAM; alice and carol exist
+        self.iam_manager.iam_client = make_iam_client(
+            users=[user("alice", policies=[READ_ONLY_ACCESS]), user("carol", policies=[READ_ONLY_ACCESS])])
+        self.feed = CloudTrailFeed(self.iam_manager, self.snapshot_file)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_log(self, name, records):
+        with gzip.open(os.path.join(self.log_dir, name), 'wt') as f:
+            json.dump({"Records": records}, f)
+
+    def load_snapshot(self):
+        with open(self.snapshot_file) as f:
+            return json.load(f)
+
+    def test_applies_events_to_touched_principals(self):
+        """Test only touched principals are re-fetched and deletions are applied"""
+        self.write_log('001.json.gz', [
+            event("e2", "2025-01-01T00:00:02Z", "DeleteUser", userName="bob"),
+            event("e1", "2025-01-01T00:00:01Z", "AttachUserPolicy", userName="alice",
+                  policyArn="arn:aws:iam::aws:policy/ReadOnlyAccess"),
+            event("e3", "2025-01-01T00:00:03Z", "CreateUser", userName="carol")
+        ])
+
+        result = self.feed.sync(self.log_dir)
+        snapshot = self.load_snapshot()
+
+        self.assertEqual(result['events'], 3)
+        self.assertEqual([u['username'] for u in snapshot['users']], ['alice', 'carol'])
+        self.assertEqual(snapshot['users'][0]['attached_policies'], ["arn:aws:iam::aws:policy/ReadOnlyAccess"])
+        self.assertEqual(snapshot['summary']['total_users'], 2)
+        # The deleted user is checked against IAM as well
+        self.assertEqual(self.iam_manager.iam_client.get_user.call_count, 3)
+
+    def test_read_only_events_are_ignored(self):
+        """Test reads, such as the audit's own list calls, never trigger a re-fetch"""
+        records = [dict(event(f"r{i}", f"2025-01-01T00:00:0{i}Z", "ListAttachedUserPolicies",
+                              userName="alice"), readOnly=True) for i in range(5)]
+        # Older records may lack the readOnly flag
+        records.append(event("r9", "2025-01-01T00:00:09Z", "GetUser", userName="alice"))
+        self.write_log('001.json.gz', records)
+
+        result = self.feed.sync(self.log_dir)
+
+        self.assertEqual((result['events'], result['entities_refreshed']), (0, 0))
+        self.iam_manager.iam_client.get_user.assert_not_called()
+
+    def test_checkpoint_skips_processed_files_and_duplicates(self):
+        """Test processed files are skipped and redelivered events are dropped"""
+        self.write_log('001.json.gz', [event("e1", "2025-01-01T00:00:01Z", "CreateUser", userName="carol")])
+        self.feed.sync(self.log_dir)
+
+        self.write_log('002.json.gz', [event("e1", "2025-01-01T00:00:01Z", "CreateUser", userName="carol")])
+        result = self.feed.sync(self.log_dir)
+
+        self.assertEqual(result['files_processed'], 1)
+        self.assertEqual(result['duplicates'], 1)
+        self.assertEqual(self.feed.sync(self.log_dir)['files_processed'], 0)
+
+    def test_late_delete_of_recreated_user_keeps_it(self):
+        """Test a DeleteUser delivered after the CreateUser that recreated the name is checked"""
+        self.iam_manager.iam_client.entities["users"]["bob"] = user("bob")
+        self.write_log('001.json.gz', [event("e2", "2025-01-01T00:00:02Z", "CreateUser", userName="bob")])
+        self.feed.sync(self.log_dir)
+
+        self.write_log('002.json.gz', [event("e1", "2025-01-01T00:00:01Z", "DeleteUser", userName="bob")])
+        result = self.feed.sync(self.log_dir)
+
+        self.assertEqual(result['entities_removed'], 0)
+        self.assertIn('bob', [u['username'] for u in self.load_snapshot()['users']])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+"""
+Unit tests for Lambda packaging
+"""
+
+import unittest
+from unittest.mock import patch
+import subprocess
+import sys
+import os
+import tempfile
+import zipfile
+
+# Add scripts to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'scripts'))
+
+import deploy_lambda
+
+HOST_RUNTIME = f"python{sys.version_info.major}.{sys.version_info.minor}"
+
+class TestDeploymentPackage(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_handler_sources_follow_imports(self):
+        """Test only modules reachable from the handler are packaged"""
+        sources = deploy_lambda.handler_sources()
+        self.assertIn('lambda_handler.py', sources)
+        self.assertIn('iam_manager.py', sources)
+        self.assertIn('utils/__init__.py', sources)
+        self.assertIn('utils/idempotency.py', sources)
+        for unused in ('main.py', 'web_interface.py', 'async_iam_manager.py'):
+            self.assertNotIn(unused, sources)
+
+    def test_optimized_package_ships_sourceless_runtime_bytecode(self):
+        """Test the optimized package holds .pyc only and imports on the runtime interpreter"""
+        with patch.object(deploy_lambda, 'LAMBDA_RUNTIME', HOST_RUNTIME):
+            zip_file = deploy_lambda.create_deployment_package(
+                'optimized', self.tmp_dir.name, python=sys.executable)
+
+        with zipfile.ZipFile(zip_file) as zipf:
+            names = zipf.namelist()
+            zipf.extractall(os.path.join(self.tmp_dir.name, 'function'))
+        self.assertIn('lambda_handler.pyc', names)
+        self.assertFalse([name for name in names if not name.endswith('.pyc')])
+        self.assertEqual(len(names), len(deploy_lambda.handler_sources()))
+
+        env = dict(os.environ, PYTHONPATH=os.path.join(self.tmp_dir.name, 'function'),
+                   PYTHONDONTWRITEBYTECODE='1', AWS_DEFAULT_REGION='us-east-1')
+        output = subprocess.run([sys.executable, '-c', 'import lambda_handler; print(lambda_handler.__file__)'],
+                                cwd=self.tmp_dir.name, env=env, capture_output=True, text=True)
+        self.assertEqual(output.returncode, 0, output.stderr)
+        self.assertTrue(output.stdout.strip().endswith('lambda_handler.pyc'))
+
+    def test_optimized_package_without_runtime_ships_sources(self):
+        """Test host bytecode is never shipped when the runtime interpreter is missing"""
+        zip_file = deploy_lambda.create_deployment_package(
+            'optimized', self.tmp_dir.name, python=os.path.join(self.tmp_dir.name, 'python3.9'))
+
+        with zipfile.ZipFile(zip_file) as zipf:
+            names = zipf.namelist()
+        self.assertEqual(names, deploy_lambda.handler_sources())
+
+    def test_runtime_python_rejects_other_versions(self):
+        """Test an interpreter of another version is not used to compile"""
+        with patch.object(deploy_lambda, 'LAMBDA_RUNTIME', 'python2.7'):
+            self.assertIsNone(deploy_lambda.runtime_python(sys.executable))
+        with patch.object(deploy_lambda, 'LAMBDA_RUNTIME', HOST_RUNTIME):
+            self.assertEqual(deploy_lambda.runtime_python(sys.executable), sys.executable)
+
+if __name__ == '__main__':
+    unittest.main()
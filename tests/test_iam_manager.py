@@ -4,13 +4,16 @@ Unit tests for IAM Manager
 
 import unittest
 from unittest.mock import Mock, patch, MagicMock
+import json
 import sys
 import os
+import tempfile
 
 # Add src to path
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
 
 from iam_manager import IAMManager
+from iam_fixtures import make_iam_client, user, group, policy, READ_ONLY_ACCESS
 
 class TestIAMManager(unittest.TestCase):
     
@@ -33,12 +36,29 @@ class TestIAMManager(unittest.TestCase):
         """Test role creation in dry run mode"""
         iam_manager = IAMManager(dry_run=True)
         
+        trust_policy = json.dumps({
+            "Version": "2012-10-17",
+            "Statement": [{"Effect": "Allow", "Principal": {"Service": "ec2.amazonaws.com"},
+                           "Action": "sts:AssumeRole"}]
+        })
+
         # Mock file reading
-        with patch('builtins.open', unittest.mock.mock_open(read_data='{"Version": "2012-10-17"}')):
+        with patch('builtins.open', unittest.mock.mock_open(read_data=trust_policy)):
             result = iam_manager.create_role('test-role', 'trust_policy.json')
         
         self.assertEqual(result['status'], 'dry_run')
         self.assertEqual(result['role_name'], 'test-role')
+
+    def test_dry_run_still_validates_documents(self):
+        """Test a dry run reports an invalid policy document instead of pretending to succeed"""
+        with patch('builtins.open', unittest.mock.mock_open(read_data='{"Version": "2012-10-17"}')):
+            role_result = self.iam_manager.create_role('test-role', 'trust_policy.json')
+            policy_result = self.iam_manager.create_policy('test-policy', 'policy.json')
+
+        self.assertEqual(role_result['status'], 'error')
+        self.assertEqual(role_result['message'], 'Trust policy failed validation')
+        self.assertEqual(policy_result['status'], 'error')
+        self.assertTrue(policy_result['errors'])
     
     def test_initialization(self):
         """Test IAM Manager initialization"""
@@ -46,5 +66,30 @@ class TestIAMManager(unittest.TestCase):
         self.assertEqual(self.iam_manager.profile, 'default')
         self.assertTrue(self.iam_manager.dry_run)
 
+    def test_audit_groups_and_policies_computed_once(self):
+        """Test groups and local policies are audited once and referenced by users"""
+        iam_manager = IAMManager()
+        client = make_iam_client(
+            users=[user(f"user{i}", groups=["developers"]) for i in range(3)],
+            groups=[group("developers", "AGPA1", policies=[READ_ONLY_ACCESS], inline=["inline"])],
+            policies=[policy("custom", default_version_id="v2")]
+        )
+        iam_manager.iam_client = client
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, 'audit.json')
+            iam_manager.audit_permissions(output_file)
+            with open(output_file) as f:
+                report = json.load(f)
+
+        self.assertEqual(client.list_attached_group_policies.call_count, 1)
+        self.assertEqual(report['groups'][0]['attached_policies'], ["arn:aws:iam::aws:policy/ReadOnlyAccess"])
+        self.assertEqual(report['policies'][0]['default_version_id'], 'v2')
+        self.assertEqual(report['users'][0]['group_ids'], ['AGPA1'])
+        # Users come from the authorization details pages, with no per-user list calls
+        client.list_groups_for_user.assert_not_called()
+        client.list_attached_user_policies.assert_not_called()
+        self.assertEqual(report['summary']['unattached_policies'], 1)
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
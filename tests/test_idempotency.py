@@ -0,0 +1,95 @@
+"""
+Unit tests for the idempotency caches
+"""
+
+import unittest
+import multiprocessing
+import sys
+import os
+import tempfile
+import threading
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.idempotency import SqliteIdempotencyCache
+
+
+def run_in_worker(db_path, log_path, results):
+    """Run one keyed operation the way a separate gunicorn worker would"""
+    def create_user():
+        with open(log_path, 'a') as f:
+            f.write('run\n')
+        time.sleep(0.2)
+        return {'status': 'success', 'username': 'alice'}
+
+    result, replayed = SqliteIdempotencyCache(db_path).run(('us-east-1', False, 'req-1'),
+                                                           'fp', create_user)
+    results.put((result, replayed))
+
+
+class TestSqliteIdempotencyCache(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.tmp_dir.name, 'idempotency.sqlite3')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_retry_on_another_process_is_replayed(self):
+        """Test a key claimed by one worker process is not run again by another"""
+        log_path = os.path.join(self.tmp_dir.name, 'calls.log')
+        results = multiprocessing.Queue()
+        workers = [multiprocessing.Process(target=run_in_worker,
+                                           args=(self.db_path, log_path, results))
+                   for _ in range(3)]
+        for worker in workers:
+            worker.start()
+        outcomes = [results.get(timeout=10) for _ in workers]
+        for worker in workers:
+            worker.join()
+
+        with open(log_path) as f:
+            self.assertEqual(f.read(), 'run\n')
+        self.assertEqual(sorted(replayed for _, replayed in outcomes), [False, True, True])
+        self.assertTrue(all(result['username'] == 'alice' for result, _ in outcomes))
+
+    def test_errors_are_not_remembered(self):
+        """Test a failed operation runs again on retry"""
+        cache = SqliteIdempotencyCache(self.db_path)
+        calls = []
+
+        def failing():
+            calls.append(1)
+            return {'status': 'error', 'message': 'throttled'}
+
+        cache.run('key', 'fp', failing)
+        _, replayed = cache.run('key', 'fp', failing)
+
+        self.assertFalse(replayed)
+        self.assertEqual(len(calls), 2)
+
+    def test_key_reused_for_different_request_rejected(self):
+        """Test reusing a key with a different fingerprint raises ValueError"""
+        cache = SqliteIdempotencyCache(self.db_path)
+        cache.run('key', 'fp-1', lambda: {'status': 'success'})
+
+        with self.assertRaises(ValueError):
+            cache.run('key', 'fp-2', lambda: {'status': 'success'})
+
+    def test_abandoned_claim_expires(self):
+        """Test a claim left by a worker that died mid-call does not block the key forever"""
+        cache = SqliteIdempotencyCache(self.db_path, pending_timeout=0.2, poll_interval=0.05)
+        cache._claim('"key"', 'fp')
+
+        started = threading.Event()
+        result, replayed = cache.run('key', 'fp', lambda: started.set() or {'status': 'success'})
+
+        self.assertTrue(started.is_set())
+        self.assertFalse(replayed)
+
+if __name__ == '__main__':
+    unittest.main()
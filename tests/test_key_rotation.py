@@ -0,0 +1,160 @@
+"""
+Unit tests for Key Rotation
+"""
+
+import unittest
+from unittest.mock import Mock
+import json
+import sys
+import os
+import tempfile
+from datetime import datetime, timedelta, timezone
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from key_rotation import KeyRotator, EncryptedFileSink, SecretSink
+from utils.rate_limiter import RateLimiter
+
+REPORT = (
+    "user,arn,access_key_1_active,access_key_1_last_rotated,access_key_2_active,access_key_2_last_rotated\n"
+    "<root_account>,arn:aws:iam::123456789012:root,true,2020-01-01T00:00:00+00:00,false,N/A\n"
+    "svc-old,arn:aws:iam::123456789012:user/svc-old,true,2020-01-01T00:00:00+00:00,false,N/A\n"
+    "svc-new,arn:aws:iam::123456789012:user/svc-new,true,{recent},false,N/A\n"
+)
+
+class MemorySink(SecretSink):
+    def __init__(self, fail=False):
+        self.stored = {}
+        self.fail = fail
+
+    def store(self, username, access_key):
+        if self.fail:
+            raise IOError("sink unavailable")
+        self.stored[username] = access_key['SecretAccessKey']
+
+def make_manager():
+    """Build a mock IAM manager with one user holding a stale key"""
+    client = Mock()
+    recent = datetime.now(timezone.utc).isoformat()
+    client.generate_credential_report.return_value = {"State": "COMPLETE"}
+    client.get_credential_report.return_value = {"Content": REPORT.format(recent=recent).encode()}
+    client.list_access_keys.return_value = {"AccessKeyMetadata": [{
+        "AccessKeyId": "AKIAOLD", "Status": "Active",
+        "CreateDate": datetime.now(timezone.utc) - timedelta(days=400)
+    }]}
+    client.create_access_key.return_value = {"AccessKey": {"AccessKeyId": "AKIANEW", "SecretAccessKey": "secret"}}
+    return Mock(iam_client=client, dry_run=False, rate_limiter=RateLimiter(rate=1000))
+
+class TestKeyRotation(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.temp_dir.name, 'state.json')
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_staged_rotation_resumes_from_state(self):
+        """Test stages advance across runs without creating a second new key"""
+        manager, sink = make_manager(), MemorySink()
+
+        result = KeyRotator(manager, sink, state_file=self.state_file).rotate(target_stage="created")
+        self.assertEqual(result["summary"], {"created": 1})
+        self.assertEqual(sink.stored, {"svc-old": "secret"})
+        manager.iam_client.update_access_key.assert_not_called()
+
+        # A fresh rotator picks up the persisted state
+        result = KeyRotator(manager, sink, state_file=self.state_file).rotate(target_stage="deleted")
+        self.assertEqual(result["summary"], {"deleted": 1})
+        manager.iam_client.create_access_key.assert_called_once_with(UserName='svc-old')
+        manager.iam_client.update_access_key.assert_called_once_with(
+            UserName='svc-old', AccessKeyId='AKIAOLD', Status='Inactive')
+        manager.iam_client.delete_access_key.assert_called_once_with(UserName='svc-old', AccessKeyId='AKIAOLD')
+
+    def test_second_cycle_rotates_a_finished_user_again(self):
+        """Test a user rotated in an earlier cycle is rotated again once the new key goes stale"""
+        manager, sink = make_manager(), MemorySink()
+        result = KeyRotator(manager, sink, state_file=self.state_file).rotate(target_stage="deleted")
+        self.assertEqual(result["summary"], {"deleted": 1})
+
+        # While the report still lists the deleted key, the fresh key keeps the user out of a new cycle
+        manager.iam_client.list_access_keys.return_value = {"AccessKeyMetadata": [{
+            "AccessKeyId": "AKIANEW", "Status": "Active", "CreateDate": datetime.now(timezone.utc)
+        }]}
+        result = KeyRotator(manager, sink, state_file=self.state_file).rotate(target_stage="deleted")
+        self.assertEqual(result["summary"], {"skipped": 1})
+
+        # 90 days later the key from the first cycle is the stale one
+        manager.iam_client.list_access_keys.return_value = {"AccessKeyMetadata": [{
+            "AccessKeyId": "AKIANEW", "Status": "Active",
+            "CreateDate": datetime.now(timezone.utc) - timedelta(days=100)
+        }]}
+        manager.iam_client.create_access_key.return_value = {
+            "AccessKey": {"AccessKeyId": "AKIANEWER", "SecretAccessKey": "secret2"}
+        }
+        rotator = KeyRotator(manager, sink, state_file=self.state_file)
+        result = rotator.rotate(target_stage="deleted")
+
+        self.assertEqual(result["summary"], {"deleted": 1})
+        self.assertEqual(sink.stored, {"svc-old": "secret2"})
+        self.assertEqual(manager.iam_client.create_access_key.call_count, 2)
+        manager.iam_client.delete_access_key.assert_called_with(UserName='svc-old', AccessKeyId='AKIANEW')
+        entry = rotator.state["svc-old"]
+        self.assertEqual((entry["old_key_id"], entry["new_key_id"], entry["stage"]),
+                         ("AKIANEW", "AKIANEWER", "deleted"))
+        self.assertEqual([(h["old_key_id"], h["stage"]) for h in entry["history"]], [("AKIAOLD", "deleted")])
+
+    def test_sink_failure_removes_new_key(self):
+        """Test a key whose secret could not be stored is deleted again"""
+        manager = make_manager()
+
+        result = KeyRotator(manager, MemorySink(fail=True), state_file=self.state_file).rotate()
+
+        self.assertEqual(result["summary"], {"error": 1})
+        manager.iam_client.delete_access_key.assert_called_once_with(UserName='svc-old', AccessKeyId='AKIANEW')
+        self.assertEqual(KeyRotator(manager, MemorySink(), state_file=self.state_file).state, {})
+
+    def test_interrupted_creation_deletes_orphaned_key(self):
+        """Test a key created just before a crash, with no recorded secret, is removed on resume"""
+        manager, sink = make_manager(), MemorySink()
+        with open(self.state_file, 'w') as f:
+            json.dump({"svc-old": {"old_key_id": "AKIAOLD", "known_key_ids": ["AKIAOLD"],
+                                   "stage": "creating"}}, f)
+        keys = manager.iam_client.list_access_keys.return_value["AccessKeyMetadata"]
+        keys.append({"AccessKeyId": "AKIAORPHAN", "Status": "Active", "CreateDate": datetime.now(timezone.utc)})
+
+        rotator = KeyRotator(manager, sink, state_file=self.state_file)
+        result = rotator.rotate(target_stage="created")
+
+        self.assertEqual(result["summary"], {"created": 1})
+        manager.iam_client.delete_access_key.assert_called_once_with(UserName='svc-old', AccessKeyId='AKIAORPHAN')
+        self.assertEqual(sink.stored, {"svc-old": "secret"})
+        self.assertEqual(rotator.state["svc-old"]["new_key_id"], "AKIANEW")
+        self.assertNotIn("known_key_ids", rotator.state["svc-old"])
+
+    def test_user_with_two_keys_is_skipped(self):
+        """Test a user already at the two-key limit is left untouched"""
+        manager = make_manager()
+        keys = manager.iam_client.list_access_keys.return_value["AccessKeyMetadata"]
+        keys.append(dict(keys[0], AccessKeyId="AKIAOTHER"))
+
+        result = KeyRotator(manager, MemorySink(), state_file=self.state_file).rotate()
+
+        self.assertEqual(result["summary"], {"skipped": 1})
+        manager.iam_client.create_access_key.assert_not_called()
+
+    def test_encrypted_file_sink_round_trip(self):
+        """Test secrets are encrypted at rest and readable with the key"""
+        from cryptography.fernet import Fernet
+        path = os.path.join(self.temp_dir.name, 'keys.enc')
+        sink = EncryptedFileSink(path, key=Fernet.generate_key().decode())
+
+        sink.store('svc-old', {"AccessKeyId": "AKIANEW", "SecretAccessKey": "secret"})
+
+        with open(path) as f:
+            self.assertNotIn('secret', f.read())
+        self.assertEqual(sink.read_all()[0]["secret_access_key"], 'secret')
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,65 @@
+"""
+Unit tests for the Lambda handler
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import json
+import sys
+import os
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import lambda_handler
+import manager_cache
+
+FIXTURES_FILE = os.path.join(os.path.dirname(__file__), '..', 'lambda-test-configs.json')
+
+def load_fixture(name):
+    """Load a recorded event from lambda-test-configs.json"""
+    with open(FIXTURES_FILE) as f:
+        return json.load(f)[name]
+
+class TestLambdaHandler(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        manager_cache.clear_managers()
+        lambda_handler._processed_messages.clear()
+
+    def test_single_event_still_supported(self):
+        """Test a plain action event returns a statusCode response"""
+        response = lambda_handler.lambda_handler(load_fixture('create_user_dry_run'), None)
+
+        self.assertEqual(response['statusCode'], 200)
+        self.assertEqual(json.loads(response['body'])['status'], 'dry_run')
+
+    def test_sqs_batch_reports_only_failed_records(self):
+        """Test recorded SQS batch: duplicates run once and only the bad record is retried"""
+        with patch.object(lambda_handler, '_process_action', wraps=lambda_handler._process_action) as process:
+            response = lambda_handler.lambda_handler(load_fixture('sqs_batch_dry_run'), None)
+
+        self.assertEqual(response, {'batchItemFailures': [{'itemIdentifier': 'msg-3'}]})
+        self.assertEqual(process.call_count, 3)
+
+    def test_failed_record_retried_and_success_not_repeated(self):
+        """Test redelivery re-runs failures but skips messages that already succeeded"""
+        manager = Mock()
+        manager.create_user.side_effect = [{'status': 'error', 'message': 'Throttling'},
+                                           {'status': 'success', 'username': 'alice'}]
+        event = {'Records': [{'messageId': 'msg-1', 'body': json.dumps({
+            'action': 'create_user', 'parameters': {'username': 'alice'}})}]}
+
+        with patch.object(lambda_handler, 'get_iam_manager', return_value=manager):
+            first = lambda_handler.lambda_handler(event, None)
+            second = lambda_handler.lambda_handler(event, None)
+            third = lambda_handler.lambda_handler(event, None)
+
+        self.assertEqual(first['batchItemFailures'], [{'itemIdentifier': 'msg-1'}])
+        self.assertEqual(second['batchItemFailures'], [])
+        self.assertEqual(third['batchItemFailures'], [])
+        self.assertEqual(manager.create_user.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
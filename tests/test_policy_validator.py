@@ -0,0 +1,97 @@
+"""
+Unit tests for the offline policy validator
+"""
+
+import unittest
+from unittest.mock import Mock
+import json
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from iam_manager import IAMManager
+from utils.policy_validator import PolicyValidator
+
+REPO_ROOT = os.path.join(os.path.dirname(__file__), '..')
+
+class TestPolicyValidator(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.validator = PolicyValidator()
+
+    def test_reports_every_error_in_one_pass(self):
+        """Test all config problems are collected before anything is created"""
+        config = {
+            "users": [
+                {"name": "dev", "policies": ["arn:aws:iam::aws:policy/ReadOnlyAccess"]},
+                {"name": "dev", "policies": ["ReadOnlyAccess"]}
+            ],
+            "roles": [
+                {"name": "bad role", "trust_policy_file": os.path.join(REPO_ROOT, 'config', 'trust_policies.json')}
+            ],
+            "policies": [
+                {"name": "CustomS3Policy", "policy_file": os.path.join(REPO_ROOT, 'templates', 's3_bucket_access.json')}
+            ]
+        }
+
+        errors = self.validator.validate_bulk_config(config)
+        text = "\n".join(errors)
+
+        self.assertIn("duplicate user name", text)
+        self.assertIn("invalid policy ARN 'ReadOnlyAccess'", text)
+        self.assertIn("role name contains characters", text)
+        self.assertIn("several documents: ec2_trust, lambda_trust", text)
+        self.assertIn("unresolved template placeholder '{{ bucket_name }}'", text)
+
+    def test_statement_structure_and_size(self):
+        """Test statement elements and the managed policy size limit are checked"""
+        document = {
+            "Version": "2012-10-17",
+            "Statement": [
+                {"Effect": "Permit", "Action": "s3:GetObject", "Resource": "bucket/*"},
+                {"Effect": "Allow", "Action": ["s3:" + "x" * 6144], "Resource": "*"}
+            ]
+        }
+
+        errors = self.validator.validate_policy_document(document, "managed", "policy")
+        text = "\n".join(errors)
+
+        self.assertIn("'Effect' must be Allow or Deny", text)
+        self.assertIn("invalid resource ARN 'bucket/*'", text)
+        self.assertIn("limit is 6144", text)
+
+    def test_valid_trust_policy(self):
+        """Test a well-formed cross-account trust policy passes"""
+        document = {
+            "Version": "2012-10-17",
+            "Statement": [{
+                "Effect": "Allow",
+                "Principal": {"AWS": "arn:aws:iam::123456789012:root"},
+                "Action": "sts:AssumeRole"
+            }]
+        }
+
+        self.assertEqual(self.validator.validate_policy_document(document, "trust", "trust"), [])
+
+    def test_bulk_create_fails_fast(self):
+        """Test bulk creation makes no API calls when validation fails"""
+        iam_manager = IAMManager()
+        iam_manager.iam_client = Mock()
+
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump({"users": [{"name": "a"}, {"name": "a"}]}, f)
+        try:
+            result = iam_manager.bulk_create_from_config(f.name)
+        finally:
+            os.unlink(f.name)
+
+        self.assertEqual(result['status'], 'error')
+        self.assertEqual(len(result['errors']), 1)
+        iam_manager.iam_client.create_user.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
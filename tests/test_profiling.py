@@ -0,0 +1,91 @@
+"""
+Unit tests for the run profiler
+"""
+
+import unittest
+from unittest.mock import patch
+import sys
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from click.testing import CliRunner
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from utils.client_registry import registry
+from utils.profiling import RunProfiler, _covered_seconds
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Answers every S3 request with an empty bucket listing"""
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = b'<ListAllMyBucketsResult><Buckets></Buckets></ListAllMyBucketsResult>'
+        self.send_response(200)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+@patch.dict(os.environ, {'AWS_ACCESS_KEY_ID': 'testing', 'AWS_SECRET_ACCESS_KEY': 'testing'})
+class TestRunProfiler(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_aws_calls_timed_and_reports_written(self):
+        """Test calls on shared clients are timed and all three reports are written"""
+        server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        try:
+            client = registry.client('s3', 'us-east-1', endpoint_url=f"http://127.0.0.1:{server.server_port}")
+            profiler = RunProfiler(os.path.join(self.tmp_dir.name, 'run.profile'), sample_interval=0.001)
+            profiler.start()
+            for _ in range(3):
+                client.list_buckets()
+            summary = profiler.stop()
+            # Hooks are removed once the run ends
+            client.list_buckets()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertEqual(summary["aws_calls"], 3)
+        self.assertLessEqual(summary["aws_wait_wall_seconds"], summary["wall_seconds"])
+        with open(summary["report_file"]) as f:
+            report = f.read()
+        self.assertIn("s3.ListBuckets", report)
+        self.assertIn("HOTSPOTS BY CUMULATIVE TIME", report)
+        self.assertTrue(os.path.getsize(summary["pstats_file"]) > 0)
+        with open(summary["collapsed_stacks_file"]) as f:
+            for line in f:
+                stack, count = line.rsplit(' ', 1)
+                self.assertIn(';', stack)
+                self.assertGreater(int(count), 0)
+
+    def test_cli_profile_written_next_to_output(self):
+        """Test --profile-run places the reports beside the command's --output-file"""
+        import main
+        output_file = os.path.join(self.tmp_dir.name, 'teardown.json')
+
+        result = CliRunner().invoke(main.cli, ['--dry-run', '--profile-run', 'teardown', '--output-file', output_file])
+
+        self.assertEqual(result.exit_code, 0, result.output)
+        for suffix in ('.txt', '.prof', '.collapsed'):
+            self.assertTrue(os.path.exists(os.path.join(self.tmp_dir.name, f'teardown.profile{suffix}')))
+
+    def test_covered_seconds_merges_overlapping_calls(self):
+        """Test concurrent call intervals count once toward waiting time"""
+        self.assertAlmostEqual(_covered_seconds([(0, 2), (1, 3), (5, 6), (5.5, 5.7)]), 4.0)
+        self.assertEqual(_covered_seconds([]), 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
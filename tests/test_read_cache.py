@@ -0,0 +1,99 @@
+"""
+Unit tests for request-scoped read cache
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+import json
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from iam_manager import IAMManager
+from utils.read_cache import ReadCache
+from iam_fixtures import make_iam_client, user, group, READ_ONLY_ACCESS
+
+def make_audit_client(user_count):
+    """Mock IAM client for a full audit: one group shared by every user, no roles"""
+    return make_iam_client(
+        users=[user(f"user{i}", groups=["developers"], policies=[READ_ONLY_ACCESS])
+               for i in range(user_count)],
+        groups=[group("developers", "AGPA1", policies=[READ_ONLY_ACCESS])]
+    )
+
+class TestReadCache(unittest.TestCase):
+
+    def test_concurrent_callers_share_one_load(self):
+        """Test concurrent lookups of the same key wait on a single in-flight call"""
+        cache = ReadCache()
+        calls = []
+        release = threading.Event()
+
+        def loader():
+            calls.append(1)
+            release.wait(1)
+            return "value"
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [executor.submit(cache.get_or_load, 'key', loader) for _ in range(8)]
+            time.sleep(0.05)
+            release.set()
+            results = [f.result() for f in futures]
+
+        self.assertEqual(results, ["value"] * 8)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(cache.stats()['misses'], 1)
+        self.assertEqual(cache.stats()['hits'] + cache.stats()['coalesced'], 7)
+
+    def test_failures_are_not_cached(self):
+        """Test a failed load is retried by the next caller"""
+        cache = ReadCache()
+        loader = Mock(side_effect=[RuntimeError("boom"), "value"])
+
+        with self.assertRaises(RuntimeError):
+            cache.get_or_load('key', loader)
+        self.assertEqual(cache.get_or_load('key', loader), "value")
+
+    def test_cached_read_hits_on_repeat_lookup(self):
+        """Test repeated IAM reads with the same arguments are served from the cache"""
+        iam_manager = IAMManager()
+        iam_manager.iam_client = Mock()
+        iam_manager.iam_client.get_policy.return_value = {"Policy": {"DefaultVersionId": "v1"}}
+
+        read_cache = ReadCache()
+        for _ in range(3):
+            iam_manager._cached_read(read_cache, 'get_policy', PolicyArn='arn:aws:iam::aws:policy/ReadOnlyAccess')
+        iam_manager._cached_read(read_cache, 'get_policy', PolicyArn='arn:aws:iam::aws:policy/PowerUserAccess')
+
+        self.assertEqual(iam_manager.iam_client.get_policy.call_count, 2)
+        self.assertEqual(read_cache.stats()['hit_rate'], 0.5)
+
+    def test_concurrent_audits_keep_separate_caches(self):
+        """Test audits running at once on a shared manager each report their own cache counters"""
+        iam_manager = IAMManager()
+        iam_manager.iam_client = make_audit_client(4)
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            single_file = os.path.join(tmp_dir, 'single.json')
+            iam_manager.audit_permissions(single_file)
+            with open(single_file) as f:
+                expected = json.load(f)["summary"]["read_cache"]
+            # Every read in a serial audit is unique, so the cache honestly reports no hits
+            self.assertEqual(expected["hits"], 0)
+
+            output_files = [os.path.join(tmp_dir, f'audit{i}.json') for i in range(4)]
+            with ThreadPoolExecutor(max_workers=4) as executor:
+                list(executor.map(iam_manager.audit_permissions, output_files))
+
+            for output_file in output_files:
+                with open(output_file) as f:
+                    self.assertEqual(json.load(f)["summary"]["read_cache"], expected)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Unit tests for Sharded Audit
+"""
+
+import unittest
+from unittest.mock import patch
+import json
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import sharded_audit
+from iam_manager import IAMManager
+from iam_fixtures import make_iam_client, user, role, group, policy, READ_ONLY_ACCESS
+
+USERS = [("alice", "/"), ("bob", "/service/"), ("carol", "/service/payments/"), ("dave", "/ops/")]
+ROLES = [("app", "/service/"), ("admin", "/")]
+
+def make_account_client():
+    """Build a mock IAM client with users and roles under several paths"""
+    return make_iam_client(
+        users=[user(name, path, groups=["developers"], policies=[READ_ONLY_ACCESS], tags={"team": name})
+               for name, path in USERS],
+        roles=[role(name, path, inline=["inline"]) for name, path in ROLES],
+        groups=[group("developers", "AGPA1")],
+        policies=[policy("custom")]
+    )
+
+class TestShardedAudit(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        with patch('boto3.client'):
+            self.iam_manager = IAMManager()
+        self.iam_manager.iam_client = make_account_client()
+        self.principals = sharded_audit.list_principals(self.iam_manager.iam_client)
+
+    def test_hash_and_path_partitions_cover_every_principal_once(self):
+        """Test both strategies assign each principal to exactly one shard"""
+        for strategy in sharded_audit.STRATEGIES:
+            specs = sharded_audit.plan_shards(self.principals, 3, strategy)
+            users = sorted(u["name"] for spec in specs for u in spec["users"])
+            self.assertEqual(users, sorted(name for name, _ in USERS))
+            self.assertEqual([spec["include_shared"] for spec in specs], [True, False, False])
+
+        # Path shards keep a whole top-level path together
+        specs = sharded_audit.plan_shards(self.principals, 3, "path")
+        service_shard = next(spec for spec in specs if "/service/" in spec["path_prefixes"])
+        self.assertEqual({u["name"] for u in service_shard["users"]} | {r["name"] for r in service_shard["roles"]},
+                         {"bob", "carol", "app"})
+        self.assertEqual(specs, sharded_audit.plan_shards(self.principals, 3, "path"))
+
+    def test_merged_report_matches_single_stream_audit(self):
+        """Test merging shard outputs reproduces the audit_permissions report"""
+        specs = sharded_audit.plan_shards(self.principals, 4, "hash")
+        outputs = [sharded_audit.audit_shard(self.iam_manager, spec) for spec in specs]
+        merged = sharded_audit.merge_shard_outputs(list(reversed(outputs)))
+
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            output_file = os.path.join(tmp_dir, 'audit.json')
+            self.iam_manager.audit_permissions(output_file)
+            with open(output_file) as f:
+                report = json.load(f)
+
+        self.assertEqual(merged["summary"].pop("shards"), 4)
+        self.assertEqual(merged["summary"].pop("read_cache")["lookups"],
+                         report["summary"].pop("read_cache")["lookups"])
+        self.iam_manager.iam_client.list_attached_user_policies.assert_not_called()
+        report["users"].sort(key=lambda u: u["username"])
+        report["roles"].sort(key=lambda r: r["role_name"])
+        self.assertEqual(merged, report)
+
+    def test_merge_rejects_missing_shard(self):
+        """Test an incomplete shard set is never merged into a report"""
+        specs = sharded_audit.plan_shards(self.principals, 3, "hash")
+        outputs = [sharded_audit.audit_shard(self.iam_manager, spec) for spec in specs[:2]]
+
+        with self.assertRaises(ValueError) as context:
+            sharded_audit.merge_shard_outputs(outputs)
+        self.assertIn("missing [2]", str(context.exception))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit tests for Tag Index and bulk tagging
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import sys
+import os
+from botocore.exceptions import ClientError
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from iam_manager import IAMManager
+from utils.tag_index import TagIndex, parse_tags
+
+PAGES = [{
+    "UserDetailList": [
+        {"UserName": "alice", "Tags": [{"Key": "team", "Value": "payments"}, {"Key": "env", "Value": "prod"}]},
+        {"UserName": "bob", "Tags": [{"Key": "team", "Value": "search"}]}
+    ],
+    "RoleDetailList": [
+        {"RoleName": "payments-app", "Tags": [{"Key": "team", "Value": "payments"}]},
+        {"RoleName": "untagged"}
+    ]
+}]
+
+class TestTagIndex(unittest.TestCase):
+
+    def test_select_by_pair_key_and_kind(self):
+        """Test selectors are ANDed and can be limited to one principal kind"""
+        index = TagIndex.from_authorization_details(PAGES)
+
+        self.assertEqual(index.select(["team=payments"]), ["alice", "payments-app"])
+        self.assertEqual(index.select(["team=payments"], kind="role"), ["payments-app"])
+        self.assertEqual(index.select(["team=payments", "env"]), ["alice"])
+        self.assertEqual(index.select(["team=unknown", "env"]), [])
+
+    def test_add_replaces_previous_tags(self):
+        """Test re-indexing a principal drops its old tag entries"""
+        index = TagIndex.from_authorization_details(PAGES)
+        index.add("user", "bob", [{"Key": "team", "Value": "payments"}])
+
+        self.assertEqual(index.select(["team=search"]), [])
+        self.assertEqual(index.select(["team=payments"], kind="user"), ["alice", "bob"])
+
+    def test_invalid_tags_rejected(self):
+        """Test tags must be given as key=value"""
+        self.assertEqual(parse_tags(["team=payments", "env=prod"]), {"team": "payments", "env": "prod"})
+        with self.assertRaises(ValueError):
+            parse_tags(["team"])
+
+    def make_manager(self):
+        """Build an IAM manager over the tagged principals in PAGES"""
+        with patch('boto3.client'):
+            iam_manager = IAMManager()
+        client = Mock()
+        client.get_paginator.return_value = Mock(paginate=Mock(return_value=PAGES))
+        iam_manager.iam_client = client
+        return iam_manager, client
+
+    def test_bulk_tag_selected_principals(self):
+        """Test selected principals each get all tags in one call"""
+        iam_manager, client = self.make_manager()
+
+        selected = iam_manager.select_principals(["team=payments"])
+        tags = {"team": "payments", "env": "prod", "cost-center": "cc-42"}
+        result = iam_manager.bulk_tag(tags, selected["users"], selected["roles"], max_workers=4)
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(result["summary"], {"principals": 2, "succeeded": 2, "failed": 0})
+        client.tag_user.assert_called_once_with(UserName="alice", Tags=[
+            {"Key": "team", "Value": "payments"}, {"Key": "env", "Value": "prod"},
+            {"Key": "cost-center", "Value": "cc-42"}
+        ])
+        self.assertEqual(client.tag_role.call_count, 1)
+        client.get_paginator.assert_called_once_with('get_account_authorization_details')
+
+    def test_bulk_tag_over_limit_makes_no_calls(self):
+        """Test more tags than IAM allows on a principal is rejected up front"""
+        iam_manager, client = self.make_manager()
+
+        result = iam_manager.bulk_tag({f"key{i}": "value" for i in range(51)}, ["alice"], ["payments-app"])
+
+        self.assertEqual(result["status"], "error")
+        client.tag_user.assert_not_called()
+        client.tag_role.assert_not_called()
+
+    def test_bulk_tag_reports_partial_and_all_failed(self):
+        """Test the status is partial when some principals fail and error when all do"""
+        iam_manager, client = self.make_manager()
+        denied = ClientError({"Error": {"Code": "AccessDenied", "Message": "denied"}}, "TagRole")
+        client.tag_role.side_effect = denied
+
+        result = iam_manager.bulk_tag({"team": "payments"}, ["alice"], ["payments-app"])
+        self.assertEqual(result["status"], "partial")
+        self.assertEqual(result["summary"], {"principals": 2, "succeeded": 1, "failed": 1})
+
+        client.untag_user.side_effect = denied
+        client.untag_role.side_effect = denied
+        result = iam_manager.bulk_untag(["team"], ["alice"], ["payments-app"])
+        self.assertEqual(result["status"], "error")
+        self.assertEqual(result["summary"], {"principals": 2, "succeeded": 0, "failed": 2})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,106 @@
+"""
+Unit tests for Teardown Engine
+"""
+
+import unittest
+from unittest.mock import Mock
+import sys
+import os
+from botocore.exceptions import ClientError
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from teardown_engine import TeardownEngine
+from utils.rate_limiter import RateLimiter
+
+def make_iam_client():
+    """Build a mock IAM client for a user with one of each dependent"""
+    client = Mock()
+    pages = {
+        'list_attached_user_policies': {"AttachedPolicies": [{"PolicyArn": "arn:aws:iam::aws:policy/ReadOnlyAccess"}]},
+        'list_user_policies': {"PolicyNames": ["inline"]},
+        'list_groups_for_user': {"Groups": [{"GroupName": "developers"}]},
+        'list_access_keys': {"AccessKeyMetadata": [{"AccessKeyId": "AKIA1"}]},
+        'list_signing_certificates': {"Certificates": []},
+        'list_ssh_public_keys': {"SSHPublicKeys": []},
+        'list_mfa_devices': {"MFADevices": [{"SerialNumber": "arn:aws:iam::123456789012:mfa/alice"}]}
+    }
+    client.get_paginator.side_effect = lambda op: Mock(paginate=Mock(return_value=[pages[op]]))
+    client.list_service_specific_credentials.return_value = {"ServiceSpecificCredentials": []}
+    client.get_login_profile.return_value = {"LoginProfile": {}}
+    return client
+
+class TestTeardownEngine(unittest.TestCase):
+
+    def test_dry_run_returns_ordered_plan(self):
+        """Test dry run plans every call without mutating anything"""
+        client = make_iam_client()
+        engine = TeardownEngine(Mock(iam_client=client, dry_run=True))
+
+        result = engine.teardown(users=['alice'])
+
+        self.assertEqual(result['status'], 'dry_run')
+        phases = result['plan'][0]['phases']
+        self.assertEqual(len(phases[0]), 6)
+        self.assertEqual(phases[1][0]['operation'], 'delete_virtual_mfa_device')
+        self.assertEqual(phases[-1], [{"operation": "delete_user", "params": {"UserName": "alice"}}])
+        client.delete_user.assert_not_called()
+        client.detach_user_policy.assert_not_called()
+
+    def test_teardown_deletes_user_after_dependents(self):
+        """Test the user is deleted once all dependents are removed"""
+        client = make_iam_client()
+        engine = TeardownEngine(Mock(iam_client=client, dry_run=False))
+
+        result = engine.teardown(users=['alice'])
+
+        self.assertEqual(result['status'], 'success')
+        self.assertEqual(result['summary']['calls'], 8)
+        client.remove_user_from_group.assert_called_once_with(UserName='alice', GroupName='developers')
+        client.delete_user.assert_called_once_with(UserName='alice')
+
+    def test_failed_phase_keeps_principal(self):
+        """Test a failing detach step stops before the principal is deleted"""
+        client = make_iam_client()
+        client.delete_access_key.side_effect = ClientError(
+            {"Error": {"Code": "AccessDenied", "Message": "denied"}}, 'DeleteAccessKey'
+        )
+        engine = TeardownEngine(Mock(iam_client=client, dry_run=False))
+
+        result = engine.teardown(users=['alice'])
+
+        # The only principal failed, so nothing was torn down
+        self.assertEqual(result['status'], 'error')
+        self.assertIn('delete_access_key', result['results'][0]['errors'][0])
+        client.delete_user.assert_not_called()
+
+    def test_some_failures_report_partial(self):
+        """Test a teardown where only some principals fail is partial"""
+        client = make_iam_client()
+
+        def delete_user(UserName):
+            if UserName == 'bob':
+                raise ClientError({"Error": {"Code": "AccessDenied", "Message": "denied"}}, 'DeleteUser')
+            return {}
+        client.delete_user.side_effect = delete_user
+        engine = TeardownEngine(Mock(iam_client=client, dry_run=False))
+
+        result = engine.teardown(users=['alice', 'bob'])
+
+        self.assertEqual(result['status'], 'partial')
+        self.assertEqual(result['summary']['deleted'], 1)
+        self.assertEqual(result['summary']['failed'], 1)
+
+    def test_calls_are_paced_by_the_shared_rate_limiter(self):
+        """Test every mutating teardown call takes a token from the manager's rate limiter"""
+        client = make_iam_client()
+        rate_limiter = Mock(wraps=RateLimiter(rate=1000))
+        engine = TeardownEngine(Mock(iam_client=client, dry_run=False, rate_limiter=rate_limiter), max_workers=4)
+
+        result = engine.teardown(users=['alice'])
+
+        self.assertEqual(rate_limiter.acquire.call_count, result['summary']['calls'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+"""
+Unit tests for Trust Graph
+"""
+
+import unittest
+import sys
+import os
+import tempfile
+import time
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+from trust_graph import TrustGraph
+
+def role(arn, *principals, action="sts:AssumeRole"):
+    """Build a list_roles entry trusting the given AWS principals"""
+    return {
+        "Arn": arn,
+        "AssumeRolePolicyDocument": {
+            "Version": "2012-10-17",
+            "Statement": [{"Effect": "Allow", "Principal": {"AWS": list(principals)}, "Action": action}]
+        }
+    }
+
+A = "arn:aws:iam::111111111111"
+B = "arn:aws:iam::222222222222"
+
+class TestTrustGraph(unittest.TestCase):
+
+    def setUp(self):
+        """Set up a chain: user -> deploy -> (account B root) -> admin; ci is unrelated"""
+        self.graph = TrustGraph.from_roles([
+            role(f"{A}:role/deploy", f"{A}:user/alice"),
+            role(f"{B}:role/admin", "111111111111"),
+            role(f"{B}:role/audit", f"{B}:role/admin"),
+            role(f"{A}:role/ci", f"{A}:user/bob", action="sts:TagSession")
+        ])
+
+    def test_transitive_reachability(self):
+        """Test roles reachable through role chains and account-root trust"""
+        self.assertEqual(self.graph.reachable_from(f"{A}:user/alice"),
+                         [f"{A}:role/deploy", f"{B}:role/admin", f"{B}:role/audit"])
+        self.assertEqual(self.graph.reachable_from(f"{A}:user/bob"),
+                         [f"{B}:role/admin", f"{B}:role/audit"])
+
+    def test_principals_reaching_role(self):
+        """Test reverse reachability lists every principal that can reach a role"""
+        reaching = self.graph.principals_reaching(f"{B}:role/audit")
+
+        self.assertIn(f"{B}:role/admin", reaching)
+        self.assertIn(f"{A}:role/deploy", reaching)
+        self.assertIn(f"{A}:user/alice", reaching)
+        self.assertNotIn(f"{A}:user/bob", reaching)
+
+    def test_save_and_load_round_trip(self):
+        """Test a saved graph answers queries identically"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            path = os.path.join(tmp_dir, 'graph.json')
+            self.graph.save(path)
+            loaded = TrustGraph.load(path)
+
+        self.assertEqual(loaded.principals_reaching(f"{B}:role/audit"),
+                         self.graph.principals_reaching(f"{B}:role/audit"))
+
+    def test_queries_fast_on_thousands_of_roles(self):
+        """Test a query over a 5,000-role chain stays well under a second"""
+        roles = [role(f"{A}:role/r0", f"{A}:user/start")]
+        roles += [role(f"{A}:role/r{i}", f"{A}:role/r{i - 1}") for i in range(1, 5000)]
+        graph = TrustGraph.from_roles(roles)
+
+        started = time.perf_counter()
+        reachable = graph.reachable_from(f"{B}:user/outsider")
+        chain = graph.principals_reaching(f"{A}:role/r4999")
+        elapsed = time.perf_counter() - started
+
+        self.assertEqual(reachable, [])
+        self.assertEqual(len(chain), 5000)
+        self.assertLess(elapsed, 1.0)
+
+if __name__ == '__main__':
+    unittest.main()
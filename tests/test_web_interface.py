@@ -0,0 +1,124 @@
+"""
+Unit tests for the web interface
+"""
+
+import unittest
+from unittest.mock import Mock, patch
+import json
+import sys
+import os
+import tempfile
+
+# Add src to path
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+
+import web_interface
+import manager_cache
+from utils.idempotency import SqliteIdempotencyCache
+
+class TestWebInterface(unittest.TestCase):
+
+    def setUp(self):
+        """Set up test fixtures"""
+        self.client = web_interface.app.test_client()
+        manager_cache.clear_managers()
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        idempotency = SqliteIdempotencyCache(os.path.join(tmp_dir.name, 'idempotency.sqlite3'))
+        patcher = patch.object(web_interface, '_idempotency', idempotency)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_managers_shared_across_requests(self):
+        """Test the same IAM Manager is reused for identical settings"""
+        first = web_interface.get_iam_manager('us-east-1', dry_run=True)
+        second = web_interface.get_iam_manager('us-east-1', dry_run=True)
+
+        self.assertIs(first, second)
+        self.assertIsNot(first, web_interface.get_iam_manager('us-east-1', dry_run=False))
+
+    def test_audit_stream_sends_entries_then_result(self):
+        """Test audit progress is streamed as Server-Sent Events"""
+        def audit(output_file, progress_callback=None):
+            progress_callback('user', {'username': 'alice'})
+            progress_callback('role', {'role_name': 'app'})
+            with open(output_file, 'w') as f:
+                f.write('{"summary": {"total_users": 1}}')
+            return {'status': 'success', 'output_file': output_file}
+
+        manager = Mock()
+        manager.audit_permissions.side_effect = audit
+        with patch.object(web_interface, 'get_iam_manager', return_value=manager):
+            response = self.client.get('/api/audit/stream')
+            body = response.get_data(as_text=True)
+
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertIn('event: user\ndata: {"username": "alice"}', body)
+        self.assertLess(body.index('event: role'), body.index('event: result'))
+        self.assertIn('"summary": {"total_users": 1}', body)
+
+    def test_dashboard_streams_bulk_create_results(self):
+        """Test the dashboard reads bulk creation progress from the event stream"""
+        def bulk_create(config_file, progress_callback=None):
+            with open(config_file) as f:
+                for user in json.load(f)['users']:
+                    progress_callback('user', {'status': 'success', 'username': user['name']})
+            return {'status': 'success'}
+
+        manager = Mock()
+        manager.bulk_create_from_config.side_effect = bulk_create
+        with patch.object(web_interface, 'get_iam_manager', return_value=manager):
+            response = self.client.post('/api/bulk-create/stream',
+                                        json={'config': {'users': [{'name': 'alice'}, {'name': 'bob'}]}})
+            body = response.get_data(as_text=True)
+
+        self.assertIn("fetch('/api/bulk-create/stream'", self.client.get('/templates/index.html').get_data(as_text=True))
+        self.assertLess(body.index('"username": "bob"'), body.index('event: result'))
+
+    def test_batch_streams_ndjson_results(self):
+        """Test batch operations run concurrently and stream one line each plus a summary"""
+        manager = Mock(region='us-east-1', dry_run=False)
+        manager.create_user.side_effect = lambda username, groups, policies: {'status': 'success', 'username': username}
+        operations = [{'id': f'u{i}', 'op': 'create_user', 'params': {'username': f'user{i}'}} for i in range(5)]
+        operations.append({'id': 'bad', 'op': 'delete_everything'})
+
+        with patch.object(web_interface, 'get_iam_manager', return_value=manager):
+            response = self.client.post('/api/batch', json={'operations': operations})
+            lines = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+
+        self.assertEqual(response.mimetype, 'application/x-ndjson')
+        self.assertEqual(sorted(line['index'] for line in lines[:-1]), list(range(6)))
+        self.assertEqual(lines[-1], {'summary': {'success': 5, 'error': 1}, 'total': 6})
+        self.assertEqual(manager.create_user.call_count, 5)
+
+    def test_batch_rejects_non_integer_max_workers(self):
+        """Test a malformed max_workers is a 400 JSON error, not a server error"""
+        operations = [{'op': 'create_user', 'params': {'username': 'alice'}}]
+
+        with patch.object(web_interface, 'get_iam_manager') as get_manager:
+            for max_workers in ('many', None, [4]):
+                response = self.client.post('/api/batch', json={'operations': operations,
+                                                                'max_workers': max_workers})
+                self.assertEqual(response.status_code, 400)
+                self.assertEqual(response.get_json()['status'], 'error')
+        get_manager.assert_not_called()
+
+    def test_batch_idempotency_key_replays_result(self):
+        """Test a retried operation with the same idempotency key is not executed twice"""
+        manager = Mock(region='us-east-1', dry_run=False)
+        manager.create_user.return_value = {'status': 'success', 'username': 'alice'}
+        operation = {'op': 'create_user', 'idempotency_key': 'req-1', 'params': {'username': 'alice'}}
+
+        with patch.object(web_interface, 'get_iam_manager', return_value=manager):
+            first = self.client.post('/api/batch', json={'operations': [operation]}).get_data(as_text=True)
+            retry = self.client.post('/api/batch', json={'operations': [operation]}).get_data(as_text=True)
+            reused = dict(operation, params={'username': 'bob'})
+            conflict = self.client.post('/api/batch', json={'operations': [reused]}).get_data(as_text=True)
+
+        self.assertFalse(json.loads(first.splitlines()[0])['replayed'])
+        self.assertTrue(json.loads(retry.splitlines()[0])['replayed'])
+        self.assertEqual(json.loads(conflict.splitlines()[0])['result']['status'], 'error')
+        manager.create_user.assert_called_once()
+
+if __name__ == '__main__':
+    unittest.main()